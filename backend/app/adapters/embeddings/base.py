@@ -0,0 +1,44 @@
+# app/adapters/embeddings/base.py
+import asyncio
+from abc import ABC, abstractmethod
+from typing import List
+
+
+class EmbeddingClient(ABC):
+    """
+    Turns texts into vectors.
+
+    Implementations only provide `embed_batch` (one provider request).
+    `embed` splits arbitrarily long inputs into `batch_size` requests and
+    runs at most `max_concurrency` of them at once.
+    """
+
+    model: str = ""
+    batch_size: int = 32
+    max_concurrency: int = 4
+
+    @abstractmethod
+    async def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        raise NotImplementedError
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        batches = [
+            texts[i : i + self.batch_size]
+            for i in range(0, len(texts), self.batch_size)
+        ]
+        if len(batches) == 1:
+            return await self.embed_batch(batches[0])
+
+        semaphore = asyncio.Semaphore(max(1, self.max_concurrency))
+
+        async def _run(batch: List[str]) -> List[List[float]]:
+            async with semaphore:
+                return await self.embed_batch(batch)
+
+        results = await asyncio.gather(*(_run(b) for b in batches))
+        return [vector for batch in results for vector in batch]
+
+    async def embed_query(self, text: str) -> List[float]:
+        return (await self.embed([text]))[0]
@@ -0,0 +1,127 @@
+# app/adapters/embeddings/cache.py
+"""
+Content-hash keyed embedding cache.
+
+Chunks are keyed on (model, sha256(text)). Re-ingesting an unchanged
+material therefore produces only cache hits and no provider calls.
+"""
+
+import hashlib
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Iterable, List
+
+from sqlalchemy.orm import Session
+
+from app.adapters.embeddings.base import EmbeddingClient
+from app.db.models.embedding_cache_entry import EmbeddingCacheEntry
+from app.db.upsert import upsert
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache(ABC):
+    @abstractmethod
+    def get_many(self, model: str, hashes: Iterable[str]) -> Dict[str, List[float]]:
+        """Return the cached vectors for whichever of `hashes` are present."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def put_many(self, model: str, vectors: Dict[str, List[float]]) -> None:
+        raise NotImplementedError
+
+
+class InMemoryEmbeddingCache(EmbeddingCache):
+    """Process-local LRU, for the API (query embeddings) and tests."""
+
+    def __init__(self, max_entries: int = 10000) -> None:
+        self.max_entries = max_entries
+        self._data: "OrderedDict[tuple[str, str], List[float]]" = OrderedDict()
+
+    def get_many(self, model: str, hashes: Iterable[str]) -> Dict[str, List[float]]:
+        found: Dict[str, List[float]] = {}
+        for h in hashes:
+            key = (model, h)
+            if key in self._data:
+                self._data.move_to_end(key)
+                found[h] = self._data[key]
+        return found
+
+    def put_many(self, model: str, vectors: Dict[str, List[float]]) -> None:
+        for h, vector in vectors.items():
+            self._data[(model, h)] = vector
+            self._data.move_to_end((model, h))
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+
+class DBEmbeddingCache(EmbeddingCache):
+    """Durable cache in the `embedding_cache` table, shared by all workers."""
+
+    def __init__(self, db: Session) -> None:
+        self.db = db
+
+    def get_many(self, model: str, hashes: Iterable[str]) -> Dict[str, List[float]]:
+        hashes = list(hashes)
+        if not hashes:
+            return {}
+        rows = (
+            self.db.query(EmbeddingCacheEntry.content_hash, EmbeddingCacheEntry.embedding)
+            .filter(
+                EmbeddingCacheEntry.model == model,
+                EmbeddingCacheEntry.content_hash.in_(hashes),
+            )
+            .all()
+        )
+        return {h: vector for h, vector in rows}
+
+    def put_many(self, model: str, vectors: Dict[str, List[float]]) -> None:
+        # Another worker may have stored the same text meanwhile; its vector
+        # is as good as ours. Committed by the caller, with the ingest.
+        upsert(
+            self.db,
+            EmbeddingCacheEntry,
+            [
+                {"model": model, "content_hash": h, "embedding": vector}
+                for h, vector in vectors.items()
+            ],
+            index_elements=["model", "content_hash"],
+        )
+
+
+class CachedEmbeddingClient(EmbeddingClient):
+    """Wraps another client and only sends texts it hasn't seen before."""
+
+    def __init__(self, inner: EmbeddingClient, cache: EmbeddingCache) -> None:
+        self.inner = inner
+        self.cache = cache
+        self.model = inner.model
+        self.batch_size = inner.batch_size
+        self.max_concurrency = inner.max_concurrency
+        self.hits = 0
+        self.misses = 0
+
+    async def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        return await self.embed(texts)
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        hashes = [content_hash(t) for t in texts]
+        found = self.cache.get_many(self.model, set(hashes))
+
+        missing: Dict[str, str] = {}
+        for h, text in zip(hashes, texts):
+            if h not in found and h not in missing:
+                missing[h] = text
+        # duplicates within one call are embedded once and count as hits
+        self.hits += len(texts) - len(missing)
+        self.misses += len(missing)
+
+        if missing:
+            vectors = await self.inner.embed(list(missing.values()))
+            fresh = dict(zip(missing.keys(), vectors))
+            self.cache.put_many(self.model, fresh)
+            found.update(fresh)
+
+        return [found[h] for h in hashes]
@@ -0,0 +1,35 @@
+# app/adapters/embeddings/factory.py
+from app.core.config import settings
+from app.adapters.embeddings.base import EmbeddingClient
+from app.adapters.embeddings.cache import CachedEmbeddingClient, EmbeddingCache
+from app.adapters.embeddings.gemini_provider import GeminiEmbeddingClient
+from app.adapters.embeddings.hashing_provider import HashingEmbeddingClient
+from app.adapters.embeddings.ollama_provider import OllamaEmbeddingClient
+
+
+def create_embedding_client(cache: EmbeddingCache | None = None) -> EmbeddingClient:
+    """Build the configured provider, wrapped in `cache` when one is given."""
+    provider = settings.EMBEDDING_PROVIDER
+    client: EmbeddingClient
+    if provider == "gemini":
+        client = GeminiEmbeddingClient(
+            api_key=settings.GEMINI_API_KEY,
+            model=settings.GEMINI_EMBEDDING_MODEL,
+            dimension=settings.EMBEDDING_DIM,
+            batch_size=settings.EMBEDDING_BATCH_SIZE,
+            max_concurrency=settings.EMBEDDING_MAX_CONCURRENCY,
+        )
+    elif provider == "hashing":
+        client = HashingEmbeddingClient(dimension=settings.EMBEDDING_DIM)
+    else:
+        # default ollama
+        client = OllamaEmbeddingClient(
+            base_url=str(settings.OLLAMA_BASE_URL),
+            model=settings.OLLAMA_EMBEDDING_MODEL,
+            batch_size=settings.EMBEDDING_BATCH_SIZE,
+            max_concurrency=settings.EMBEDDING_MAX_CONCURRENCY,
+        )
+
+    if cache is not None:
+        client = CachedEmbeddingClient(client, cache)
+    return client
@@ -0,0 +1,31 @@
+# app/adapters/embeddings/gemini_provider.py
+from typing import List
+
+from google import genai
+from google.genai import types
+
+from app.adapters.embeddings.base import EmbeddingClient
+
+
+class GeminiEmbeddingClient(EmbeddingClient):
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        dimension: int | None = None,
+        batch_size: int = 32,
+        max_concurrency: int = 4,
+    ) -> None:
+        self.client = genai.Client(api_key=api_key)
+        self.model = model
+        self.dimension = dimension
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+
+    async def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        resp = await self.client.aio.models.embed_content(
+            model=self.model,
+            contents=texts,
+            config=types.EmbedContentConfig(output_dimensionality=self.dimension),
+        )
+        return [list(e.values) for e in resp.embeddings]
@@ -0,0 +1,41 @@
+# app/adapters/embeddings/hashing_provider.py
+import hashlib
+import math
+import re
+from typing import List
+
+from app.adapters.embeddings.base import EmbeddingClient
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+class HashingEmbeddingClient(EmbeddingClient):
+    """
+    Deterministic, offline stand-in for a real embedding model.
+
+    Each lowercased word is hashed to a signed bucket and the vector is
+    L2-normalised, so texts that share words end up close together. This is
+    good enough for tests and local development without a model server.
+    """
+
+    def __init__(self, dimension: int = 768, batch_size: int = 256) -> None:
+        self.dimension = dimension
+        self.model = f"hashing-{dimension}"
+        self.batch_size = batch_size
+        self.calls = 0
+
+    async def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        self.calls += 1
+        return [self._embed_one(text) for text in texts]
+
+    def _embed_one(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimension
+        for token in _TOKEN_RE.findall(text.lower()):
+            digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+            value = int.from_bytes(digest, "little")
+            index = value % self.dimension
+            vector[index] += 1.0 if (value >> 63) & 1 else -1.0
+        norm = math.sqrt(sum(v * v for v in vector))
+        if norm:
+            vector = [v / norm for v in vector]
+        return vector
@@ -0,0 +1,32 @@
+# app/adapters/embeddings/ollama_provider.py
+from typing import List
+
+import httpx
+
+from app.adapters.embeddings.base import EmbeddingClient
+from app.adapters.http.client_pool import get_http_client
+
+
+class OllamaEmbeddingClient(EmbeddingClient):
+    def __init__(
+        self,
+        base_url: str,
+        model: str,
+        batch_size: int = 32,
+        max_concurrency: int = 4,
+        http_client: httpx.AsyncClient | None = None,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self._http_client = http_client
+
+    async def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        client = self._http_client or get_http_client()
+        resp = await client.post(
+            f"{self.base_url}/api/embed",
+            json={"model": self.model, "input": texts},
+        )
+        resp.raise_for_status()
+        return resp.json()["embeddings"]
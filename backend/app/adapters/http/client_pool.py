@@ -0,0 +1,57 @@
+# app/adapters/http/client_pool.py
+"""
+Shared outbound HTTP connection pool.
+
+httpx connections belong to the event loop that opened them, so there is
+one AsyncClient per running loop. The API process has a single loop: its
+client is created at startup and closed at shutdown (see app.main). Worker
+processes that run their own loop close it with close_http_client() when
+they are done.
+"""
+
+import asyncio
+import importlib.util
+import weakref
+
+import httpx
+
+from app.core.config import settings
+
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _http2_available() -> bool:
+    return settings.HTTP2 and importlib.util.find_spec("h2") is not None
+
+
+def create_http_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(
+            settings.HTTP_TIMEOUT,
+            connect=settings.HTTP_CONNECT_TIMEOUT,
+        ),
+        http2=_http2_available(),
+    )
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the pooled client of the running event loop, creating it if needed."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = create_http_client()
+        _clients[loop] = client
+    return client
+
+
+async def close_http_client() -> None:
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
@@ -1,6 +1,6 @@
 # app/adapters/llm/base.py
 from abc import ABC, abstractmethod
-from typing import Tuple, List
+from typing import AsyncIterator, Tuple, List
 
 class LLMClient(ABC):
     @abstractmethod
@@ -11,3 +11,12 @@ class LLMClient(ABC):
     async def chat_with_followups(self, prompt: str) -> Tuple[str, List[str]]:
         """Return (answer, followup_questions)."""
         raise NotImplementedError
+
+    async def stream_chat(self, prompt: str) -> AsyncIterator[str]:
+        """
+        Yield the answer in pieces as the model generates it.
+
+        Providers without streaming support fall back to one piece holding
+        the full answer.
+        """
+        yield await self.chat(prompt)
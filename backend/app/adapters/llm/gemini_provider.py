@@ -1,21 +1,56 @@
 # app/adapters/llm/gemini_provider.py
-from typing import Tuple, List
+import asyncio
+import json
+import weakref
+from typing import AsyncIterator, Tuple, List
 from google import genai
 from app.adapters.llm.base import LLMClient
+from app.core.config import settings
+
+# Caps concurrent Gemini calls per process (per event loop), across all
+# GeminiClient instances.
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _concurrency_limit() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(max(1, settings.GEMINI_MAX_CONCURRENCY))
+        _semaphores[loop] = semaphore
+    return semaphore
+
 
 class GeminiClient(LLMClient):
     def __init__(self, api_key: str, model: str) -> None:
         self.client = genai.Client(api_key=api_key)
         self.model = model
 
-    async def chat(self, prompt: str) -> str:
-        # google-genai is sync; wrap in thread executor if you want real async
-        resp = self.client.models.generate_content(
-            model=self.model,
-            contents=prompt,
-        )
+    async def _generate(self, contents: str) -> str:
+        # Native async API: the event loop keeps serving other requests
+        # while Gemini generates.
+        async with _concurrency_limit():
+            resp = await self.client.aio.models.generate_content(
+                model=self.model,
+                contents=contents,
+            )
         return resp.text
 
+    async def chat(self, prompt: str) -> str:
+        return await self._generate(prompt)
+
+    async def stream_chat(self, prompt: str) -> AsyncIterator[str]:
+        async with _concurrency_limit():
+            stream = await self.client.aio.models.generate_content_stream(
+                model=self.model,
+                contents=prompt,
+            )
+            async for chunk in stream:
+                if chunk.text:
+                    yield chunk.text
+
     async def chat_with_followups(self, prompt: str) -> Tuple[str, List[str]]:
         full_prompt = f"""
 {prompt}
@@ -23,10 +58,6 @@ class GeminiClient(LLMClient):
 After answering, suggest 3 short followup questions.
 Return JSON with keys: answer, followups.
 """
-        resp = self.client.models.generate_content(
-            model=self.model,
-            contents=full_prompt,
-        )
-        import json
-        parsed = json.loads(resp.text)
+        text = await self._generate(full_prompt)
+        parsed = json.loads(text)
         return parsed["answer"], parsed.get("followups", [])
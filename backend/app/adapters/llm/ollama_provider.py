@@ -1,26 +1,64 @@
 # app/adapters/llm/ollama_provider.py
+import json
+
 import httpx
-from typing import Tuple, List
+from typing import AsyncIterator, Tuple, List
 from app.adapters.llm.base import LLMClient
+from app.adapters.http.client_pool import get_http_client
 
 class OllamaClient(LLMClient):
-    def __init__(self, base_url: str, model: str) -> None:
+    def __init__(
+        self,
+        base_url: str,
+        model: str,
+        http_client: httpx.AsyncClient | None = None,
+    ) -> None:
         self.base_url = base_url.rstrip("/")
         self.model = model
+        # None -> the shared, app-lifespan connection pool
+        self._http_client = http_client
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        return self._http_client or get_http_client()
+
+    async def _post_chat(self, prompt: str) -> str:
+        resp = await self.http_client.post(
+            f"{self.base_url}/api/chat",
+            json={
+                "model": self.model,
+                "messages": [{"role": "user", "content": prompt}],
+                "stream": False,
+            },
+        )
+        resp.raise_for_status()
+        data = resp.json()
+        return data["message"]["content"]
 
     async def chat(self, prompt: str) -> str:
-        async with httpx.AsyncClient() as client:
-            resp = await client.post(
-                f"{self.base_url}/api/chat",
-                json={
-                    "model": self.model,
-                    "messages": [{"role": "user", "content": prompt}],
-                },
-                timeout=60,
-            )
+        return await self._post_chat(prompt)
+
+    async def stream_chat(self, prompt: str) -> AsyncIterator[str]:
+        # Ollama streams NDJSON: one {"message": {"content": ...}} per token.
+        async with self.http_client.stream(
+            "POST",
+            f"{self.base_url}/api/chat",
+            json={
+                "model": self.model,
+                "messages": [{"role": "user", "content": prompt}],
+                "stream": True,
+            },
+        ) as resp:
             resp.raise_for_status()
-            data = resp.json()
-            return data["message"]["content"]
+            async for line in resp.aiter_lines():
+                if not line:
+                    continue
+                data = json.loads(line)
+                token = (data.get("message") or {}).get("content")
+                if token:
+                    yield token
+                if data.get("done"):
+                    break
 
     async def chat_with_followups(self, prompt: str) -> Tuple[str, List[str]]:
         combined_prompt = f"""
@@ -31,21 +69,9 @@ Return JSON with:
 - "answer": string
 - "followups": list of strings
 """
-        async with httpx.AsyncClient() as client:
-            resp = await client.post(
-                f"{self.base_url}/api/chat",
-                json={
-                    "model": self.model,
-                    "messages": [{"role": "user", "content": combined_prompt}],
-                },
-                timeout=60,
-            )
-            resp.raise_for_status()
-            data = resp.json()
-            content = data["message"]["content"]
+        content = await self._post_chat(combined_prompt)
 
         # you can tighten this later with a json schema
         # for now assume the model returns valid JSON
-        import json
         parsed = json.loads(content)
         return parsed["answer"], parsed.get("followups", [])
@@ -1,23 +1,109 @@
 # app/adapters/storage/object_storage.py
+import asyncio
+import hashlib
 import os
-from uuid import uuid4
+import tempfile
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import BinaryIO, Iterator
+
 from fastapi import UploadFile
 
 from app.core.config import settings
 
 
+class FileTooLargeError(Exception):
+    def __init__(self, limit: int) -> None:
+        super().__init__(f"File exceeds the {limit} byte upload limit")
+        self.limit = limit
+
+
+@dataclass
+class StoredFile:
+    path: str
+    sha256: str
+    size: int
+    # False when identical content was already stored and has been reused
+    created: bool = True
+
+
+async def spool_upload(
+    file: UploadFile,
+    directory: str,
+    max_bytes: int,
+    chunk_size: int,
+) -> StoredFile:
+    """
+    Stream `file` into a temp file in `directory`, `chunk_size` bytes at a
+    time, hashing it on the way. Disk writes run in a worker thread, off the
+    event loop. Returns the temp file; the caller moves or removes it.
+
+    Raises FileTooLargeError past `max_bytes`: before reading anything when
+    the part declares its size, otherwise as soon as the limit is crossed.
+    """
+    if file.size is not None and file.size > max_bytes:
+        raise FileTooLargeError(max_bytes)
+
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".part")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = await file.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise FileTooLargeError(max_bytes)
+                await asyncio.to_thread(_write_chunk, out, digest, chunk)
+            await asyncio.to_thread(_sync, out)
+    except BaseException:
+        # also on cancellation (client went away)
+        os.remove(tmp_path)
+        raise
+    return StoredFile(path=tmp_path, sha256=digest.hexdigest(), size=size)
+
+
+def _write_chunk(out: BinaryIO, digest: "hashlib._Hash", chunk: bytes) -> None:
+    # hashlib releases the GIL for large buffers, so hashing here
+    # doesn't hold up the event loop either.
+    digest.update(chunk)
+    out.write(chunk)
+
+
+def _sync(out: BinaryIO) -> None:
+    out.flush()
+    os.fsync(out.fileno())
+
+
 class StorageBackend(ABC):
     """
     Abstract storage backend.
     """
 
     @abstractmethod
+    async def store(self, file: UploadFile) -> StoredFile:
+        """
+        Persist the uploaded file and return where it went, its sha256 and
+        its size. Raises FileTooLargeError past the upload limit.
+        """
+        raise NotImplementedError
+
     async def save(self, file: UploadFile) -> str:
         """
         Persist the uploaded file and return a path / URI that can be used later.
         """
-        raise NotImplementedError
+        return (await self.store(file)).path
+
+    @contextmanager
+    def local_copy(self, path: str) -> Iterator[str]:
+        """
+        Yield a local filesystem path with the contents of `path` (as
+        returned by store), for tools like PyMuPDF that need a real file.
+        """
+        yield path
 
 
 class LocalFileStorage(StorageBackend):
@@ -26,20 +112,45 @@ class LocalFileStorage(StorageBackend):
 
     Writes files under STORAGE_BASE_PATH (e.g. /data/materials inside the container),
     which is mounted as a volume in docker-compose.
+
+    Uploads are streamed in `chunk_size` pieces into a temp file next to the
+    destination, hashed on the way, and renamed into place once complete,
+    so readers never see a partial file and memory use doesn't depend on
+    the upload size (see spool_upload).
+
+    Storage is content addressed: a file lives at
+    <base>/<sha[:2]>/<sha><ext>, so uploading the same bytes twice keeps
+    one copy.
     """
 
-    def __init__(self, base_path: str | None = None) -> None:
+    def __init__(
+        self,
+        base_path: str | None = None,
+        max_bytes: int | None = None,
+        chunk_size: int | None = None,
+    ) -> None:
         self.base_path = base_path or settings.STORAGE_BASE_PATH
+        self.max_bytes = max_bytes or settings.UPLOAD_MAX_BYTES
+        self.chunk_size = chunk_size or settings.UPLOAD_CHUNK_SIZE
         os.makedirs(self.base_path, exist_ok=True)
 
-    async def save(self, file: UploadFile) -> str:
-        contents = await file.read()
+    async def store(self, file: UploadFile) -> StoredFile:
         ext = os.path.splitext(file.filename or "")[1]
-        filename = f"{uuid4().hex}{ext}"
-        path = os.path.join(self.base_path, filename)
-
-        with open(path, "wb") as f:
-            f.write(contents)
+        spooled = await spool_upload(file, self.base_path, self.max_bytes, self.chunk_size)
+        try:
+            path = self.path_for(spooled.sha256, ext)
+            created = not os.path.exists(path)
+            if created:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                # atomic, and concurrent identical uploads just overwrite
+                # the same bytes
+                os.replace(spooled.path, path)
+        finally:
+            if os.path.exists(spooled.path):
+                os.remove(spooled.path)
 
         # Return absolute path inside the container. For now we just store this in DB.
-        return path
+        return StoredFile(path=path, sha256=spooled.sha256, size=spooled.size, created=created)
+
+    def path_for(self, sha256: str, ext: str = "") -> str:
+        return os.path.join(self.base_path, sha256[:2], f"{sha256}{ext.lower()}")
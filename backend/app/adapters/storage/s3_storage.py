@@ -0,0 +1,215 @@
+# app/adapters/storage/s3_storage.py
+import asyncio
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Iterator, List, Tuple
+
+from fastapi import UploadFile
+
+from app.adapters.storage.object_storage import StorageBackend, StoredFile, spool_upload
+from app.core.config import settings
+
+_NOT_FOUND = ("404", "NoSuchKey", "NotFound")
+
+
+def create_s3_client() -> Any:
+    """
+    boto3 S3 client for AWS or any S3-compatible server (MinIO, Ceph, ...).
+
+    boto3 is only needed with STORAGE_BACKEND=s3|minio, so it's imported
+    here rather than at module level.
+    """
+    import boto3
+    from botocore.config import Config
+
+    return boto3.client(
+        "s3",
+        endpoint_url=settings.S3_ENDPOINT_URL or None,
+        region_name=settings.S3_REGION or None,
+        aws_access_key_id=settings.S3_ACCESS_KEY_ID or None,
+        aws_secret_access_key=settings.S3_SECRET_ACCESS_KEY or None,
+        config=Config(
+            # MinIO serves buckets under the path, not as subdomains
+            s3={"addressing_style": "path"},
+            max_pool_connections=max(10, settings.S3_MAX_CONCURRENCY * 2),
+        ),
+    )
+
+
+def _is_not_found(exc: Exception) -> bool:
+    response = getattr(exc, "response", None) or {}
+    return str(response.get("Error", {}).get("Code")) in _NOT_FOUND
+
+
+def _ranges(size: int, part_size: int) -> List[Tuple[int, int]]:
+    """(offset, length) of each part; an empty object is one empty part."""
+    if size == 0:
+        return [(0, 0)]
+    return [(offset, min(part_size, size - offset)) for offset in range(0, size, part_size)]
+
+
+class S3Storage(StorageBackend):
+    """
+    Object storage on S3 or an S3-compatible server such as MinIO, so API
+    nodes and workers don't need a shared volume.
+
+    `client` is a boto3 S3 client (or anything with the same methods).
+    Uploads are spooled to a local temp file first, which bounds memory,
+    enforces the upload limit and gives us the sha256 before anything is
+    sent. Objects are content addressed like LocalFileStorage, at
+    <prefix><sha[:2]>/<sha><ext>; content that is already in the bucket
+    isn't uploaded again.
+
+    Files larger than `part_size` go up as a multipart upload with up to
+    `max_concurrency` parts in flight. local_copy downloads with parallel
+    ranged GETs. boto3 is blocking, so both run in worker threads.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        bucket: str | None = None,
+        prefix: str | None = None,
+        part_size: int | None = None,
+        max_concurrency: int | None = None,
+        max_bytes: int | None = None,
+        chunk_size: int | None = None,
+        spool_dir: str | None = None,
+    ) -> None:
+        self.client = client
+        self.bucket = bucket or settings.S3_BUCKET
+        self.prefix = settings.S3_PREFIX if prefix is None else prefix
+        # S3 rejects parts under 5 MiB except the last one
+        self.part_size = part_size or settings.S3_PART_SIZE
+        self.max_concurrency = max(1, max_concurrency or settings.S3_MAX_CONCURRENCY)
+        self.max_bytes = max_bytes or settings.UPLOAD_MAX_BYTES
+        self.chunk_size = chunk_size or settings.UPLOAD_CHUNK_SIZE
+        self.spool_dir = spool_dir or tempfile.gettempdir()
+
+    async def store(self, file: UploadFile) -> StoredFile:
+        ext = os.path.splitext(file.filename or "")[1]
+        spooled = await spool_upload(file, self.spool_dir, self.max_bytes, self.chunk_size)
+        try:
+            key = self.key_for(spooled.sha256, ext)
+            created = not await asyncio.to_thread(self._exists, key)
+            if created:
+                await asyncio.to_thread(self._upload, spooled.path, spooled.size, key)
+        finally:
+            os.remove(spooled.path)
+        return StoredFile(
+            path=self.uri_for(key), sha256=spooled.sha256, size=spooled.size, created=created
+        )
+
+    def key_for(self, sha256: str, ext: str = "") -> str:
+        return f"{self.prefix}{sha256[:2]}/{sha256}{ext.lower()}"
+
+    def uri_for(self, key: str) -> str:
+        return f"s3://{self.bucket}/{key}"
+
+    def parse_uri(self, uri: str) -> Tuple[str, str]:
+        if not uri.startswith("s3://"):
+            raise ValueError(f"Not an s3:// URI: {uri}")
+        bucket, _, key = uri[len("s3://"):].partition("/")
+        return bucket, key
+
+    @contextmanager
+    def local_copy(self, path: str) -> Iterator[str]:
+        """
+        Download `path` (an s3:// URI from store) into a temp file and yield
+        its path; the file is removed afterwards. Paths stored before the
+        switch to object storage are local files and are yielded as is.
+        """
+        if not path.startswith("s3://"):
+            yield path
+            return
+
+        bucket, key = self.parse_uri(path)
+        fd, tmp_path = tempfile.mkstemp(dir=self.spool_dir, suffix=os.path.splitext(key)[1])
+        try:
+            os.close(fd)
+            self._download(bucket, key, tmp_path)
+            yield tmp_path
+        finally:
+            os.remove(tmp_path)
+
+    def _exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+        except Exception as exc:
+            if _is_not_found(exc):
+                return False
+            raise
+        return True
+
+    def _upload(self, path: str, size: int, key: str) -> None:
+        if size <= self.part_size:
+            with open(path, "rb") as f:
+                self.client.put_object(Bucket=self.bucket, Key=key, Body=f)
+            return
+
+        upload_id = self.client.create_multipart_upload(Bucket=self.bucket, Key=key)["UploadId"]
+
+        def _part(number: int, offset: int, length: int) -> dict:
+            # each thread reads its own slice, so only the parts in flight
+            # are in memory
+            with open(path, "rb") as f:
+                f.seek(offset)
+                body = f.read(length)
+            resp = self.client.upload_part(
+                Bucket=self.bucket,
+                Key=key,
+                UploadId=upload_id,
+                PartNumber=number,
+                Body=body,
+            )
+            return {"PartNumber": number, "ETag": resp["ETag"]}
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+                parts = list(
+                    pool.map(
+                        lambda item: _part(item[0], *item[1]),
+                        enumerate(_ranges(size, self.part_size), start=1),
+                    )
+                )
+            self.client.complete_multipart_upload(
+                Bucket=self.bucket,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": parts},
+            )
+        except BaseException:
+            # otherwise the uploaded parts are stored (and billed) forever
+            self.client.abort_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id)
+            raise
+
+    def _download(self, bucket: str, key: str, dest: str) -> None:
+        size = self.client.head_object(Bucket=bucket, Key=key)["ContentLength"]
+        ranges = _ranges(size, self.part_size)
+        with open(dest, "r+b") as f:
+            f.truncate(size)
+        if len(ranges) == 1:
+            self._get_range(bucket, key, dest, *ranges[0])
+            return
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+            # list() re-raises the first failed range
+            list(pool.map(lambda r: self._get_range(bucket, key, dest, *r), ranges))
+
+    def _get_range(self, bucket: str, key: str, dest: str, offset: int, length: int) -> None:
+        kwargs = {"Bucket": bucket, "Key": key}
+        if length:
+            kwargs["Range"] = f"bytes={offset}-{offset + length - 1}"
+        body = self.client.get_object(**kwargs)["Body"]
+        fd = os.open(dest, os.O_WRONLY)
+        try:
+            position = offset
+            # stream the body instead of holding the whole range in memory
+            for chunk in iter(lambda: body.read(self.chunk_size), b""):
+                os.pwrite(fd, chunk, position)
+                position += len(chunk)
+        finally:
+            os.close(fd)
+            body.close()
@@ -1,55 +1,150 @@
 # app/adapters/vectorstore/opensearch_vectorstore.py
-from typing import List, Dict, Any
+import json
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Deque, Iterable, Iterator, List, Dict, Any
+
 from opensearchpy import OpenSearch
 
+from app.core.config import settings
+from app.adapters.vectorstore.retrieval_cache import RetrievalCache
+
+# Per-item statuses worth retrying: back-pressure and transient node failures.
+RETRYABLE_STATUSES = {429, 502, 503, 504}
+
+
+class IndexMappingMismatch(Exception):
+    """
+    The search index was created with another embedding dimension or kNN
+    method. Reindex into a new OPENSEARCH_INDEX, or delete the index.
+    """
+
+    def __init__(self, index: str, diff: Dict[str, Any]) -> None:
+        details = ", ".join(
+            f"{key}: index has {have}, settings want {want}"
+            for key, (have, want) in diff.items()
+        )
+        super().__init__(
+            f"OpenSearch index {index!r} doesn't match the settings ({details}); "
+            "reindex into a new OPENSEARCH_INDEX or delete it"
+        )
+        self.index = index
+        self.diff = diff
+
+
+@dataclass
+class BulkItemError:
+    chunk_id: str
+    status: int | None
+    error: Any
+
+
+@dataclass
+class BulkIndexResult:
+    indexed: int = 0
+    requests: int = 0
+    retried: int = 0
+    errors: List[BulkItemError] = field(default_factory=list)
+
+    def merge(self, other: "BulkIndexResult") -> None:
+        self.indexed += other.indexed
+        self.requests += other.requests
+        self.retried += other.retried
+        self.errors.extend(other.errors)
+
 
 class OpenSearchVectorStore:
-    def __init__(self, client: OpenSearch, index_name: str) -> None:
+    def __init__(
+        self,
+        client: OpenSearch,
+        index_name: str,
+        cache: RetrievalCache | None = None,
+    ) -> None:
         self.client = client
         self.index_name = index_name
-        self._ensure_index()
+        self.cache = cache
 
-    def _ensure_index(self) -> None:
+    def ensure_index(self) -> None:
         """
         Ensure the index exists.
 
-        In production this will create the index if needed.
-        In tests, if OpenSearch isn't actually running, we swallow
-        connection errors so tests can proceed (routes don't rely
-        on a live OpenSearch instance).
+        Called once at startup (API lifespan, worker process), not per
+        request: it costs a round trip. Creates the index if needed.
+        If OpenSearch isn't actually running, we swallow connection
+        errors so the app (and tests) can still start.
+
+        Raises IndexMappingMismatch if the index exists with a different
+        embedding dimension or kNN method: those are fixed at creation, and
+        every chunk indexed into it would be rejected.
         """
         try:
             # Use keyword arg for compatibility with opensearch-py
-            if self.client.indices.exists(index=self.index_name):
+            if not self.client.indices.exists(index=self.index_name):
+                self.client.indices.create(index=self.index_name, body=self._index_body())
                 return
-
-            body = {
-                "settings": {
-                    "index": {
-                        "knn": True,
-                        "knn.algo_param.ef_search": 100,
-                    }
-                },
-                "mappings": {
-                    "properties": {
-                        "material_id": {"type": "integer"},
-                        "topic_id": {"type": "integer"},
-                        "chunk_id": {"type": "keyword"},
-                        "content": {"type": "text"},
-                        "page": {"type": "integer"},
-                        "embedding": {
-                            "type": "knn_vector",
-                            "dimension": 1536,  # set to your embedding size
-                        },
-                    }
-                },
-            }
-            self.client.indices.create(index=self.index_name, body=body)
+            mappings = self.client.indices.get_mapping(index=self.index_name)
         except Exception:
             # Most likely running tests without a real OpenSearch instance.
             # We don't want tests for unrelated parts (auth/materials routes)
             # to fail because OS is down or client misconfigured.
             return
+        self._check_embedding_mapping(mappings)
+
+    def _index_body(self) -> Dict[str, Any]:
+        return {
+            "settings": {
+                "index": {
+                    "knn": True,
+                    "knn.algo_param.ef_search": settings.OPENSEARCH_KNN_EF_SEARCH,
+                }
+            },
+            "mappings": {
+                "properties": {
+                    "material_id": {"type": "integer"},
+                    "topic_id": {"type": "integer"},
+                    "chunk_id": {"type": "keyword"},
+                    # position within the material, see delete_stale_chunks
+                    "seq": {"type": "integer"},
+                    "content": {"type": "text"},
+                    "page": {"type": "integer"},
+                    "embedding": {
+                        "type": "knn_vector",
+                        "dimension": settings.EMBEDDING_DIM,
+                        "method": {
+                            "name": "hnsw",
+                            # faiss and lucene support filtering inside
+                            # the graph search (no post-filter recall loss)
+                            "engine": settings.OPENSEARCH_KNN_ENGINE,
+                            "space_type": settings.OPENSEARCH_KNN_SPACE_TYPE,
+                            "parameters": {
+                                "m": settings.OPENSEARCH_KNN_M,
+                                "ef_construction": settings.OPENSEARCH_KNN_EF_CONSTRUCTION,
+                            },
+                        },
+                    },
+                }
+            },
+        }
+
+    def _check_embedding_mapping(self, mappings: Dict[str, Any]) -> None:
+        expected = self._index_body()["mappings"]["properties"]["embedding"]
+        wanted = {"dimension": expected["dimension"]}
+        wanted.update({key: expected["method"][key] for key in ("name", "engine", "space_type")})
+        # keyed by the concrete index, which may sit behind an alias
+        for index, mapping in mappings.items():
+            actual = mapping.get("mappings", {}).get("properties", {}).get("embedding", {})
+            found = {"dimension": actual.get("dimension")}
+            found.update(actual.get("method", {}))
+            diff = {
+                key: (found.get(key), want)
+                for key, want in wanted.items()
+                # method fields left at their default aren't echoed back
+                if found.get(key) != want and (key == "dimension" or key in found)
+            }
+            if diff:
+                raise IndexMappingMismatch(index, diff)
 
     def index_chunk(
         self,
@@ -57,21 +152,199 @@ class OpenSearchVectorStore:
         topic_id: int | None,
         chunk_id: str,
         content: str,
-        embedding: list[float],
+        embedding: list[float] | None,
         page: int | None = None,
     ) -> None:
         """
         Index a single content chunk into OpenSearch.
+
+        `embedding` may be None until an embedding model is configured;
+        the chunk is then only reachable through text search.
+        Prefer index_chunks for more than a handful of chunks.
+        """
+        doc = self._build_doc(material_id, topic_id, chunk_id, content, embedding, page)
+        self.client.index(index=self.index_name, id=chunk_id, body=doc)
+        self._invalidate({material_id})
+
+    def index_chunks(
+        self,
+        chunks: Iterable[Dict[str, Any]],
+        batch_size: int | None = None,
+        max_bytes: int | None = None,
+        max_in_flight: int | None = None,
+        max_retries: int | None = None,
+    ) -> BulkIndexResult:
+        """
+        Index many chunks through the `_bulk` endpoint.
+
+        `chunks` yields dicts with the same keys as index_chunk's arguments
+        and is consumed lazily. Requests are cut at `batch_size` documents or
+        `max_bytes` of payload, whichever comes first. Up to `max_in_flight`
+        requests run concurrently. Items rejected with a retryable status
+        (429/5xx) are resent on their own with exponential backoff. Anything
+        that still fails is reported in the result, not raised.
+        """
+        batch_size = batch_size or settings.OPENSEARCH_BULK_BATCH_SIZE
+        max_bytes = max_bytes or settings.OPENSEARCH_BULK_MAX_BYTES
+        max_in_flight = max_in_flight or settings.OPENSEARCH_BULK_MAX_IN_FLIGHT
+        max_retries = (
+            settings.OPENSEARCH_BULK_MAX_RETRIES if max_retries is None else max_retries
+        )
+
+        result = BulkIndexResult()
+        material_ids: set[int] = set()
+        batches = self._bulk_batches(chunks, batch_size, max_bytes, material_ids)
+
+        try:
+            if max_in_flight <= 1:
+                for batch in batches:
+                    result.merge(self._send_bulk(batch, max_retries))
+                return result
+
+            with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+                in_flight: Deque[Future] = deque()
+                for batch in batches:
+                    if len(in_flight) >= max_in_flight:
+                        result.merge(in_flight.popleft().result())
+                    in_flight.append(pool.submit(self._send_bulk, batch, max_retries))
+                while in_flight:
+                    result.merge(in_flight.popleft().result())
+            return result
+        finally:
+            # Results cached while the material was half indexed are stale too.
+            self._invalidate(material_ids)
+
+    def delete_stale_chunks(self, material_id: int, keep: int) -> int:
+        """
+        Delete what an earlier, longer ingestion of a material left behind:
+        its chunks numbered `keep` and up. Chunk ids are "{material}-{seq}",
+        so re-indexing overwrites the first `keep` in place. Returns the
+        number deleted.
         """
+        body = {
+            "query": {
+                "bool": {
+                    "filter": [{"term": {"material_id": material_id}}],
+                    "should": [
+                        {"range": {"seq": {"gte": keep}}},
+                        # indexed before chunks carried their seq
+                        {"bool": {"must_not": [{"exists": {"field": "seq"}}]}},
+                    ],
+                    "minimum_should_match": 1,
+                }
+            }
+        }
+        resp = self.client.delete_by_query(
+            index=self.index_name, body=body, conflicts="proceed", refresh=True
+        )
+        self._invalidate({material_id})
+        return resp.get("deleted", 0)
+
+    def _build_doc(
+        self,
+        material_id: int,
+        topic_id: int | None,
+        chunk_id: str,
+        content: str,
+        embedding: list[float] | None,
+        page: int | None,
+        seq: int | None = None,
+    ) -> Dict[str, Any]:
         doc = {
             "material_id": material_id,
             "topic_id": topic_id,
             "chunk_id": chunk_id,
             "content": content,
             "page": page,
-            "embedding": embedding,
         }
-        self.client.index(index=self.index_name, id=chunk_id, body=doc)
+        if seq is not None:
+            doc["seq"] = seq
+        if embedding is not None:
+            doc["embedding"] = embedding
+        return doc
+
+    def _bulk_batches(
+        self,
+        chunks: Iterable[Dict[str, Any]],
+        batch_size: int,
+        max_bytes: int,
+        material_ids: set[int] | None = None,
+    ) -> Iterator[List[tuple[str, str]]]:
+        """
+        Yield lists of (chunk_id, ndjson action+source lines).
+
+        The material ids seen are added to `material_ids` when given.
+        """
+        batch: List[tuple[str, str]] = []
+        batch_bytes = 0
+        for chunk in chunks:
+            if material_ids is not None:
+                material_ids.add(chunk["material_id"])
+            doc = self._build_doc(
+                material_id=chunk["material_id"],
+                topic_id=chunk.get("topic_id"),
+                chunk_id=chunk["chunk_id"],
+                content=chunk["content"],
+                embedding=chunk.get("embedding"),
+                page=chunk.get("page"),
+                seq=chunk.get("seq"),
+            )
+            action = {"index": {"_index": self.index_name, "_id": doc["chunk_id"]}}
+            lines = json.dumps(action) + "\n" + json.dumps(doc) + "\n"
+            size = len(lines.encode("utf-8"))
+            if batch and (len(batch) >= batch_size or batch_bytes + size > max_bytes):
+                yield batch
+                batch, batch_bytes = [], 0
+            batch.append((doc["chunk_id"], lines))
+            batch_bytes += size
+        if batch:
+            yield batch
+
+    def _send_bulk(
+        self,
+        batch: List[tuple[str, str]],
+        max_retries: int,
+    ) -> BulkIndexResult:
+        result = BulkIndexResult()
+        pending = batch
+        attempt = 0
+        while pending:
+            retry: List[tuple[str, str]] = []
+            last_error: Dict[str, tuple[int | None, Any]] = {}
+            result.requests += 1
+            try:
+                resp = self.client.bulk(body="".join(lines for _, lines in pending))
+            except Exception as exc:
+                # Whole request failed (connection reset, timeout...): retry it all.
+                retry = pending
+                last_error = {chunk_id: (None, repr(exc)) for chunk_id, _ in pending}
+            else:
+                items = resp.get("items", [])
+                for (chunk_id, lines), item in zip(pending, items):
+                    info = next(iter(item.values()), {})
+                    status = info.get("status")
+                    if status is not None and 200 <= status < 300:
+                        result.indexed += 1
+                    elif status in RETRYABLE_STATUSES:
+                        retry.append((chunk_id, lines))
+                        last_error[chunk_id] = (status, info.get("error"))
+                    else:
+                        result.errors.append(
+                            BulkItemError(chunk_id, status, info.get("error"))
+                        )
+
+            if not retry:
+                break
+            if attempt >= max_retries:
+                for chunk_id, _ in retry:
+                    status, error = last_error[chunk_id]
+                    result.errors.append(BulkItemError(chunk_id, status, error))
+                break
+            time.sleep(min(0.1 * (2**attempt), 5.0))
+            attempt += 1
+            result.retried += len(retry)
+            pending = retry
+        return result
 
     def search(
         self,
@@ -79,36 +352,126 @@ class OpenSearchVectorStore:
         material_id: int,
         topic_id: int | None,
         k: int = 5,
+        query_embedding: list[float] | None = None,
+        mode: str | None = None,
     ) -> List[Dict[str, Any]]:
         """
-        Very simple BM25-style text search over `content`
-        filtered by material_id (and optionally topic_id).
+        Retrieve the top `k` chunks of a material (optionally of one topic).
+
+        Modes:
+        - "bm25": text match over `content`.
+        - "knn": filtered HNSW search over `embedding`.
+        - "hybrid": both in one `_msearch` round trip, fused with
+          reciprocal rank fusion (RRF).
 
-        This avoids having to wire up real vector embeddings
-        and matches what the tests expect.
+        Without a `query_embedding` only BM25 is possible, whatever the mode.
+        Results are served from the retrieval cache when one is configured.
         """
-        must_clauses: list[Dict[str, Any]] = [
-            {"match": {"content": query}},
-        ]
+        mode = mode or settings.SEARCH_MODE
+        if query_embedding is None:
+            mode = "bm25"
+
+        if self.cache is None:
+            return self._search(query, material_id, topic_id, k, query_embedding, mode)
+
+        key = self.cache.key(query, material_id, topic_id, k, mode)
+        results = self.cache.get(key)
+        if results is None:
+            results = self._search(query, material_id, topic_id, k, query_embedding, mode)
+            # nothing indexed yet: the material may be mid-ingestion
+            if results:
+                self.cache.set(key, results)
+        return results
+
+    def _invalidate(self, material_ids: Iterable[int]) -> None:
+        if self.cache is not None:
+            for material_id in material_ids:
+                self.cache.invalidate_material(material_id)
 
+    def _search(
+        self,
+        query: str,
+        material_id: int,
+        topic_id: int | None,
+        k: int,
+        query_embedding: list[float] | None,
+        mode: str,
+    ) -> List[Dict[str, Any]]:
+        filters = self._filter_clauses(material_id, topic_id)
+
+        if mode == "bm25":
+            return self._run_search(self._bm25_body(query, filters, k))
+        if mode == "knn":
+            return self._run_search(self._knn_body(query_embedding, filters, k))
+        if mode != "hybrid":
+            raise ValueError(f"Unknown search mode: {mode}")
+
+        candidates = k * max(1, settings.SEARCH_CANDIDATE_FACTOR)
+        resp = self.client.msearch(
+            body=[
+                {"index": self.index_name},
+                self._bm25_body(query, filters, candidates),
+                {"index": self.index_name},
+                self._knn_body(query_embedding, filters, candidates),
+            ]
+        )
+        ranked_lists = [self._hits_to_results(r) for r in resp.get("responses", [])]
+        return reciprocal_rank_fusion(ranked_lists, k=k, rrf_k=settings.SEARCH_RRF_K)
+
+    def _filter_clauses(
+        self,
+        material_id: int,
+        topic_id: int | None,
+    ) -> list[Dict[str, Any]]:
         filter_clauses: list[Dict[str, Any]] = [
             {"term": {"material_id": material_id}},
         ]
-
         if topic_id is not None:
             filter_clauses.append({"term": {"topic_id": topic_id}})
+        return filter_clauses
 
-        body = {
-            "size": k,
+    def _bm25_body(
+        self,
+        query: str,
+        filters: list[Dict[str, Any]],
+        size: int,
+    ) -> Dict[str, Any]:
+        return {
+            "size": size,
+            "_source": {"excludes": ["embedding"]},
             "query": {
                 "bool": {
-                    "must": must_clauses,
-                    "filter": filter_clauses,
+                    "must": [{"match": {"content": query}}],
+                    "filter": filters,
+                }
+            },
+        }
+
+    def _knn_body(
+        self,
+        embedding: list[float],
+        filters: list[Dict[str, Any]],
+        size: int,
+    ) -> Dict[str, Any]:
+        return {
+            "size": size,
+            "_source": {"excludes": ["embedding"]},
+            "query": {
+                "knn": {
+                    "embedding": {
+                        "vector": embedding,
+                        "k": size,
+                        "filter": {"bool": {"filter": filters}},
+                    }
                 }
             },
         }
 
+    def _run_search(self, body: Dict[str, Any]) -> List[Dict[str, Any]]:
         resp = self.client.search(index=self.index_name, body=body)
+        return self._hits_to_results(resp)
+
+    def _hits_to_results(self, resp: Dict[str, Any]) -> List[Dict[str, Any]]:
         hits = resp.get("hits", {}).get("hits", [])
         results: List[Dict[str, Any]] = []
 
@@ -120,3 +483,31 @@ class OpenSearchVectorStore:
             results.append(source)
 
         return results
+
+
+def reciprocal_rank_fusion(
+    ranked_lists: List[List[Dict[str, Any]]],
+    k: int,
+    rrf_k: int = 60,
+) -> List[Dict[str, Any]]:
+    """
+    Fuse ranked result lists: score(d) = sum over lists of 1 / (rrf_k + rank).
+
+    RRF only looks at ranks, so BM25 and vector scores never have to be
+    put on the same scale.
+    """
+    scores: Dict[str, float] = {}
+    docs: Dict[str, Dict[str, Any]] = {}
+    for results in ranked_lists:
+        for rank, doc in enumerate(results, start=1):
+            doc_id = doc.get("_id") or doc.get("chunk_id")
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (rrf_k + rank)
+            docs.setdefault(doc_id, doc)
+
+    fused = sorted(scores, key=lambda d: scores[d], reverse=True)[:k]
+    results = []
+    for doc_id in fused:
+        doc = dict(docs[doc_id])
+        doc["_score"] = scores[doc_id]
+        results.append(doc)
+    return results
@@ -0,0 +1,70 @@
+# app/adapters/vectorstore/retrieval_cache.py
+import hashlib
+from typing import Any, Dict, List
+
+from app.core.cache import CacheBackend
+
+
+class RetrievalCache:
+    """
+    Caches OpenSearchVectorStore.search results.
+
+    Keys contain the material's current generation. Re-indexing a material
+    bumps the generation, which orphans every cached result for it at once;
+    orphaned entries just expire. With a shared backend the generation is
+    shared too, so a worker re-indexing a material invalidates all API nodes.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl_seconds: float | None = 600) -> None:
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+
+    def key(
+        self,
+        query: str,
+        material_id: int,
+        topic_id: int | None,
+        k: int,
+        mode: str,
+    ) -> str:
+        """
+        Build the cache key for a search.
+
+        Take the key before running the search: if the material is
+        re-indexed meanwhile, the result is stored under the old
+        generation and never served.
+        """
+        digest = hashlib.sha1(query.strip().lower().encode("utf-8")).hexdigest()
+        generation = self.generation(material_id)
+        return f"retrieval:{material_id}:{generation}:{topic_id}:{k}:{mode}:{digest}"
+
+    def get(self, key: str) -> List[Dict[str, Any]] | None:
+        cached = self.backend.get(key)
+        if cached is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        # callers may annotate results; keep the cached copy pristine
+        return [dict(doc) for doc in cached]
+
+    def set(self, key: str, results: List[Dict[str, Any]]) -> None:
+        self.backend.set(key, [dict(doc) for doc in results], self.ttl_seconds)
+
+    def generation(self, material_id: int) -> int:
+        return int(self.backend.get(self._generation_key(material_id)) or 0)
+
+    def invalidate_material(self, material_id: int) -> None:
+        self.backend.incr(self._generation_key(material_id))
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def _generation_key(self, material_id: int) -> str:
+        return f"retrieval:gen:{material_id}"
@@ -0,0 +1,197 @@
+# app/adapters/wiki/summary_cache.py
+"""
+Durable Wikipedia summary cache and offline mirror.
+
+Entries are keyed on (language, normalize_title(title)). Misses (404) and
+failures are cached too, with shorter TTLs, so an unknown concept or a
+Wikipedia outage doesn't cost a timeout on every new session.
+
+WikipediaMirror serves summaries from a local JSONL dump, for offline
+deployments or to pre-seed common concepts.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Iterable
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models.wikipedia_summary_entry import WikipediaSummaryEntry
+from app.db.upsert import async_upsert
+
+FOUND = "found"
+MISSING = "missing"
+ERROR = "error"
+
+_SPACE_RE = re.compile(r"[\s_]+")
+
+
+def normalize_title(title: str) -> str:
+    # Wikipedia titles treat "_" and " " alike; case is folded so
+    # "linear algebra" and "Linear Algebra" share an entry.
+    return _SPACE_RE.sub(" ", title).strip().casefold()
+
+
+@dataclass
+class WikiSummary:
+    status: str
+    summary: str | None = None
+    url: str | None = None
+    expires_at: datetime | None = None
+
+    def ttl(self) -> timedelta:
+        if self.status == FOUND:
+            return timedelta(seconds=settings.WIKIPEDIA_CACHE_TTL_SECONDS)
+        if self.status == MISSING:
+            return timedelta(seconds=settings.WIKIPEDIA_NEGATIVE_TTL_SECONDS)
+        return timedelta(seconds=settings.WIKIPEDIA_ERROR_TTL_SECONDS)
+
+
+class SummaryCache(ABC):
+    @abstractmethod
+    async def get_many(self, language: str, keys: Iterable[str]) -> Dict[str, WikiSummary]:
+        """Return the unexpired entries for whichever of `keys` are present."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def put_many(self, language: str, entries: Dict[str, WikiSummary]) -> None:
+        raise NotImplementedError
+
+
+class InMemorySummaryCache(SummaryCache):
+    def __init__(self) -> None:
+        self._data: Dict[tuple[str, str], WikiSummary] = {}
+
+    async def get_many(self, language: str, keys: Iterable[str]) -> Dict[str, WikiSummary]:
+        now = datetime.utcnow()
+        found: Dict[str, WikiSummary] = {}
+        for key in keys:
+            entry = self._data.get((language, key))
+            if entry is not None and entry.expires_at and entry.expires_at > now:
+                found[key] = entry
+        return found
+
+    async def put_many(self, language: str, entries: Dict[str, WikiSummary]) -> None:
+        now = datetime.utcnow()
+        for key, entry in entries.items():
+            entry.expires_at = now + entry.ttl()
+            self._data[(language, key)] = entry
+
+
+class DBSummaryCache(SummaryCache):
+    """
+    Cache in the `wikipedia_summaries` table.
+
+    Writes join the caller's transaction (no commit here): session creation
+    commits them together with the session.
+    """
+
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+
+    @staticmethod
+    def column_key(key: str) -> str:
+        """`key` as stored: names from the LLM can outgrow the column."""
+        limit = WikipediaSummaryEntry.title_key.type.length
+        if len(key) <= limit:
+            return key
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return f"{key[: limit - len(digest) - 1]}#{digest}"
+
+    async def get_many(self, language: str, keys: Iterable[str]) -> Dict[str, WikiSummary]:
+        by_column_key = {self.column_key(key): key for key in keys}
+        if not by_column_key:
+            return {}
+        rows = await self.db.scalars(
+            select(WikipediaSummaryEntry).where(
+                WikipediaSummaryEntry.language == language,
+                WikipediaSummaryEntry.title_key.in_(by_column_key),
+                WikipediaSummaryEntry.expires_at > datetime.utcnow(),
+            )
+        )
+        return {
+            by_column_key[row.title_key]: WikiSummary(
+                row.status, row.summary, row.url, row.expires_at
+            )
+            for row in rows
+        }
+
+    async def put_many(self, language: str, entries: Dict[str, WikiSummary]) -> None:
+        if not entries:
+            return
+        now = datetime.utcnow()
+        rows = []
+        for key, entry in entries.items():
+            entry.expires_at = now + entry.ttl()
+            rows.append(
+                {
+                    "language": language,
+                    "title_key": self.column_key(key),
+                    "status": entry.status,
+                    "summary": entry.summary,
+                    "url": entry.url,
+                    "fetched_at": now,
+                    "expires_at": entry.expires_at,
+                }
+            )
+
+        # Two sessions caching the same title at once must not fail each
+        # other's transaction. Rows go in key order, so two transactions
+        # with overlapping titles lock them in the same order and can't
+        # deadlock on PostgreSQL.
+        rows.sort(key=lambda row: row["title_key"])
+        await async_upsert(
+            self.db,
+            WikipediaSummaryEntry,
+            rows,
+            index_elements=["language", "title_key"],
+            update_columns=["status", "summary", "url", "fetched_at", "expires_at"],
+        )
+
+
+class WikipediaMirror:
+    """
+    Read-only summaries from a JSONL dump.
+
+    Each line is either a saved REST summary response
+    ({"title", "extract", "content_urls": {...}}) or a compact
+    {"title", "extract", "url"} record. An optional "lang" field limits a
+    line to one language.
+    """
+
+    def __init__(self, entries: Dict[tuple[str | None, str], WikiSummary]) -> None:
+        self._entries = entries
+
+    @classmethod
+    def load(cls, path: str) -> "WikipediaMirror":
+        entries: Dict[tuple[str | None, str], WikiSummary] = {}
+        with open(path, encoding="utf-8") as fh:
+            for line in fh:
+                line = line.strip()
+                if not line:
+                    continue
+                data = json.loads(line)
+                title = data.get("title")
+                if not title:
+                    continue
+                url = data.get("url") or (
+                    data.get("content_urls", {}).get("desktop", {}).get("page")
+                )
+                entries[(data.get("lang"), normalize_title(title))] = WikiSummary(
+                    FOUND, data.get("extract"), url
+                )
+        return cls(entries)
+
+    def get(self, language: str, key: str) -> WikiSummary | None:
+        return self._entries.get((language, key)) or self._entries.get((None, key))
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -1,32 +1,147 @@
 # app/adapters/wiki/wikipedia_client.py
 from __future__ import annotations
 
-from typing import Tuple
+import asyncio
+from typing import Any, Dict, Iterable, Tuple
 from urllib.parse import quote
 
 import httpx
 
+from app.adapters.http.client_pool import get_http_client
+from app.adapters.wiki.summary_cache import (
+    ERROR,
+    FOUND,
+    MISSING,
+    SummaryCache,
+    WikiSummary,
+    WikipediaMirror,
+    normalize_title,
+)
+from app.core.config import settings
+
+Summary = Tuple[str | None, str | None]  # (extract, page url)
+
+# Wikimedia asks API clients to identify themselves.
+_HEADERS = {"User-Agent": "open-learning-assistant/1.0"}
+
 
 class WikipediaClient:
-    def __init__(self, language: str = "en") -> None:
+    def __init__(
+        self,
+        language: str = "en",
+        http_client: httpx.AsyncClient | None = None,
+        max_concurrency: int | None = None,
+        timeout: float | None = None,
+        cache: SummaryCache | None = None,
+        mirror: WikipediaMirror | None = None,
+        offline: bool | None = None,
+    ) -> None:
         self.language = language
         self.base_url = f"https://{language}.wikipedia.org/api/rest_v1/page/summary/"
+        # None -> the shared, app-lifespan connection pool
+        self._http_client = http_client
+        self.max_concurrency = max(
+            1, max_concurrency or settings.WIKIPEDIA_MAX_CONCURRENCY
+        )
+        self.timeout = timeout or settings.WIKIPEDIA_TIMEOUT
+        self.cache = cache
+        self.mirror = mirror
+        # offline: answer from the mirror and cache only, never the network
+        self.offline = settings.WIKIPEDIA_OFFLINE if offline is None else offline
 
-    def fetch_summary(self, topic: str) -> Tuple[str | None, str | None]:
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        return self._http_client or get_http_client()
+
+    def fetch_summary(self, topic: str) -> Summary:
+        """Blocking lookup, for scripts. Request handlers use afetch_summary."""
         if not topic:
             return None, None
 
-        url = self.base_url + quote(topic)
         try:
-            resp = httpx.get(url, timeout=10)
+            resp = httpx.get(self._url(topic), headers=_HEADERS, timeout=self.timeout)
             resp.raise_for_status()
-            data = resp.json()
-            summary = data.get("extract")
-            page_url = (
-                data.get("content_urls", {})
-                .get("desktop", {})
-                .get("page")
-            )
-            return summary, page_url
+            return self._parse(resp.json())
         except Exception:
             return None, None
+
+    async def afetch_summary(self, topic: str) -> Summary:
+        if not topic:
+            return None, None
+        return (await self.fetch_summaries([topic]))[topic]
+
+    async def fetch_summaries(self, topics: Iterable[str]) -> Dict[str, Summary]:
+        """
+        Look up several topics. Failed lookups map to (None, None), like
+        fetch_summary.
+
+        Each title is answered by the first of: the local mirror, the
+        summary cache (including cached misses), Wikipedia itself. Network
+        lookups run concurrently, at most `max_concurrency` at a time, and
+        their outcome is written back to the cache.
+        """
+        unique = list(dict.fromkeys(t for t in topics if t))
+        keys = {topic: normalize_title(topic) for topic in unique}
+        resolved: Dict[str, WikiSummary] = {}
+
+        if self.mirror is not None:
+            for key in keys.values():
+                entry = self.mirror.get(self.language, key)
+                if entry is not None:
+                    resolved[key] = entry
+
+        pending = [key for key in dict.fromkeys(keys.values()) if key not in resolved]
+        if pending and self.cache is not None:
+            resolved.update(await self.cache.get_many(self.language, pending))
+            pending = [key for key in pending if key not in resolved]
+
+        if pending and not self.offline:
+            # fetch each key under the first spelling that asked for it
+            titles = {}
+            for topic, key in keys.items():
+                titles.setdefault(key, topic)
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+
+            async def _one(key: str) -> WikiSummary:
+                async with semaphore:
+                    return await self.fetch_remote(titles[key])
+
+            fetched = dict(zip(pending, await asyncio.gather(*(_one(k) for k in pending))))
+            if self.cache is not None:
+                await self.cache.put_many(self.language, fetched)
+            resolved.update(fetched)
+
+        results: Dict[str, Summary] = {}
+        for topic, key in keys.items():
+            entry = resolved.get(key)
+            if entry is None or entry.status != FOUND:
+                results[topic] = (None, None)
+            else:
+                results[topic] = (entry.summary, entry.url)
+        return results
+
+    async def fetch_remote(self, topic: str) -> WikiSummary:
+        """One uncached request to the REST API."""
+        try:
+            resp = await self.http_client.get(
+                self._url(topic), headers=_HEADERS, timeout=self.timeout
+            )
+            if resp.status_code == 404:
+                return WikiSummary(MISSING)
+            resp.raise_for_status()
+            summary, url = self._parse(resp.json())
+            return WikiSummary(FOUND, summary, url)
+        except Exception:
+            return WikiSummary(ERROR)
+
+    def _url(self, topic: str) -> str:
+        return self.base_url + quote(topic)
+
+    def _parse(self, data: Dict[str, Any]) -> Summary:
+        summary = data.get("extract")
+        page_url = (
+            data.get("content_urls", {})
+            .get("desktop", {})
+            .get("page")
+        )
+        return summary, page_url
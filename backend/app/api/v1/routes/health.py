@@ -1,8 +1,27 @@
 # app/api/v1/routes/health.py
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+
+from app.core.auth import PrincipalCache
+from app.core.deps import get_answer_cache, get_principal_cache, get_retrieval_cache
+from app.adapters.vectorstore.retrieval_cache import RetrievalCache
+from app.services_impl.answer_cache import AnswerCache
 
 router = APIRouter()
 
 @router.get("/ping")
 async def ping():
     return {"status": "ok"}
+
+
+@router.get("/metrics")
+async def metrics(
+    answer_cache: AnswerCache | None = Depends(get_answer_cache),
+    retrieval_cache: RetrievalCache | None = Depends(get_retrieval_cache),
+    principal_cache: PrincipalCache | None = Depends(get_principal_cache),
+):
+    """Cache counters for dashboards."""
+    return {
+        "answer_cache": answer_cache.stats() if answer_cache else None,
+        "retrieval_cache": retrieval_cache.stats() if retrieval_cache else None,
+        "principal_cache": principal_cache.stats() if principal_cache else None,
+    }
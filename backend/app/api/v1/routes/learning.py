@@ -1,18 +1,25 @@
 # app/api/v1/routes/learning.py
-from fastapi import APIRouter, Depends, HTTPException, status
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from typing import Optional, List
 
+from app.core.auth import Principal
 from app.core.deps import (
     get_rag_service,
     get_current_user,
     get_session_service,
+    get_token_principal,
 )
 from app.services.rag_service import RAGService
 from app.services.session_service import SessionService
-from app.db.models.user import User
+from app.core.logging import get_logger
+from app.core.pagination import NEXT_CURSOR_HEADER
 
 router = APIRouter()
+logger = get_logger(__name__)
 
 
 class AskQuestionRequest(BaseModel):
@@ -30,7 +37,7 @@ class CreateSessionRequest(BaseModel):
 @router.post("/ask")
 async def ask_question(
     payload: AskQuestionRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_token_principal),
     rag_service: RAGService = Depends(get_rag_service),
 ):
     result = await rag_service.answer_question(
@@ -42,10 +49,43 @@ async def ask_question(
     return result
 
 
+@router.post("/ask/stream")
+async def ask_question_stream(
+    payload: AskQuestionRequest,
+    current_user: Principal = Depends(get_token_principal),
+    rag_service: RAGService = Depends(get_rag_service),
+):
+    """
+    Server-Sent Events variant of /ask: `token` events while the answer is
+    generated, then `sources`, `followups` and `done`.
+    """
+    events = rag_service.stream_answer(
+        user_id=current_user.id,
+        material_id=payload.material_id,
+        topic_id=payload.topic_id,
+        question=payload.question,
+    )
+
+    async def event_stream():
+        try:
+            async for event in events:
+                yield f"event: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+        except Exception:
+            logger.exception("Streaming answer failed")
+            # Headers are already sent; report the failure in-band.
+            yield 'event: error\ndata: {"detail": "Answer generation failed"}\n\n'
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.post("/sessions", status_code=status.HTTP_201_CREATED)
 async def create_learning_session(
     payload: CreateSessionRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     session_service: SessionService = Depends(get_session_service),
 ):
     try:
@@ -61,16 +101,25 @@ async def create_learning_session(
 
 @router.get("/sessions")
 async def list_learning_sessions(
-    current_user: User = Depends(get_current_user),
+    response: Response,
+    limit: Optional[int] = Query(default=None, ge=1),
+    cursor: Optional[str] = None,
+    current_user: Principal = Depends(get_current_user),
     session_service: SessionService = Depends(get_session_service),
 ):
-    return await session_service.list_sessions(current_user.id)
+    try:
+        page = await session_service.list_sessions(current_user.id, limit, cursor)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    return page.items
 
 
 @router.get("/sessions/{session_id}")
 async def get_learning_session(
     session_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     session_service: SessionService = Depends(get_session_service),
 ):
     try:
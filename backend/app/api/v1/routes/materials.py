@@ -1,10 +1,12 @@
 # app/api/v1/routes/materials.py
-from fastapi import APIRouter, Depends, UploadFile, File, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, UploadFile, File, status
+from typing import List, Optional
 
+from app.core.auth import Principal
 from app.core.deps import get_materials_service, get_current_user
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.adapters.storage.object_storage import FileTooLargeError
 from app.services.materials_service import MaterialsService
-from app.db.models.user import User
 
 router = APIRouter()
 
@@ -12,16 +14,33 @@ router = APIRouter()
 @router.post("/upload", status_code=status.HTTP_201_CREATED)
 async def upload_material(
     file: UploadFile = File(...),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     service: MaterialsService = Depends(get_materials_service),
 ):
-    material_id = await service.upload_material(user_id=current_user.id, file=file)
+    try:
+        material_id = await service.upload_material(user_id=current_user.id, file=file)
+    except FileTooLargeError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE, detail=str(exc)
+        ) from exc
     return {"material_id": material_id}
 
 
 @router.get("/", response_model=List[dict])
 async def list_materials(
-    current_user: User = Depends(get_current_user),
+    response: Response,
+    limit: Optional[int] = Query(default=None, ge=1),
+    cursor: Optional[str] = None,
+    status_filter: Optional[str] = Query(default=None, alias="status"),
+    current_user: Principal = Depends(get_current_user),
     service: MaterialsService = Depends(get_materials_service),
 ):
-    return await service.list_materials(current_user.id)
+    try:
+        page = await service.list_materials(
+            current_user.id, limit=limit, cursor=cursor, status=status_filter
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    return page.items
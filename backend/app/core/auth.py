@@ -0,0 +1,92 @@
+# app/core/auth.py
+"""
+Access-token verification without a user lookup per request.
+
+A verified access token resolves to a Principal: the few user fields
+request handlers need. Principals are cached per process for
+PRINCIPAL_CACHE_TTL_SECONDS, so most requests cost a signature check and
+no DB round trip. Updating or deleting a user drops its entry here right
+away; other processes see the change within the TTL.
+
+With AUTH_TRUST_TOKEN_CLAIMS, hot read paths go further and build the
+Principal from the signed claims alone, for tokens younger than
+AUTH_TRUSTED_CLAIMS_MAX_AGE_SECONDS.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Any, Dict
+
+from jose import JWTError, jwt
+from sqlalchemy import event
+
+from app.core.cache import TTLCache, invalidate_user
+from app.core.config import settings
+from app.db.models.user import User
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated user, as seen by request handlers."""
+
+    id: int
+    email: str | None = None
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(id=user.id, email=user.email)
+
+
+def decode_access_token(token: str) -> Dict[str, Any]:
+    """Verify an access token and return its claims. Raises ValueError."""
+    try:
+        claims = jwt.decode(
+            token,
+            settings.JWT_SECRET_KEY,
+            algorithms=[settings.JWT_ALGORITHM],
+        )
+        if claims.get("sub") is None or claims.get("type") != "access":
+            raise ValueError("Not an access token")
+        claims["sub"] = int(claims["sub"])
+    except (JWTError, TypeError) as exc:
+        raise ValueError("Invalid access token") from exc
+    return claims
+
+
+def claims_are_trusted(claims: Dict[str, Any], now: float | None = None) -> bool:
+    """Whether `claims` may stand in for a user lookup (see module docstring)."""
+    if not settings.AUTH_TRUST_TOKEN_CLAIMS:
+        return False
+    issued_at = claims.get("iat")
+    if not isinstance(issued_at, (int, float)):
+        return False
+    age = (time.time() if now is None else now) - issued_at
+    return 0 <= age <= settings.AUTH_TRUSTED_CLAIMS_MAX_AGE_SECONDS
+
+
+class PrincipalCache:
+    """Short-TTL LRU of Principals by user id."""
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 60) -> None:
+        self._cache: TTLCache[int, Principal] = TTLCache(max_entries, ttl_seconds)
+
+    def get(self, user_id: int) -> Principal | None:
+        return self._cache.get(user_id)
+
+    def put(self, principal: Principal) -> None:
+        self._cache.set(principal.id, principal)
+
+    def invalidate_user(self, user_id: int) -> None:
+        self._cache.delete(user_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return self._cache.stats()
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _user_changed(_mapper, _connection, target: User) -> None:
+    # Fires at flush; a rolled back change only costs a cache miss.
+    invalidate_user(target.id)
@@ -0,0 +1,185 @@
+# app/core/cache.py
+"""
+Caching primitives.
+
+- TTLCache: thread-safe LRU with per-entry expiry and hit/miss counters.
+- CacheBackend: minimal get/set/incr interface, so a cache can live in
+  process (InMemoryCacheBackend) or be shared between API nodes and
+  workers (RedisCacheBackend).
+- Material invalidation hooks: caches holding data derived from a
+  material's chunks subscribe here, and the ingestion pipeline calls
+  invalidate_material() after re-indexing one.
+- User invalidation hooks: the same for caches of user data; called when
+  a users row is updated or deleted (see app/core/auth.py).
+"""
+
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Generic, Hashable, List, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+_MISSING = object()
+
+
+class TTLCache(Generic[K, V]):
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._data: "OrderedDict[K, Tuple[V, float | None]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: K, default: Any = None) -> V | Any:
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING:
+                self.misses += 1
+                return default
+            value, expires_at = item
+            if expires_at is not None and expires_at <= self._clock():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: K, value: V, ttl_seconds: float | None = None) -> None:
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        expires_at = self._clock() + ttl if ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: K) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class CacheBackend(ABC):
+    @abstractmethod
+    def get(self, key: str) -> Any | None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl_seconds: float | None = None) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def incr(self, key: str) -> int:
+        """Atomically increment an integer counter (starting from 0)."""
+        raise NotImplementedError
+
+
+class InMemoryCacheBackend(CacheBackend):
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float | None = None) -> None:
+        self.values: TTLCache[str, Any] = TTLCache(max_entries, ttl_seconds)
+        # Counters are tiny and must not be evicted with the values.
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any | None:
+        if key in self._counters:
+            return self._counters[key]
+        return self.values.get(key)
+
+    def set(self, key: str, value: Any, ttl_seconds: float | None = None) -> None:
+        self.values.set(key, value, ttl_seconds)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Shared backend on top of a redis-py compatible client.
+
+    Values are stored as JSON. The client is injected so redis stays an
+    optional dependency.
+    """
+
+    def __init__(self, client: Any, prefix: str = "ola:") -> None:
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key: str) -> Any | None:
+        raw = self.client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Any, ttl_seconds: float | None = None) -> None:
+        ex = int(ttl_seconds) if ttl_seconds else None
+        self.client.set(self.prefix + key, json.dumps(value), ex=ex)
+
+    def incr(self, key: str) -> int:
+        return int(self.client.incr(self.prefix + key))
+
+
+_material_listeners: List[Callable[[int], None]] = []
+
+
+def on_material_invalidated(listener: Callable[[int], None]) -> None:
+    """Register `listener(material_id)`; called when a material is re-indexed."""
+    _material_listeners.append(listener)
+
+
+def off_material_invalidated(listener: Callable[[int], None]) -> None:
+    if listener in _material_listeners:
+        _material_listeners.remove(listener)
+
+
+def invalidate_material(material_id: int) -> None:
+    for listener in list(_material_listeners):
+        listener(material_id)
+
+
+_user_listeners: List[Callable[[int], None]] = []
+
+
+def on_user_invalidated(listener: Callable[[int], None]) -> None:
+    """Register `listener(user_id)`; called when a user is changed or deleted."""
+    _user_listeners.append(listener)
+
+
+def off_user_invalidated(listener: Callable[[int], None]) -> None:
+    if listener in _user_listeners:
+        _user_listeners.remove(listener)
+
+
+def invalidate_user(user_id: int) -> None:
+    for listener in list(_user_listeners):
+        listener(user_id)
@@ -0,0 +1,196 @@
+# app/core/container.py
+"""
+Application-scoped resources.
+
+Clients, connection pools and caches are built once per process by
+build_container() - in the API's lifespan handler, or once per worker
+process - and shared by every request. app/core/deps.py hands them out.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Callable, List
+
+from opensearchpy import OpenSearch
+
+from app.core.config import settings
+from app.core.cache import (
+    CacheBackend,
+    InMemoryCacheBackend,
+    RedisCacheBackend,
+    TTLCache,
+    off_material_invalidated,
+    off_user_invalidated,
+    on_material_invalidated,
+    on_user_invalidated,
+)
+from app.core.auth import PrincipalCache
+
+from app.adapters.llm.base import LLMClient
+from app.adapters.llm.ollama_provider import OllamaClient
+from app.adapters.llm.gemini_provider import GeminiClient
+
+from app.adapters.embeddings.base import EmbeddingClient
+from app.adapters.embeddings.cache import EmbeddingCache, InMemoryEmbeddingCache
+from app.adapters.embeddings.factory import create_embedding_client
+
+from app.adapters.vectorstore.opensearch_client import get_opensearch_client
+from app.adapters.vectorstore.opensearch_vectorstore import OpenSearchVectorStore
+from app.adapters.vectorstore.retrieval_cache import RetrievalCache
+
+from app.adapters.storage.object_storage import StorageBackend, LocalFileStorage
+from app.adapters.storage.s3_storage import S3Storage, create_s3_client
+
+from app.adapters.wiki.summary_cache import WikipediaMirror
+
+from app.services_impl.answer_cache import AnswerCache
+
+
+def create_llm_client() -> LLMClient:
+    if settings.LLM_PROVIDER == "gemini":
+        return GeminiClient(
+            api_key=settings.GEMINI_API_KEY,
+            model=settings.GEMINI_MODEL,
+        )
+    # default ollama
+    return OllamaClient(
+        base_url=str(settings.OLLAMA_BASE_URL),
+        model=settings.OLLAMA_MODEL,
+    )
+
+
+def create_shared_cache_backend() -> CacheBackend | None:
+    """The cache backend shared by API nodes and workers, if configured."""
+    if not settings.CACHE_REDIS_URL:
+        return None
+    import redis  # optional dependency, only needed for a shared cache
+
+    return RedisCacheBackend(redis.Redis.from_url(settings.CACHE_REDIS_URL))
+
+
+def create_answer_cache(shared: CacheBackend | None = None) -> AnswerCache | None:
+    if not settings.ANSWER_CACHE_ENABLED:
+        return None
+    if shared is None and not settings.CACHE_ALLOW_PROCESS_LOCAL:
+        # re-ingestion by the runner couldn't invalidate it
+        return None
+    return AnswerCache(
+        max_entries=settings.ANSWER_CACHE_MAX_ENTRIES,
+        ttl_seconds=settings.ANSWER_CACHE_TTL_SECONDS,
+        similarity_threshold=settings.ANSWER_CACHE_SIMILARITY_THRESHOLD,
+        # answers stay in process; their generations follow re-ingestion
+        # done by the workers
+        generations=shared,
+    )
+
+
+def create_retrieval_cache(shared: CacheBackend | None = None) -> RetrievalCache | None:
+    if not settings.RETRIEVAL_CACHE_ENABLED:
+        return None
+    if shared is None and not settings.CACHE_ALLOW_PROCESS_LOCAL:
+        # re-ingestion by the runner couldn't invalidate it
+        return None
+    backend = shared or InMemoryCacheBackend(max_entries=settings.RETRIEVAL_CACHE_MAX_ENTRIES)
+    return RetrievalCache(backend, ttl_seconds=settings.RETRIEVAL_CACHE_TTL_SECONDS)
+
+
+def create_storage_backend() -> StorageBackend:
+    if settings.STORAGE_BACKEND in ("s3", "minio"):
+        # boto3 clients are thread safe and keep their own connection pool
+        return S3Storage(client=create_s3_client())
+    return LocalFileStorage()
+
+
+def create_principal_cache() -> PrincipalCache | None:
+    if settings.PRINCIPAL_CACHE_TTL_SECONDS <= 0:
+        return None
+    return PrincipalCache(
+        max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+        ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    )
+
+
+def create_wikipedia_mirror() -> WikipediaMirror | None:
+    if not settings.WIKIPEDIA_DUMP_PATH:
+        return None
+    return WikipediaMirror.load(settings.WIKIPEDIA_DUMP_PATH)
+
+
+@dataclass
+class Container:
+    opensearch: OpenSearch
+    vector_store: OpenSearchVectorStore
+    llm: LLMClient
+    embedding_cache: EmbeddingCache
+    embedder: EmbeddingClient
+    answer_cache: AnswerCache | None
+    retrieval_cache: RetrievalCache | None
+    storage: StorageBackend
+    wikipedia_mirror: WikipediaMirror | None
+    principal_cache: PrincipalCache | None
+    # material id -> canonical material id, see RAGServiceOpenSearchImpl
+    material_aliases: TTLCache[int, int]
+    _listeners: List[Callable[[int], None]] = field(default_factory=list, repr=False)
+    _user_listeners: List[Callable[[int], None]] = field(default_factory=list, repr=False)
+
+    def startup(self) -> None:
+        """Blocking one-off setup: create the search index if it's missing."""
+        self.vector_store.ensure_index()
+
+    def close(self) -> None:
+        for listener in self._listeners:
+            off_material_invalidated(listener)
+        self._listeners.clear()
+        for listener in self._user_listeners:
+            off_user_invalidated(listener)
+        self._user_listeners.clear()
+        self.opensearch.close()
+
+
+def build_container() -> Container:
+    opensearch = get_opensearch_client()
+    shared_cache = create_shared_cache_backend()
+    retrieval_cache = create_retrieval_cache(shared_cache)
+    answer_cache = create_answer_cache(shared_cache)
+    embedding_cache = InMemoryEmbeddingCache(max_entries=settings.EMBEDDING_CACHE_SIZE)
+    principal_cache = create_principal_cache()
+    material_aliases: TTLCache[int, int] = TTLCache(
+        max_entries=settings.MATERIAL_ALIAS_CACHE_MAX_ENTRIES,
+        ttl_seconds=settings.MATERIAL_ALIAS_CACHE_TTL_SECONDS,
+    )
+
+    container = Container(
+        opensearch=opensearch,
+        vector_store=OpenSearchVectorStore(
+            client=opensearch,
+            index_name=settings.OPENSEARCH_INDEX,
+            cache=retrieval_cache,
+        ),
+        llm=create_llm_client(),
+        embedding_cache=embedding_cache,
+        # process-wide cache, so repeated questions don't re-embed
+        embedder=create_embedding_client(cache=embedding_cache),
+        answer_cache=answer_cache,
+        retrieval_cache=retrieval_cache,
+        storage=create_storage_backend(),
+        wikipedia_mirror=create_wikipedia_mirror(),
+        principal_cache=principal_cache,
+        material_aliases=material_aliases,
+    )
+    # re-indexing a material drops answers and results built from it
+    for cache in (answer_cache, retrieval_cache):
+        if cache is not None:
+            on_material_invalidated(cache.invalidate_material)
+            container._listeners.append(cache.invalidate_material)
+
+    # re-ingestion can follow a takeover from a failed canonical upload
+    def _forget_aliases(_material_id: int) -> None:
+        material_aliases.clear()
+
+    on_material_invalidated(_forget_aliases)
+    container._listeners.append(_forget_aliases)
+    if principal_cache is not None:
+        on_user_invalidated(principal_cache.invalidate_user)
+        container._user_listeners.append(principal_cache.invalidate_user)
+    return container
@@ -1,24 +1,24 @@
 # app/core/deps.py
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.orm import Session
-from jose import JWTError, jwt
 
-from app.core.config import settings
-from app.db.session import get_db
+from app.core.auth import Principal, PrincipalCache, claims_are_trusted, decode_access_token
+from app.core.container import Container, build_container
+from app.db.session import get_async_db, get_async_sessionmaker, get_db
 from app.db.models.user import User
 
 from app.adapters.llm.base import LLMClient
-from app.adapters.llm.ollama_provider import OllamaClient
-from app.adapters.llm.gemini_provider import GeminiClient
-
-from app.adapters.vectorstore.opensearch_client import get_opensearch_client
+from app.adapters.embeddings.base import EmbeddingClient
+from app.adapters.embeddings.cache import EmbeddingCache
 from app.adapters.vectorstore.opensearch_vectorstore import OpenSearchVectorStore
-
-from app.adapters.storage.object_storage import StorageBackend, LocalFileStorage
+from app.adapters.vectorstore.retrieval_cache import RetrievalCache
+from app.adapters.storage.object_storage import StorageBackend
 
 from app.services.rag_service import RAGService
 from app.services_impl.rag_service_opensearch_impl import RAGServiceOpenSearchImpl
+from app.services_impl.answer_cache import AnswerCache
 
 from app.services.materials_service import MaterialsService
 from app.services_impl.materials_service_impl import MaterialsServiceImpl
@@ -32,100 +32,177 @@ from app.services_impl.prereq_llm_impl import PrereqLLMImpl
 from app.services.session_service import SessionService
 from app.services_impl.session_service_impl import SessionServiceImpl
 
+from app.adapters.wiki.summary_cache import DBSummaryCache, WikipediaMirror
 from app.adapters.wiki.wikipedia_client import WikipediaClient
 
+from app.workers.job_queue import DBJobBroker, JobBroker
+
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
 
-def get_llm_client() -> LLMClient:
-    if settings.LLM_PROVIDER == "gemini":
-        return GeminiClient(
-            api_key=settings.GEMINI_API_KEY,
-            model=settings.GEMINI_MODEL,
-        )
-    else:
-        # default ollama
-        return OllamaClient(
-            base_url=str(settings.OLLAMA_BASE_URL),
-            model=settings.OLLAMA_MODEL,
-        )
-
-
-def get_vector_store() -> OpenSearchVectorStore:
-    client = get_opensearch_client()
-    return OpenSearchVectorStore(
-        client=client,
-        index_name=settings.OPENSEARCH_INDEX,
-    )
+def get_container(request: Request) -> Container:
+    """
+    The app's resources, built once in the lifespan handler (app/main.py).
+    Apps driven without lifespan events (e.g. httpx.ASGITransport) build
+    theirs on first use.
+    """
+    container = getattr(request.app.state, "container", None)
+    if container is None:
+        container = request.app.state.container = build_container()
+    return container
+
+
+def get_llm_client(container: Container = Depends(get_container)) -> LLMClient:
+    return container.llm
+
+
+def get_embedding_cache(container: Container = Depends(get_container)) -> EmbeddingCache:
+    return container.embedding_cache
+
 
+def get_embedding_client(container: Container = Depends(get_container)) -> EmbeddingClient:
+    return container.embedder
 
-def get_storage_backend() -> StorageBackend:
-    # later you can branch on STORAGE_BACKEND == "s3" | "minio"
-    return LocalFileStorage()
+
+def get_answer_cache(container: Container = Depends(get_container)) -> AnswerCache | None:
+    return container.answer_cache
+
+
+def get_retrieval_cache(
+    container: Container = Depends(get_container),
+) -> RetrievalCache | None:
+    return container.retrieval_cache
+
+
+def get_vector_store(
+    container: Container = Depends(get_container),
+) -> OpenSearchVectorStore:
+    return container.vector_store
+
+
+def get_storage_backend(container: Container = Depends(get_container)) -> StorageBackend:
+    return container.storage
 
 
 def get_auth_service(db: Session = Depends(get_db)) -> AuthService:
     return AuthServiceImpl(db=db)
 
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db),
-) -> User:
-    credentials_exception = HTTPException(
+def get_principal_cache(
+    container: Container = Depends(get_container),
+) -> PrincipalCache | None:
+    return container.principal_cache
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+
+async def _load_principal(
+    user_id: int,
+    db: AsyncSession,
+    cache: PrincipalCache | None,
+) -> Principal:
+    principal = cache.get(user_id) if cache is not None else None
+    if principal is None:
+        user = await db.get(User, user_id)
+        if user is None:
+            raise _credentials_exception()
+        principal = Principal.from_user(user)
+        if cache is not None:
+            cache.put(principal)
+    return principal
+
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db),
+    cache: PrincipalCache | None = Depends(get_principal_cache),
+) -> Principal:
+    """The token's user, from the principal cache or the DB."""
     try:
-        payload = jwt.decode(
-            token,
-            settings.JWT_SECRET_KEY,
-            algorithms=[settings.JWT_ALGORITHM],
-        )
-        sub = payload.get("sub")
-        token_type = payload.get("type")
-        if sub is None or token_type != "access":
-            raise credentials_exception
-        user_id = int(sub)
-    except (JWTError, ValueError):
-        raise credentials_exception
-
-    user = db.get(User, user_id)
-    if user is None:
-        raise credentials_exception
-
-    return user
+        claims = decode_access_token(token)
+    except ValueError:
+        raise _credentials_exception()
+    return await _load_principal(claims["sub"], db, cache)
+
+
+async def get_token_principal(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db),
+    cache: PrincipalCache | None = Depends(get_principal_cache),
+) -> Principal:
+    """
+    get_current_user for hot read paths: with AUTH_TRUST_TOKEN_CLAIMS the
+    signed claims of a recent token are enough, without any lookup.
+    """
+    try:
+        claims = decode_access_token(token)
+    except ValueError:
+        raise _credentials_exception()
+    if claims_are_trusted(claims):
+        return Principal(id=claims["sub"])
+    return await _load_principal(claims["sub"], db, cache)
 
 
 def get_rag_service(
-    db: Session = Depends(get_db),
+    sessionmaker: async_sessionmaker[AsyncSession] = Depends(get_async_sessionmaker),
     vector_store: OpenSearchVectorStore = Depends(get_vector_store),
     llm: LLMClient = Depends(get_llm_client),
+    embedder: EmbeddingClient = Depends(get_embedding_client),
+    answer_cache: AnswerCache | None = Depends(get_answer_cache),
+    container: Container = Depends(get_container),
 ) -> RAGService:
+    # a sessionmaker, not the request's session: /ask/stream runs the
+    # service inside the response body, after the request scope ended
     return RAGServiceOpenSearchImpl(
-        db=db,
+        sessionmaker=sessionmaker,
         vector_store=vector_store,
         llm=llm,
+        embedder=embedder,
+        answer_cache=answer_cache,
+        material_aliases=container.material_aliases,
     )
 
 
+def get_job_broker(db: AsyncSession = Depends(get_async_db)) -> JobBroker:
+    # the request's session: uploads commit the material and its job together
+    return DBJobBroker(db)
+
+
 def get_materials_service(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     vector_store: OpenSearchVectorStore = Depends(get_vector_store),
     storage: StorageBackend = Depends(get_storage_backend),
+    broker: JobBroker = Depends(get_job_broker),
 ) -> MaterialsService:
     return MaterialsServiceImpl(
         db=db,
         vector_store=vector_store,
         storage=storage,
+        broker=broker,
     )
 
 
-def get_wikipedia_client() -> WikipediaClient:
-    return WikipediaClient()
+def get_wikipedia_mirror(
+    container: Container = Depends(get_container),
+) -> WikipediaMirror | None:
+    return container.wikipedia_mirror
+
+
+def get_wikipedia_client(
+    db: AsyncSession = Depends(get_async_db),
+    mirror: WikipediaMirror | None = Depends(get_wikipedia_mirror),
+) -> WikipediaClient:
+    return WikipediaClient(
+        cache=DBSummaryCache(db),
+        mirror=mirror,
+    )
 
 
 def get_prereq_service(
@@ -135,7 +212,7 @@ def get_prereq_service(
 
 
 def get_session_service(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     prereq_service: PrereqService = Depends(get_prereq_service),
     wiki_client: WikipediaClient = Depends(get_wikipedia_client),
 ) -> SessionService:
@@ -0,0 +1,52 @@
+# app/core/pagination.py
+"""
+Keyset (cursor) pagination helpers.
+
+Lists are ordered newest first on (created_at, id). A cursor is the
+position of the last row of a page, so the next page is a range scan on
+an index instead of an OFFSET that re-reads every skipped row. Cursors are
+opaque to clients: url-safe base64 of a small JSON array.
+
+List endpoints keep returning a JSON array and put the cursor of the next
+page in the X-Next-Cursor response header (absent on the last page).
+"""
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Generic, List, Tuple, TypeVar
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+@dataclass
+class Page(Generic[T]):
+    items: List[T] = field(default_factory=list)
+    next_cursor: str | None = None
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Raise ValueError for anything encode_cursor didn't produce."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def clamp_limit(limit: int | None) -> int:
+    if limit is None:
+        return settings.PAGE_SIZE_DEFAULT
+    return max(1, min(limit, settings.PAGE_SIZE_MAX))
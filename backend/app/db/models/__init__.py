@@ -5,6 +5,9 @@ from app.db.models.refresh_token import RefreshToken
 from app.db.models.learning_session import LearningSession
 from app.db.models.learning_session_material import LearningSessionMaterial
 from app.db.models.prerequisite_node import PrerequisiteNode
+from app.db.models.embedding_cache_entry import EmbeddingCacheEntry
+from app.db.models.wikipedia_summary_entry import WikipediaSummaryEntry
+from app.db.models.stored_object import StoredObject
 
 __all__ = [
     "User",
@@ -13,4 +16,7 @@ __all__ = [
     "LearningSession",
     "LearningSessionMaterial",
     "PrerequisiteNode",
+    "EmbeddingCacheEntry",
+    "WikipediaSummaryEntry",
+    "StoredObject",
 ]
@@ -0,0 +1,17 @@
+# app/db/models/embedding_cache_entry.py
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, JSON
+
+from app.db.base import Base
+
+
+class EmbeddingCacheEntry(Base):
+    __tablename__ = "embedding_cache"
+
+    # Vectors from different models are not interchangeable.
+    model = Column(String(255), primary_key=True)
+    # sha256 of the embedded text
+    content_hash = Column(String(64), primary_key=True)
+
+    embedding = Column(JSON, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
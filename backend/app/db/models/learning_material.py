@@ -1,19 +1,39 @@
 # app/db/models/learning_material.py
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, Text
 from sqlalchemy.orm import relationship
 
 from app.db.base import Base
 
 class LearningMaterial(Base):
     __tablename__ = "learning_materials"
+    __table_args__ = (
+        # keyset pagination of a user's uploads, newest first
+        Index("ix_learning_materials_owner_created", "owner_id", "created_at", "id"),
+        # ingestion queue: claimable jobs by status and due time
+        Index("ix_learning_materials_status_available", "status", "available_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
 
     filename = Column(String(512), nullable=False)
     path = Column(String(1024), nullable=False)
+    # PENDING | PROCESSING | READY | FAILED, see app/workers/job_queue.py
     status = Column(String(50), default="PENDING", nullable=False)
+    # ingestion attempts so far
+    attempts = Column(Integer, default=0, nullable=False)
+    # PENDING: not claimable before this; PROCESSING: end of the lease
+    available_at = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+
+    # sha256 of the file; identical uploads share one stored blob
+    content_hash = Column(String(64), nullable=True, index=True)
+    # Set when the same file was already uploaded: this material reuses the
+    # canonical material's chunks and vectors instead of being ingested.
+    canonical_material_id = Column(
+        Integer, ForeignKey("learning_materials.id"), nullable=True
+    )
 
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(
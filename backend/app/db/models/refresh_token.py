@@ -1,6 +1,6 @@
 # app/db/models/refresh_token.py
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from app.db.base import Base
@@ -8,6 +8,11 @@ from app.db.base import Base
 
 class RefreshToken(Base):
     __tablename__ = "refresh_tokens"
+    __table_args__ = (
+        # token GC: expired rows, and revoked rows past their retention
+        Index("ix_refresh_tokens_expires_at", "expires_at"),
+        Index("ix_refresh_tokens_revoked_at", "revoked_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -19,9 +24,11 @@ class RefreshToken(Base):
     expires_at = Column(DateTime, nullable=False)
 
     revoked = Column(Boolean, default=False, nullable=False)
+    # set with `revoked`; GC retention counts from here, not from created_at
+    revoked_at = Column(DateTime, nullable=True)
 
-    # For token rotation
-    parent_jti = Column(String(64), nullable=True)
+    # For token rotation; parent_jti is indexed to walk a family downwards
+    parent_jti = Column(String(64), nullable=True, index=True)
     replaced_by_jti = Column(String(64), nullable=True)
 
     user = relationship("User", backref="refresh_tokens")
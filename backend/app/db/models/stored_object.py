@@ -0,0 +1,19 @@
+# app/db/models/stored_object.py
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, BigInteger
+
+from app.db.base import Base
+
+
+class StoredObject(Base):
+    """One blob in content-addressed storage, shared by identical uploads."""
+
+    __tablename__ = "stored_objects"
+
+    sha256 = Column(String(64), primary_key=True)
+    path = Column(String(1024), nullable=False)
+    size = Column(BigInteger, nullable=False)
+    # number of learning_materials pointing at this blob
+    ref_count = Column(Integer, nullable=False, default=0)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -0,0 +1,21 @@
+# app/db/models/wikipedia_summary_entry.py
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, Text
+
+from app.db.base import Base
+
+
+class WikipediaSummaryEntry(Base):
+    __tablename__ = "wikipedia_summaries"
+
+    language = Column(String(16), primary_key=True)
+    # normalize_title() of the looked up name
+    title_key = Column(String(255), primary_key=True)
+
+    # "found", "missing" (404) or "error"; the last two are negative entries
+    status = Column(String(16), nullable=False)
+    summary = Column(Text, nullable=True)
+    url = Column(String(1024), nullable=True)
+
+    fetched_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
@@ -1,12 +1,44 @@
 # app/db/session.py
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
 
+_ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+def engine_options(url: str) -> Dict[str, Any]:
+    """Pool settings from Settings. SQLite's pools don't take them."""
+    if make_url(url).get_backend_name() == "sqlite":
+        return {}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+
+
+def async_database_url() -> str:
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    url = make_url(settings.DATABASE_URL)
+    backend = url.get_backend_name()
+    return url.set(drivername=f"{backend}+{_ASYNC_DRIVERS[backend]}").render_as_string(
+        hide_password=False
+    )
+
+
 engine = create_engine(
     settings.DATABASE_URL,
     future=True,
+    **engine_options(settings.DATABASE_URL),
 )
 
 SessionLocal = sessionmaker(
@@ -22,3 +54,28 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+@lru_cache
+def get_async_engine() -> AsyncEngine:
+    # Created on first use: only processes serving async routes need the
+    # async driver.
+    url = async_database_url()
+    return create_async_engine(url, **engine_options(url))
+
+
+@lru_cache
+def get_async_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    # expire_on_commit=False: attributes stay readable after commit without
+    # an implicit (and, on AsyncSession, impossible) lazy refresh
+    return async_sessionmaker(get_async_engine(), autoflush=False, expire_on_commit=False)
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+
+async def close_async_engine() -> None:
+    if get_async_engine.cache_info().currsize:
+        await get_async_engine().dispose()
@@ -0,0 +1,68 @@
+# app/db/upsert.py
+from typing import Any, Dict, List, Sequence
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+
+def upsert(
+    db: Session,
+    model: Any,
+    rows: List[Dict[str, Any]],
+    index_elements: Sequence[str],
+    update_columns: Sequence[str] = (),
+    set_: Dict[str, Any] | None = None,
+) -> None:
+    """
+    INSERT `rows`; where a row with the same `index_elements` exists,
+    overwrite `update_columns` with the new values and apply `set_`
+    (column -> SQL expression, e.g. `Model.count + 1`) instead. With
+    neither, existing rows are left alone (ON CONFLICT DO NOTHING).
+
+    On PostgreSQL and SQLite this is a single INSERT ... ON CONFLICT,
+    which doesn't fail when another transaction inserts the same key
+    concurrently. Other databases fall back to session.merge(), which
+    only applies `update_columns`.
+    """
+    if not rows:
+        return
+    stmt = _statement(db.get_bind().dialect.name, model, rows, index_elements, update_columns, set_)
+    if stmt is None:
+        for row in rows:
+            db.merge(model(**row))
+        db.flush()
+        return
+    db.execute(stmt)
+
+
+async def async_upsert(
+    db: AsyncSession,
+    model: Any,
+    rows: List[Dict[str, Any]],
+    index_elements: Sequence[str],
+    update_columns: Sequence[str] = (),
+    set_: Dict[str, Any] | None = None,
+) -> None:
+    """upsert() for an AsyncSession."""
+    if not rows:
+        return
+    stmt = _statement(db.get_bind().dialect.name, model, rows, index_elements, update_columns, set_)
+    if stmt is None:
+        for row in rows:
+            await db.merge(model(**row))
+        await db.flush()
+        return
+    await db.execute(stmt)
+
+
+def _statement(dialect, model, rows, index_elements, update_columns, set_):
+    if dialect not in ("postgresql", "sqlite"):
+        return None
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    stmt = insert(model).values(rows)
+    if not update_columns and not set_:
+        return stmt.on_conflict_do_nothing(index_elements=list(index_elements))
+    values = {col: stmt.excluded[col] for col in update_columns}
+    values.update(set_ or {})
+    return stmt.on_conflict_do_update(index_elements=list(index_elements), set_=values)
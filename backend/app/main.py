@@ -1,16 +1,41 @@
 # app/main.py
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import Settings
 from app.api.v1.routes import auth, materials, learning, health
 from app.core.logging import configure_logging
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.container import build_container
+from app.db.session import close_async_engine
+from app.adapters.http.client_pool import close_http_client, get_http_client
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One outbound connection pool for the lifetime of the app, shared by
+    # the LLM / embedding adapters (keep-alive instead of a handshake per call).
+    get_http_client()
+    # Clients and caches shared by all requests (see app/core/deps.py).
+    container = app.state.container = build_container()
+    await asyncio.to_thread(container.startup)
+    try:
+        yield
+    finally:
+        container.close()
+        await close_http_client()
+        await close_async_engine()
+
 
 def create_app() -> FastAPI:
     configure_logging()
     app = FastAPI(
         title="open_learning_assistant",
         version="0.1.0",
+        lifespan=lifespan,
     )
 
     # CORS (adjust for your FE origin)
@@ -20,6 +45,7 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER],
     )
 
     # Routers
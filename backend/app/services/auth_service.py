@@ -39,3 +39,11 @@ class AuthService(ABC):
         Revoke a refresh token (e.g. on logout).
         """
         raise NotImplementedError
+
+    @abstractmethod
+    def revoke_token_family(self, jti: str) -> int:
+        """
+        Revoke every refresh token rotated from the same login as `jti`.
+        Returns the number of tokens revoked.
+        """
+        raise NotImplementedError
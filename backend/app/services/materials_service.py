@@ -1,8 +1,9 @@
 # app/services/materials_service.py
 from abc import ABC, abstractmethod
-from typing import List
 from fastapi import UploadFile
 
+from app.core.pagination import Page
+
 class MaterialsService(ABC):
     @abstractmethod
     async def upload_material(
@@ -14,5 +15,12 @@ class MaterialsService(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    async def list_materials(self, user_id: int) -> List[dict]:
+    async def list_materials(
+        self,
+        user_id: int,
+        limit: int | None = None,
+        cursor: str | None = None,
+        status: str | None = None,
+    ) -> Page[dict]:
+        """Newest first. Raises ValueError for an invalid cursor."""
         raise NotImplementedError
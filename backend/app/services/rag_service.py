@@ -1,6 +1,6 @@
 # app/services/rag_service.py
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from typing import AsyncIterator, List, Dict, Any
 
 class RAGService(ABC):
     @abstractmethod
@@ -13,3 +13,19 @@ class RAGService(ABC):
     ) -> Dict[str, Any]:
         """Return answer + sources + followups."""
         raise NotImplementedError
+
+    @abstractmethod
+    def stream_answer(
+        self,
+        user_id: int,
+        material_id: int,
+        topic_id: int | None,
+        question: str,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield events as the answer is generated:
+        {"event": "token", "data": {"text": str}} (repeated), then
+        {"event": "sources", ...}, {"event": "followups", ...} and
+        {"event": "done", ...}.
+        """
+        raise NotImplementedError
@@ -2,6 +2,8 @@
 from abc import ABC, abstractmethod
 from typing import List, Dict, Any
 
+from app.core.pagination import Page
+
 
 class SessionService(ABC):
     @abstractmethod
@@ -16,7 +18,13 @@ class SessionService(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    async def list_sessions(self, user_id: int) -> List[Dict[str, Any]]:
+    async def list_sessions(
+        self,
+        user_id: int,
+        limit: int | None = None,
+        cursor: str | None = None,
+    ) -> Page[Dict[str, Any]]:
+        """Newest first. Raises ValueError for an invalid cursor."""
         raise NotImplementedError
 
     @abstractmethod
@@ -0,0 +1,155 @@
+# app/services_impl/answer_cache.py
+"""
+Two-tier answer cache for the RAG service.
+
+1. Exact tier: (material, topic, normalised question) -> answer.
+2. Semantic tier: when an embedding of the question is available, a
+   question whose cosine similarity to an earlier question of the same
+   material/topic is at least `similarity_threshold` reuses that answer.
+
+Entries are scoped by a per-material generation. invalidate_material()
+bumps the generation, so answers built from the old chunks can't be
+returned again; they simply age out of the LRU. Generations live in a
+CacheBackend, like RetrievalCache's: with a shared backend, re-ingestion in
+a worker process invalidates the answers cached by every API process.
+
+Take scope() before retrieving and pass it to both get() and set(): an
+answer generated while the material is re-indexed is then stored under the
+generation it was read from, and is dropped with it.
+"""
+
+import math
+import re
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Tuple
+
+from app.core.cache import CacheBackend, InMemoryCacheBackend, TTLCache
+
+_PUNCT_RE = re.compile(r"[^\w\s]")
+_SPACE_RE = re.compile(r"\s+")
+
+Scope = Tuple[int, int | None, int]  # (material_id, topic_id, generation)
+
+
+def normalize_question(question: str) -> str:
+    text = _PUNCT_RE.sub(" ", question.lower())
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+def _unit(vector: List[float]) -> List[float]:
+    norm = math.sqrt(sum(v * v for v in vector))
+    return [v / norm for v in vector] if norm else vector
+
+
+class AnswerCache:
+    def __init__(
+        self,
+        max_entries: int = 5000,
+        ttl_seconds: float | None = 3600,
+        similarity_threshold: float = 0.92,
+        semantic_scan_limit: int = 128,
+        generations: CacheBackend | None = None,
+    ) -> None:
+        self.similarity_threshold = similarity_threshold
+        self.semantic_scan_limit = semantic_scan_limit
+        self._answers: TTLCache[Tuple[Scope, str], Dict[str, Any]] = TTLCache(
+            max_entries=max_entries,
+            ttl_seconds=ttl_seconds,
+        )
+        # scope -> most recent (unit embedding, normalised question)
+        self._vectors: Dict[Scope, Deque[Tuple[List[float], str]]] = {}
+        self._generations = generations or InMemoryCacheBackend()
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+
+    def get(
+        self,
+        material_id: int,
+        topic_id: int | None,
+        question: str,
+        embedding: List[float] | None = None,
+        scope: Scope | None = None,
+    ) -> Dict[str, Any] | None:
+        scope = scope or self.scope(material_id, topic_id)
+        key = normalize_question(question)
+
+        answer = self._answers.get((scope, key))
+        if answer is not None:
+            self.exact_hits += 1
+            return answer
+
+        if embedding is not None:
+            match = self._nearest(scope, _unit(embedding))
+            if match is not None:
+                answer = self._answers.get((scope, match))
+                if answer is not None:
+                    self.semantic_hits += 1
+                    return answer
+
+        self.misses += 1
+        return None
+
+    def set(
+        self,
+        material_id: int,
+        topic_id: int | None,
+        question: str,
+        answer: Dict[str, Any],
+        embedding: List[float] | None = None,
+        scope: Scope | None = None,
+    ) -> None:
+        scope = scope or self.scope(material_id, topic_id)
+        key = normalize_question(question)
+        self._answers.set((scope, key), answer)
+        if embedding is not None:
+            with self._lock:
+                if scope not in self._vectors:
+                    # drop vectors of this material/topic's older generations
+                    for stale in [s for s in self._vectors if s[:2] == scope[:2]]:
+                        del self._vectors[stale]
+                vectors = self._vectors.setdefault(
+                    scope, deque(maxlen=self.semantic_scan_limit)
+                )
+                vectors.append((_unit(embedding), key))
+
+    def invalidate_material(self, material_id: int) -> None:
+        self._generations.incr(self._generation_key(material_id))
+        with self._lock:
+            for scope in [s for s in self._vectors if s[0] == material_id]:
+                del self._vectors[scope]
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.exact_hits + self.semantic_hits + self.misses
+        hits = self.exact_hits + self.semantic_hits
+        return {
+            "entries": len(self._answers),
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "evictions": self._answers.evictions,
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
+
+    def scope(self, material_id: int, topic_id: int | None) -> Scope:
+        """The material/topic at its current generation."""
+        generation = int(self._generations.get(self._generation_key(material_id)) or 0)
+        return (material_id, topic_id, generation)
+
+    # --------- internal helpers ---------
+
+    @staticmethod
+    def _generation_key(material_id: int) -> str:
+        return f"answers:gen:{material_id}"
+
+    def _nearest(self, scope: Scope, unit: List[float]) -> str | None:
+        with self._lock:
+            candidates = list(self._vectors.get(scope, ()))
+        best_key, best_score = None, self.similarity_threshold
+        for vector, key in candidates:
+            score = sum(a * b for a, b in zip(unit, vector))
+            if score >= best_score:
+                best_key, best_score = key, score
+        return best_key
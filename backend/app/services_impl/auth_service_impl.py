@@ -1,10 +1,11 @@
 # app/services_impl/auth_service_impl.py
 from datetime import datetime, timedelta
-from typing import Optional, Dict
+from typing import Optional, Dict, Tuple
 import uuid
 
 from jose import jwt
 from passlib.context import CryptContext
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
@@ -55,11 +56,15 @@ class AuthServiceImpl(AuthService):
         )
         return encoded_jwt
 
-    def _create_refresh_token(
+    def _issue_refresh_token(
         self,
         user_id: int,
         parent_jti: Optional[str] = None,
-    ) -> str:
+    ) -> Tuple[str, str]:
+        """
+        Sign a refresh token and add its row to the session, uncommitted.
+        Returns (token, jti) so callers don't have to decode what we signed.
+        """
         now = datetime.utcnow()
         expire = now + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
         jti = uuid.uuid4().hex
@@ -74,7 +79,6 @@ class AuthServiceImpl(AuthService):
             parent_jti=parent_jti,
         )
         self.db.add(rt)
-        self.db.commit()
 
         payload = {
             "sub": str(user_id),
@@ -88,7 +92,47 @@ class AuthServiceImpl(AuthService):
             settings.REFRESH_TOKEN_SECRET_KEY,
             algorithm=settings.JWT_ALGORITHM,
         )
-        return encoded_jwt
+        return encoded_jwt, jti
+
+    def _rejection_reason(self, jti: str) -> str:
+        rt: RefreshToken | None = (
+            self.db.query(RefreshToken).filter(RefreshToken.jti == jti).first()
+        )
+        if not rt:
+            return "Refresh token not found"
+        if rt.revoked:
+            if rt.replaced_by_jti and settings.REFRESH_TOKEN_REUSE_REVOKES_FAMILY:
+                self.revoke_token_family(jti)
+            return "Refresh token revoked"
+        return "Refresh token expired"
+
+    @staticmethod
+    def _family_jtis(jti: str):
+        """
+        SELECT of every jti rotated from the same login as `jti`: its
+        ancestors through parent_jti, then everything descending from them.
+        UNION rather than UNION ALL keeps the walk finite on bad data.
+        """
+        ancestors = (
+            select(RefreshToken.jti, RefreshToken.parent_jti)
+            .where(RefreshToken.jti == jti)
+            .cte("ancestors", recursive=True)
+        )
+        parent = RefreshToken.__table__.alias("parent")
+        ancestors = ancestors.union(
+            select(parent.c.jti, parent.c.parent_jti).where(
+                parent.c.jti == ancestors.c.parent_jti
+            )
+        )
+
+        family = select(ancestors.c.jti).cte("family", recursive=True)
+        child = RefreshToken.__table__.alias("child")
+        family = family.union(
+            select(child.c.jti).where(child.c.parent_jti == family.c.jti)
+        )
+        # nested in the statement using it: sqlite reports no rowcount for
+        # an UPDATE that starts with WITH
+        return select(family.c.jti).add_cte(ancestors, family, nest_here=True)
 
     def _decode_refresh_token(self, token: str) -> dict:
         return jwt.decode(
@@ -133,7 +177,8 @@ class AuthServiceImpl(AuthService):
 
     def create_tokens(self, user_id: int) -> Dict[str, str]:
         access_token = self._create_access_token(user_id)
-        refresh_token = self._create_refresh_token(user_id)
+        refresh_token, _ = self._issue_refresh_token(user_id)
+        self.db.commit()
         return {
             "access_token": access_token,
             "refresh_token": refresh_token,
@@ -157,27 +202,28 @@ class AuthServiceImpl(AuthService):
         if not jti:
             raise ValueError("Missing jti")
 
-        rt: RefreshToken | None = (
-            self.db.query(RefreshToken).filter(RefreshToken.jti == jti).first()
-        )
-        if not rt:
-            raise ValueError("Refresh token not found")
-        if rt.revoked:
-            raise ValueError("Refresh token revoked")
-        if rt.expires_at < datetime.utcnow():
-            raise ValueError("Refresh token expired")
-
-        # Rotate: revoke old, create new
-        rt.revoked = True
-        new_refresh_token = self._create_refresh_token(
+        # Rotate in one transaction: add the new token, then revoke the old
+        # one only if it is still live. The UPDATE takes the row lock, so of
+        # two concurrent refreshes with the same token exactly one matches.
+        new_refresh_token, new_jti = self._issue_refresh_token(
             user_id=user_id,
-            parent_jti=rt.jti,
+            parent_jti=jti,
         )
-        # needed to get new jti for replaced_by_jti
-        new_payload = self._decode_refresh_token(new_refresh_token)
-        new_jti = new_payload.get("jti")
-        rt.replaced_by_jti = new_jti
-        self.db.add(rt)
+        now = datetime.utcnow()
+        rotated = self.db.execute(
+            update(RefreshToken)
+            .where(
+                RefreshToken.jti == jti,
+                RefreshToken.user_id == user_id,
+                RefreshToken.revoked.is_(False),
+                RefreshToken.expires_at >= now,
+            )
+            .values(revoked=True, revoked_at=now, replaced_by_jti=new_jti)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if rotated != 1:
+            self.db.rollback()
+            raise ValueError(self._rejection_reason(jti))
         self.db.commit()
 
         new_access_token = self._create_access_token(user_id)
@@ -187,10 +233,27 @@ class AuthServiceImpl(AuthService):
             "token_type": "bearer",
         }
 
+    def revoke_token_family(self, jti: str) -> int:
+        """
+        Revoke every token rotated from the same login as `jti`, in one
+        statement. Returns how many live tokens were revoked.
+        """
+        revoked = self.db.execute(
+            update(RefreshToken)
+            .where(
+                RefreshToken.jti.in_(self._family_jtis(jti)),
+                RefreshToken.revoked.is_(False),
+            )
+            .values(revoked=True, revoked_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        self.db.commit()
+        return revoked
+
     def revoke_refresh_token(self, refresh_token: str) -> None:
         """
-        On logout, revoke the given refresh token. You could extend this to
-        revoke an entire family using parent_jti if you want.
+        On logout, revoke the given refresh token and the rest of its family,
+        so an older token of the same login can't be used either.
         """
         try:
             payload = self._decode_refresh_token(refresh_token)
@@ -204,12 +267,4 @@ class AuthServiceImpl(AuthService):
         if not jti:
             return
 
-        rt: RefreshToken | None = (
-            self.db.query(RefreshToken).filter(RefreshToken.jti == jti).first()
-        )
-        if not rt:
-            return
-
-        rt.revoked = True
-        self.db.add(rt)
-        self.db.commit()
+        self.revoke_token_family(jti)
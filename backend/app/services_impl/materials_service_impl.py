@@ -1,59 +1,123 @@
 # app/services_impl/materials_service_impl.py
-from typing import List
 from fastapi import UploadFile
-from sqlalchemy.orm import Session
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.pagination import Page, clamp_limit, decode_cursor, encode_cursor
 from app.services.materials_service import MaterialsService
 from app.adapters.storage.object_storage import StorageBackend
+from app.workers.job_queue import JobBroker
 from app.db import models
+from app.db.upsert import async_upsert
 
 
 class MaterialsServiceImpl(MaterialsService):
     def __init__(
         self,
-        db: Session,
+        db: AsyncSession,
         vector_store,
         storage: StorageBackend,
+        broker: JobBroker | None = None,
     ) -> None:
         self.db = db
         self.storage = storage
         self.vector_store = vector_store
+        self.broker = broker
 
     async def upload_material(
         self,
         user_id: int,
         file: UploadFile,
     ) -> int:
-        # 1. store raw file via storage backend
-        path = await self.storage.save(file)
+        # 1. store raw file via storage backend (content addressed)
+        stored = await self.storage.store(file)
+        await self._add_blob_reference(stored.sha256, stored.path, stored.size)
 
-        # 2. create DB row
+        # 2. create DB row, reusing the chunks of an identical upload
+        canonical = await self._find_canonical(stored.sha256)
         material = models.learning_material.LearningMaterial(
             owner_id=user_id,
             filename=file.filename,
-            path=path,
-            status="PENDING",
+            path=stored.path,
+            content_hash=stored.sha256,
+            canonical_material_id=canonical.id if canonical else None,
+            # a duplicate of a READY material is usable right away; otherwise
+            # the worker flips it once the canonical one is ingested
+            status="READY" if canonical and canonical.status == "READY" else "PENDING",
         )
         self.db.add(material)
-        self.db.commit()
-        self.db.refresh(material)
+        await self.db.flush()
 
-        # 3. enqueue ingestion job (Celery/RQ) – left as TODO
-        # enqueue_ingestion_job(material.id)
+        # 3. enqueue ingestion job (python -m app.workers.runner picks it up),
+        # committed together with the material
+        if self.broker is not None and material.status == "PENDING":
+            await self.broker.async_enqueue(material.id)
+        await self.db.commit()
 
         return material.id
 
-    async def list_materials(self, user_id: int) -> List[dict]:
-        rows = (
-            self.db.query(models.learning_material.LearningMaterial)
-            .filter_by(owner_id=user_id)
-            .all()
+    async def _add_blob_reference(self, sha256: str, path: str, size: int) -> None:
+        StoredObject = models.stored_object.StoredObject
+        await async_upsert(
+            self.db,
+            StoredObject,
+            [{"sha256": sha256, "path": path, "size": size, "ref_count": 1}],
+            index_elements=["sha256"],
+            set_={"ref_count": StoredObject.ref_count + 1},
         )
-        return [
-            {
-                "id": m.id,
-                "filename": m.filename,
-                "status": m.status,
-            }
-            for m in rows
-        ]
+
+    async def _find_canonical(self, sha256: str):
+        """The first non-failed material with this content that isn't itself a duplicate."""
+        LearningMaterial = models.learning_material.LearningMaterial
+        return (await self.db.execute(
+            select(LearningMaterial.id, LearningMaterial.status)
+            .where(
+                LearningMaterial.content_hash == sha256,
+                LearningMaterial.canonical_material_id.is_(None),
+                LearningMaterial.status != "FAILED",
+            )
+            .order_by(LearningMaterial.id)
+            .limit(1)
+        )).first()
+
+    async def list_materials(
+        self,
+        user_id: int,
+        limit: int | None = None,
+        cursor: str | None = None,
+        status: str | None = None,
+    ) -> Page[dict]:
+        LearningMaterial = models.learning_material.LearningMaterial
+        limit = clamp_limit(limit)
+
+        # Plain tuples: no ORM identity map or change tracking per row.
+        stmt = (
+            select(
+                LearningMaterial.id,
+                LearningMaterial.filename,
+                LearningMaterial.status,
+                LearningMaterial.created_at,
+            )
+            .where(LearningMaterial.owner_id == user_id)
+            .order_by(LearningMaterial.created_at.desc(), LearningMaterial.id.desc())
+            .limit(limit + 1)
+        )
+        if status:
+            stmt = stmt.where(LearningMaterial.status == status)
+        if cursor:
+            created_at, last_id = decode_cursor(cursor)
+            stmt = stmt.where(
+                tuple_(LearningMaterial.created_at, LearningMaterial.id) < (created_at, last_id)
+            )
+
+        rows = (await self.db.execute(stmt)).all()
+        page = Page(
+            items=[
+                {"id": row.id, "filename": row.filename, "status": row.status}
+                for row in rows[:limit]
+            ]
+        )
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            page.next_cursor = encode_cursor(last.created_at, last.id)
+        return page
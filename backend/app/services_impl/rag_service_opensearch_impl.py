@@ -1,21 +1,35 @@
 # app/services_impl/rag_service_opensearch_impl.py
-from typing import Dict, Any
-from sqlalchemy.orm import Session
+import json
+import re
+from typing import AsyncIterator, Dict, Any, List, Tuple
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.db.models.learning_material import LearningMaterial
 from app.services.rag_service import RAGService
 from app.adapters.llm.base import LLMClient
+from app.adapters.embeddings.base import EmbeddingClient
 from app.adapters.vectorstore.opensearch_vectorstore import OpenSearchVectorStore
+from app.services_impl.answer_cache import AnswerCache, Scope
 
 class RAGServiceOpenSearchImpl(RAGService):
     def __init__(
         self,
-        db: Session,
+        sessionmaker: async_sessionmaker[AsyncSession],
         vector_store: OpenSearchVectorStore,
         llm: LLMClient,
+        embedder: EmbeddingClient | None = None,
+        answer_cache: AnswerCache | None = None,
+        material_aliases: TTLCache[int, int] | None = None,
     ) -> None:
-        self.db = db
+        self.sessionmaker = sessionmaker
         self.vector_store = vector_store
         self.llm = llm
+        self.embedder = embedder
+        self.answer_cache = answer_cache
+        self.material_aliases = material_aliases
 
     async def answer_question(
         self,
@@ -24,12 +38,157 @@ class RAGServiceOpenSearchImpl(RAGService):
         topic_id: int | None,
         question: str,
     ) -> Dict[str, Any]:
+        material_id, ready = await self._chunks_material_id(material_id)
+        embedding = await self._embed_question(question)
+        scope = self._cache_scope(material_id, topic_id, ready)
+        cached = self._cache_get(scope, question, embedding)
+        if cached is not None:
+            return cached
+
         # 1. retrieval
+        context_blocks, sources = self._retrieve(question, material_id, topic_id, embedding)
+
+        # 2. prompt LLM
+        prompt = self._build_prompt(question, context_blocks)
+        answer, followups = await self.llm.chat_with_followups(prompt)
+
+        result = {
+            "answer": answer,
+            "sources": sources,
+            "followups": followups,
+        }
+        if sources:
+            self._cache_set(scope, question, result, embedding)
+        return result
+
+    async def stream_answer(
+        self,
+        user_id: int,
+        material_id: int,
+        topic_id: int | None,
+        question: str,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        material_id, ready = await self._chunks_material_id(material_id)
+        embedding = await self._embed_question(question)
+        scope = self._cache_scope(material_id, topic_id, ready)
+        cached = self._cache_get(scope, question, embedding)
+        if cached is not None:
+            yield {"event": "token", "data": {"text": cached["answer"]}}
+            yield {"event": "sources", "data": {"sources": cached["sources"]}}
+            yield {"event": "followups", "data": {"followups": cached["followups"]}}
+            yield {"event": "done", "data": {"answer": cached["answer"]}}
+            return
+
+        context_blocks, sources = self._retrieve(question, material_id, topic_id, embedding)
+
+        # Stream plain text (JSON can't be shown until it is complete), then
+        # ask for followups in a second, short call.
+        prompt = self._build_prompt(question, context_blocks)
+        parts: List[str] = []
+        async for token in self.llm.stream_chat(prompt):
+            parts.append(token)
+            yield {"event": "token", "data": {"text": token}}
+        answer = "".join(parts)
+
+        yield {"event": "sources", "data": {"sources": sources}}
+        followups = await self._generate_followups(question, answer)
+        yield {"event": "followups", "data": {"followups": followups}}
+        yield {"event": "done", "data": {"answer": answer}}
+        if sources:
+            self._cache_set(
+                scope,
+                question,
+                {"answer": answer, "sources": sources, "followups": followups},
+                embedding,
+            )
+
+    async def _chunks_material_id(self, material_id: int) -> Tuple[int, bool]:
+        """
+        Duplicate uploads are searched (and cached) as their canonical
+        material. Returns (canonical id, READY?). The mapping of READY
+        materials is cached, so repeat questions stay off the DB.
+        """
+        if self.material_aliases is not None:
+            canonical = self.material_aliases.get(material_id)
+            if canonical is not None:
+                return canonical, True
+        async with self.sessionmaker() as db:
+            row = (
+                await db.execute(
+                    select(
+                        func.coalesce(
+                            LearningMaterial.canonical_material_id, LearningMaterial.id
+                        ),
+                        LearningMaterial.status,
+                    ).where(LearningMaterial.id == material_id)
+                )
+            ).first()
+        if row is None:
+            return material_id, False
+        canonical, status = row
+        ready = status == "READY"
+        if ready and self.material_aliases is not None:
+            self.material_aliases.set(material_id, canonical)
+        return canonical, ready
+
+    async def _embed_question(self, question: str) -> List[float] | None:
+        if self.embedder is None:
+            return None
+        return await self.embedder.embed_query(question)
+
+    def _cache_scope(
+        self, material_id: int, topic_id: int | None, ready: bool
+    ) -> Scope | None:
+        """
+        Taken before retrieval, so an answer built while the material is
+        re-indexed lands in the generation it was read from. Materials
+        still being ingested aren't cached at all.
+        """
+        if self.answer_cache is None or not ready:
+            return None
+        return self.answer_cache.scope(material_id, topic_id)
+
+    def _cache_get(
+        self,
+        scope: Scope | None,
+        question: str,
+        embedding: List[float] | None,
+    ) -> Dict[str, Any] | None:
+        if scope is None:
+            return None
+        material_id, topic_id, _ = scope
+        return self.answer_cache.get(material_id, topic_id, question, embedding, scope=scope)
+
+    def _cache_set(
+        self,
+        scope: Scope | None,
+        question: str,
+        result: Dict[str, Any],
+        embedding: List[float] | None,
+    ) -> None:
+        if scope is not None:
+            material_id, topic_id, _ = scope
+            self.answer_cache.set(
+                material_id, topic_id, question, result, embedding, scope=scope
+            )
+
+    def _retrieve(
+        self,
+        question: str,
+        material_id: int,
+        topic_id: int | None,
+        embedding: List[float] | None,
+    ) -> Tuple[List[str], List[Dict[str, Any]]]:
+        # hybrid when an embedder is configured, BM25 otherwise
+        search_kwargs: Dict[str, Any] = {}
+        if embedding is not None:
+            search_kwargs["query_embedding"] = embedding
         docs = self.vector_store.search(
             query=question,
             material_id=material_id,
             topic_id=topic_id,
-            k=5,
+            k=settings.RAG_TOP_K,
+            **search_kwargs,
         )
 
         context_blocks = [d["content"] for d in docs]
@@ -37,16 +196,30 @@ class RAGServiceOpenSearchImpl(RAGService):
             {"chunk_id": d["chunk_id"], "page": d.get("page")}
             for d in docs
         ]
+        return context_blocks, sources
 
-        # 2. prompt LLM
-        prompt = self._build_prompt(question, context_blocks)
-        answer, followups = await self.llm.chat_with_followups(prompt)
+    async def _generate_followups(self, question: str, answer: str) -> List[str]:
+        prompt = f"""
+A student asked: {question}
 
-        return {
-            "answer": answer,
-            "sources": sources,
-            "followups": followups,
-        }
+They were given this answer:
+{answer}
+
+Suggest 3 short followup questions for the student.
+Return ONLY a JSON list of strings.
+"""
+        try:
+            text = await self.llm.chat(prompt)
+        except Exception:
+            return []
+        match = re.search(r"\[.*\]", text, re.DOTALL)
+        if not match:
+            return []
+        try:
+            parsed = json.loads(match.group(0))
+        except json.JSONDecodeError:
+            return []
+        return [str(q) for q in parsed if q][:3]
 
     def _build_prompt(self, question: str, context_blocks: list[str]) -> str:
         context = "\n\n---\n\n".join(context_blocks)
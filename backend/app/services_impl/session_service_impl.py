@@ -1,10 +1,15 @@
 # app/services_impl/session_service_impl.py
 from __future__ import annotations
 
+from collections import deque
 from typing import List, Dict, Any
 
-from sqlalchemy.orm import Session
+from sqlalchemy import func, insert, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
+from app.core.pagination import Page, clamp_limit, decode_cursor, encode_cursor
 from app.services.session_service import SessionService
 from app.services.prereq_service import PrereqService, PrerequisiteSuggestion
 from app.adapters.wiki.wikipedia_client import WikipediaClient
@@ -14,7 +19,7 @@ from app.db import models
 class SessionServiceImpl(SessionService):
     def __init__(
         self,
-        db: Session,
+        db: AsyncSession,
         prereq_service: PrereqService,
         wiki_client: WikipediaClient,
     ) -> None:
@@ -33,7 +38,7 @@ class SessionServiceImpl(SessionService):
             raise ValueError("Select at least one learning material")
 
         unique_ids = list(dict.fromkeys(material_ids))
-        materials = self._get_user_materials(user_id, unique_ids)
+        materials = await self._get_user_materials(user_id, unique_ids)
         if len(materials) != len(unique_ids):
             raise ValueError("One or more materials were not found")
 
@@ -45,7 +50,7 @@ class SessionServiceImpl(SessionService):
             objective=objective,
         )
         self.db.add(session)
-        self.db.flush()
+        await self.db.flush()
 
         for material_id in unique_ids:
             material = material_map[material_id]
@@ -54,7 +59,7 @@ class SessionServiceImpl(SessionService):
                 material_id=material.id,
             )
             self.db.add(link)
-        self.db.flush()
+        await self.db.flush()
 
         material_descriptors = [
             {"filename": material_map[mid].filename} for mid in unique_ids
@@ -66,76 +71,204 @@ class SessionServiceImpl(SessionService):
             materials=material_descriptors,
         )
 
-        created_nodes = self._persist_prerequisites(session.id, suggestions)
-        self.db.commit()
-        self.db.refresh(session)
+        await self._persist_prerequisites(session.id, suggestions)
+        await self.db.commit()
 
-        session.prerequisite_nodes = created_nodes
-        return self._serialize_session(session)
+        return self._serialize_session(await self._load_session(user_id, session.id))
 
-    async def list_sessions(self, user_id: int) -> List[Dict[str, Any]]:
-        rows = (
-            self.db.query(models.learning_session.LearningSession)
-            .filter(models.learning_session.LearningSession.user_id == user_id)
-            .order_by(models.learning_session.LearningSession.created_at.desc())
-            .all()
-        )
-        return [self._serialize_session_summary(row) for row in rows]
+    async def list_sessions(
+        self,
+        user_id: int,
+        limit: int | None = None,
+        cursor: str | None = None,
+    ) -> Page[Dict[str, Any]]:
+        LearningSession = models.learning_session.LearningSession
+        Link = models.learning_session_material.LearningSessionMaterial
+        Node = models.prerequisite_node.PrerequisiteNode
+        limit = clamp_limit(limit)
 
-    async def get_session(self, user_id: int, session_id: int) -> Dict[str, Any]:
-        session = (
-            self.db.query(models.learning_session.LearningSession)
-            .filter(
-                models.learning_session.LearningSession.user_id == user_id,
-                models.learning_session.LearningSession.id == session_id,
+        # One query per page: counts come from correlated subqueries
+        # instead of loading both collections for every row.
+        material_count = (
+            select(func.count())
+            .where(Link.session_id == LearningSession.id)
+            .correlate(LearningSession)
+            .scalar_subquery()
+        )
+        prerequisite_count = (
+            select(func.count())
+            .where(Node.session_id == LearningSession.id)
+            .correlate(LearningSession)
+            .scalar_subquery()
+        )
+        stmt = (
+            select(
+                LearningSession.id,
+                LearningSession.title,
+                LearningSession.objective,
+                LearningSession.created_at,
+                material_count.label("material_count"),
+                prerequisite_count.label("prerequisite_count"),
             )
-            .first()
+            .where(LearningSession.user_id == user_id)
+            .order_by(LearningSession.created_at.desc(), LearningSession.id.desc())
+            .limit(limit + 1)
         )
+        if cursor:
+            created_at, last_id = decode_cursor(cursor)
+            stmt = stmt.where(tuple_(LearningSession.created_at, LearningSession.id) < (created_at, last_id))
+
+        rows = (await self.db.execute(stmt)).all()
+        page = Page(items=[self._serialize_session_summary(row) for row in rows[:limit]])
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            page.next_cursor = encode_cursor(last.created_at, last.id)
+        return page
+
+    async def get_session(self, user_id: int, session_id: int) -> Dict[str, Any]:
+        session = await self._load_session(user_id, session_id)
         if not session:
             raise ValueError("Learning session not found")
         return self._serialize_session(session)
 
-    def _get_user_materials(
+    async def _load_session(
+        self, user_id: int, session_id: int
+    ) -> models.learning_session.LearningSession | None:
+        """
+        Load a session with everything _serialize_session needs (3 queries).
+        Everything is loaded eagerly: an AsyncSession can't lazy load.
+        """
+        LearningSession = models.learning_session.LearningSession
+        Link = models.learning_session_material.LearningSessionMaterial
+        return (await self.db.scalars(
+            select(LearningSession)
+            .where(LearningSession.user_id == user_id, LearningSession.id == session_id)
+            .options(
+                selectinload(LearningSession.material_links).joinedload(Link.material),
+                selectinload(LearningSession.prerequisite_nodes),
+            )
+            # don't reuse collections cached in the identity map
+            .execution_options(populate_existing=True)
+        )).first()
+
+    async def _get_user_materials(
         self, user_id: int, material_ids: List[int]
     ) -> List[models.learning_material.LearningMaterial]:
-        rows = (
-            self.db.query(models.learning_material.LearningMaterial)
-            .filter(
-                models.learning_material.LearningMaterial.owner_id == user_id,
-                models.learning_material.LearningMaterial.id.in_(material_ids),
+        LearningMaterial = models.learning_material.LearningMaterial
+        rows = await self.db.scalars(
+            select(LearningMaterial).where(
+                LearningMaterial.owner_id == user_id,
+                LearningMaterial.id.in_(material_ids),
             )
-            .all()
         )
-        return rows
+        return list(rows)
 
-    def _persist_prerequisites(
+    async def _persist_prerequisites(
         self,
         session_id: int,
         suggestions: List[PrerequisiteSuggestion],
     ) -> List[models.prerequisite_node.PrerequisiteNode]:
-        stored: dict[str, models.prerequisite_node.PrerequisiteNode] = {}
-        for suggestion in suggestions:
-            summary, url = self.wiki_client.fetch_summary(suggestion.name)
-            node = models.prerequisite_node.PrerequisiteNode(
-                session_id=session_id,
-                name=suggestion.name,
-                description=suggestion.description,
-                wikipedia_summary=self._truncate(summary),
-                wikipedia_url=url,
+        """
+        Store the tree in two statements, whatever its size: one batched
+        INSERT ... RETURNING for all nodes, then one batched UPDATE of the
+        parent links.
+        """
+        ordered, parents = self._order_prerequisites(suggestions)
+        if not ordered:
+            return []
+
+        # All lookups run concurrently: latency is the slowest one, not the sum.
+        summaries = await self.wiki_client.fetch_summaries(
+            suggestion.name for suggestion in ordered
+        )
+
+        Node = models.prerequisite_node.PrerequisiteNode
+        rows = []
+        for suggestion in ordered:
+            summary, url = summaries.get(suggestion.name, (None, None))
+            rows.append(
+                {
+                    "session_id": session_id,
+                    "name": suggestion.name,
+                    "description": suggestion.description,
+                    "wikipedia_summary": self._truncate(summary),
+                    "wikipedia_url": url,
+                }
             )
-            self.db.add(node)
-            self.db.flush()
-            stored[suggestion.name.lower()] = node
+        # Names are unique per tree (see _order_prerequisites), so rows are
+        # matched by name instead of asking for RETURNING in parameter order,
+        # which SQLite can only do one row per statement.
+        by_name = {
+            node.name.lower(): node
+            for node in await self.db.scalars(insert(Node).returning(Node), rows)
+        }
+        nodes = [by_name[suggestion.name.lower()] for suggestion in ordered]
+
+        links = [
+            {"id": node.id, "parent_id": by_name[parents[key]].id}
+            for key, node in by_name.items()
+            if key in parents
+        ]
+        if links:
+            await self.db.execute(update(Node), links)
+        for key, node in by_name.items():
+            # the bulk UPDATE bypassed the identity map
+            parent = by_name[parents[key]].id if key in parents else None
+            set_committed_value(node, "parent_id", parent)
+        return nodes
 
+    def _order_prerequisites(
+        self,
+        suggestions: List[PrerequisiteSuggestion],
+    ) -> tuple[List[PrerequisiteSuggestion], Dict[str, str]]:
+        """
+        Return (suggestions parents-first, {child name: parent name}).
+
+        Names are compared case-insensitively and the first suggestion with a
+        name wins. Links to unknown parents, self-links and links closing a
+        cycle are dropped, so the result is always a forest.
+        """
+        by_name: Dict[str, PrerequisiteSuggestion] = {}
         for suggestion in suggestions:
-            if suggestion.parent:
-                child = stored.get(suggestion.name.lower())
-                parent = stored.get(suggestion.parent.lower())
-                if child and parent:
-                    child.parent_id = parent.id
-                    self.db.add(child)
-        self.db.flush()
-        return list(stored.values())
+            by_name.setdefault(suggestion.name.lower(), suggestion)
+
+        parents: Dict[str, str] = {}
+        children: Dict[str, List[str]] = {}
+        for key, suggestion in by_name.items():
+            parent = (suggestion.parent or "").lower()
+            if parent and parent != key and parent in by_name:
+                parents[key] = parent
+                children.setdefault(parent, []).append(key)
+
+        ordered: List[str] = []
+
+        def _place(root: str) -> None:
+            # breadth-first, so parents always come before their children
+            queue = deque([root])
+            while queue:
+                key = queue.popleft()
+                ordered.append(key)
+                queue.extend(children.get(key, []))
+
+        for key in by_name:
+            if key not in parents:
+                _place(key)
+
+        # Whatever is left hangs off a cycle. Walk up from it until a name
+        # repeats, cut that node's parent link and place its subtree.
+        placed = set(ordered)
+        for key in by_name:
+            if key in placed:
+                continue
+            node, seen = key, set()
+            while node not in seen:
+                seen.add(node)
+                node = parents[node]
+            children[parents.pop(node)].remove(node)
+            start = len(ordered)
+            _place(node)
+            placed.update(ordered[start:])
+        return [by_name[key] for key in ordered], parents
 
     def _serialize_session(self, session) -> Dict[str, Any]:
         materials = [
@@ -168,13 +301,13 @@ class SessionServiceImpl(SessionService):
             "prerequisites": nodes,
         }
 
-    def _serialize_session_summary(self, session) -> Dict[str, Any]:
+    def _serialize_session_summary(self, row) -> Dict[str, Any]:
         return {
-            "id": session.id,
-            "title": session.title,
-            "objective": session.objective,
-            "material_count": len(session.material_links),
-            "prerequisite_count": len(session.prerequisite_nodes),
+            "id": row.id,
+            "title": row.title,
+            "objective": row.objective,
+            "material_count": row.material_count,
+            "prerequisite_count": row.prerequisite_count,
         }
 
     def _truncate(self, text: str | None, limit: int = 600) -> str | None:
@@ -0,0 +1,289 @@
+# app/workers/chunking.py
+"""
+Chunking strategies for the ingestion pipeline.
+
+Every chunker consumes a stream of ExtractedPage objects and yields Chunk
+objects. Chunkers are generators, so they slot into the streaming
+pipeline in ingestion_worker without buffering the document.
+
+- FixedSizeChunker: fixed character windows (the original simple_chunk).
+- StructuredChunker: packs whole sentences into token-budgeted chunks.
+  It starts a new chunk at every heading and carries a few trailing
+  sentences over as overlap.
+"""
+
+from __future__ import annotations
+
+import re
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Iterable, Iterator, List
+
+from app.core.config import settings
+from app.workers.pdf_extraction import ExtractedPage
+
+# Rough stand-in for a subword tokenizer: words and punctuation marks each
+# count as one token.
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])[\"')\]]*\s+(?=[\"'(\[]?[A-Z0-9])")
+_NUMBERED_HEADING_RE = re.compile(r"^(\d+(\.\d+)*\.?|[IVXLC]+\.|Chapter \d+)\s+\S")
+_HEADING_MAX_WORDS = 12
+
+
+def count_tokens(text: str) -> int:
+    return len(_TOKEN_RE.findall(text))
+
+
+@dataclass
+class Chunk:
+    text: str
+    page: int | None = None  # page the chunk starts on
+    end_page: int | None = None
+    token_count: int | None = None
+
+
+class Chunker(ABC):
+    @abstractmethod
+    def chunk(self, pages: Iterable[ExtractedPage]) -> Iterator[Chunk]:
+        raise NotImplementedError
+
+
+class FixedSizeChunker(Chunker):
+    """
+    Streaming equivalent of simple_chunk(extract_text_from_pdf(...)).
+
+    Only the current, not yet emitted tail of the text is buffered.
+    """
+
+    def __init__(self, max_chars: int = 1500) -> None:
+        self.max_chars = max_chars
+
+    def chunk(self, pages: Iterable[ExtractedPage]) -> Iterator[Chunk]:
+        buffer = ""
+        buffer_page: int | None = None
+        last_page: int | None = None
+        for page in pages:
+            text = page.text if last_page is None else "\n" + page.text
+            last_page = page.number
+            if not buffer:
+                buffer_page = page.number
+            buffer += text
+            while len(buffer) >= self.max_chars:
+                yield Chunk(text=buffer[: self.max_chars], page=buffer_page, end_page=page.number)
+                buffer = buffer[self.max_chars :]
+                # The buffer was shorter than max_chars before this page was
+                # appended, so whatever is left started on this page.
+                buffer_page = page.number
+        if buffer:
+            yield Chunk(text=buffer, page=buffer_page, end_page=last_page)
+
+
+@dataclass
+class _Unit:
+    text: str
+    page: int
+    tokens: int
+    heading: bool = False
+    paragraph_start: bool = False
+
+
+class StructuredChunker(Chunker):
+    """
+    Sentence, paragraph and heading aware chunker.
+
+    Every sentence is tokenized once. The overlap is capped at
+    `overlap_tokens`, so each sentence is copied into a bounded number of
+    chunks and the whole pass is linear in the document length.
+    """
+
+    def __init__(self, max_tokens: int = 300, overlap_tokens: int = 40) -> None:
+        if max_tokens <= 0:
+            raise ValueError("max_tokens must be positive")
+        if not 0 <= overlap_tokens < max_tokens:
+            raise ValueError("overlap_tokens must be in [0, max_tokens)")
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+
+    def chunk(self, pages: Iterable[ExtractedPage]) -> Iterator[Chunk]:
+        current: Deque[_Unit] = deque()
+        current_tokens = 0
+        has_body = False  # headings alone never make a chunk
+
+        for unit in self._units(pages):
+            if unit.heading:
+                if has_body:
+                    yield self._emit(current)
+                    current.clear()
+                    current_tokens = 0
+                    has_body = False
+            elif current_tokens + unit.tokens > self.max_tokens and has_body:
+                yield self._emit(current)
+                budget = min(self.overlap_tokens, self.max_tokens - unit.tokens)
+                current_tokens = self._keep_overlap(current, budget)
+            current.append(unit)
+            current_tokens += unit.tokens
+            has_body = has_body or not unit.heading
+
+        if has_body:
+            yield self._emit(current)
+
+    # --------- internal helpers ---------
+
+    def _emit(self, units: Deque[_Unit]) -> Chunk:
+        parts: List[str] = []
+        previous: _Unit | None = None
+        for unit in units:
+            if previous is not None:
+                if previous.heading:
+                    parts.append("\n")
+                elif unit.heading or unit.paragraph_start:
+                    parts.append("\n\n")
+                else:
+                    parts.append(" ")
+            parts.append(unit.text)
+            previous = unit
+        return Chunk(
+            text="".join(parts).strip(),
+            page=units[0].page,
+            end_page=units[-1].page,
+            token_count=sum(u.tokens for u in units),
+        )
+
+    def _keep_overlap(self, units: Deque[_Unit], budget: int) -> int:
+        """Drop everything but the trailing sentences that fit in `budget` tokens."""
+        kept = 0
+        tail: List[_Unit] = []
+        while units:
+            unit = units.pop()
+            if unit.heading or kept + unit.tokens > budget:
+                break
+            tail.append(unit)
+            kept += unit.tokens
+        units.clear()
+        units.extend(reversed(tail))
+        return kept
+
+    def _units(self, pages: Iterable[ExtractedPage]) -> Iterator[_Unit]:
+        # a page can start in the middle of the previous page's sentence
+        after_break = True
+        for page in pages:
+            for block, heading in self._blocks(page.text, after_break):
+                if heading:
+                    yield _Unit(block, page.number, count_tokens(block), heading=True)
+                    continue
+                paragraph_start = True
+                for sentence in _SENTENCE_END_RE.split(block):
+                    sentence = sentence.strip()
+                    if not sentence:
+                        continue
+                    for unit in self._split_sentence(sentence, page.number):
+                        unit.paragraph_start = paragraph_start
+                        paragraph_start = False
+                        yield unit
+            lines = [line.strip() for line in page.text.splitlines() if line.strip()]
+            if lines:
+                after_break = self._ends_paragraph(lines[-1])
+
+    def _split_sentence(self, sentence: str, page: int) -> Iterator[_Unit]:
+        tokens = count_tokens(sentence)
+        if tokens <= self.max_tokens:
+            yield _Unit(sentence, page, tokens)
+            return
+        # A run-on "sentence" (tables, code, missing punctuation):
+        # fall back to word boundaries.
+        words: List[str] = []
+        words_tokens = 0
+        for word in sentence.split():
+            word_tokens = count_tokens(word)
+            if words and words_tokens + word_tokens > self.max_tokens:
+                yield _Unit(" ".join(words), page, words_tokens)
+                words, words_tokens = [], 0
+            words.append(word)
+            words_tokens += word_tokens
+        if words:
+            yield _Unit(" ".join(words), page, words_tokens)
+
+    def _blocks(self, text: str, after_break: bool = True) -> Iterator[tuple[str, bool]]:
+        """
+        Yield (paragraph_text, is_heading) for one page of extracted text.
+
+        `after_break`: whether the previous page ended a paragraph.
+        """
+        lines = [raw.strip() for raw in text.splitlines()]
+        paragraph: List[str] = []
+        for i, line in enumerate(lines):
+            if not line:
+                if paragraph:
+                    yield self._join_lines(paragraph), False
+                    paragraph = []
+                after_break = True
+                continue
+            before = paragraph[-1] if paragraph else None
+            after = lines[i + 1] if i + 1 < len(lines) else ""
+            if self._is_heading(line, before, after, after_break):
+                if paragraph:
+                    yield self._join_lines(paragraph), False
+                    paragraph = []
+                yield line, True
+                after_break = True
+                continue
+            paragraph.append(line)
+        if paragraph:
+            yield self._join_lines(paragraph), False
+
+    def _join_lines(self, lines: List[str]) -> str:
+        # Re-join words PyMuPDF split with a hyphen at the end of a line.
+        parts = [lines[0]]
+        for line in lines[1:]:
+            prev = parts[-1]
+            if prev.endswith("-") and len(prev) > 1 and prev[-2].isalpha():
+                parts[-1] = prev[:-1]
+            else:
+                parts.append(" ")
+            parts.append(line)
+        return "".join(parts)
+
+    def _is_heading(
+        self, line: str, before: str | None, after: str, after_break: bool
+    ) -> bool:
+        """
+        A heading stands alone: it follows a paragraph boundary and is
+        followed by one or by a capitalised line. Otherwise a wrapped line
+        that happens to start with a number ("...showed that / 3 of the
+        samples") or a running header would split a sentence.
+        """
+        if before is not None and not self._ends_paragraph(before):
+            return False
+        if before is None and not after_break:
+            return False
+        if after and not after[0].isupper() and not _NUMBERED_HEADING_RE.match(after):
+            return False
+        return self._looks_like_heading(line)
+
+    @staticmethod
+    def _ends_paragraph(line: str) -> bool:
+        return line[-1] in ".!?:\"')]"
+
+    def _looks_like_heading(self, line: str) -> bool:
+        if line[-1] in ".,;:!?":
+            return False
+        words = line.split()
+        if len(words) > _HEADING_MAX_WORDS:
+            return False
+        if _NUMBERED_HEADING_RE.match(line):
+            return True
+        letters = [c for c in line if c.isalpha()]
+        return len(letters) >= 3 and all(c.isupper() for c in letters)
+
+
+def get_chunker(name: str | None = None) -> Chunker:
+    name = name or settings.CHUNKER
+    if name == "fixed":
+        return FixedSizeChunker(max_chars=settings.CHUNK_MAX_CHARS)
+    if name == "structured":
+        return StructuredChunker(
+            max_tokens=settings.CHUNK_MAX_TOKENS,
+            overlap_tokens=settings.CHUNK_OVERLAP_TOKENS,
+        )
+    raise ValueError(f"Unknown chunker: {name}")
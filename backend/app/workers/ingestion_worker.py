@@ -4,21 +4,51 @@ Skeleton ingestion worker.
 
 Later you can turn this into a Celery/RQ worker or a simple cron job
 that scans for PENDING learning_materials and processes them.
+
+The pipeline is pull-based end to end:
+
+    iter_pdf_pages -> Chunker.chunk -> batched -> EmbeddingClient.embed
+        -> OpenSearchVectorStore.index_chunks
+
+Each stage is a generator, so a stage only produces more work when the
+next one asks for it. Memory is bounded by one batch of chunks, the bulk
+requests in flight and the extraction shards in flight, no matter how
+large the document is.
 """
 
-import fitz  # PyMuPDF
+import asyncio
+from functools import lru_cache
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, TypeVar
+
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
+from app.core.cache import invalidate_material
+from app.core.container import Container, build_container
 from app.db.session import SessionLocal
 from app.db.models.learning_material import LearningMaterial
+from app.adapters.embeddings.base import EmbeddingClient
+from app.adapters.embeddings.cache import DBEmbeddingCache
+from app.adapters.embeddings.factory import create_embedding_client
+from app.adapters.http.client_pool import close_http_client
+from app.adapters.vectorstore.opensearch_vectorstore import OpenSearchVectorStore
+from app.workers.chunking import Chunk, Chunker, get_chunker
+from app.workers.job_queue import PROCESSING, READY, Lease, LeaseLost
+from app.workers.pdf_extraction import ExtractionStats, iter_pdf_pages
+
+T = TypeVar("T")
 
 
-def extract_text_from_pdf(path: str) -> str:
-    doc = fitz.open(path)
-    texts: list[str] = []
-    for page in doc:
-        texts.append(page.get_text())
-    return "\n".join(texts)
+def extract_text_from_pdf(
+    path: str,
+    workers: int | None = None,
+    stats: ExtractionStats | None = None,
+) -> str:
+    return "\n".join(
+        page.text for page in iter_pdf_pages(path, workers=workers, stats=stats)
+    )
 
 
 def simple_chunk(text: str, max_chars: int = 1500) -> list[str]:
@@ -31,7 +61,174 @@ def simple_chunk(text: str, max_chars: int = 1500) -> list[str]:
     return chunks
 
 
-def process_material(material_id: int) -> None:
+def batched(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    it = iter(items)
+    while True:
+        batch = list(islice(it, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _chunk_docs(
+    material_id: int,
+    chunks: Iterable[Chunk],
+    batch_size: int,
+    embed: Callable[[List[str]], List[List[float]]] | None,
+    on_batch: Callable[[], None] | None = None,
+) -> Iterator[Dict[str, Any]]:
+    seq = 0
+    for batch in batched(chunks, batch_size):
+        if on_batch:
+            on_batch()
+        texts = [chunk.text for chunk in batch]
+        embeddings = embed(texts) if embed else [None] * len(batch)
+        for chunk, embedding in zip(batch, embeddings):
+            yield {
+                "material_id": material_id,
+                "topic_id": None,
+                "chunk_id": f"{material_id}-{seq}",
+                "seq": seq,
+                "content": chunk.text,
+                "embedding": embedding,
+                "page": chunk.page,
+            }
+            seq += 1
+
+
+def ingest_material(
+    db: Session,
+    material: LearningMaterial,
+    vector_store: OpenSearchVectorStore,
+    batch_size: int | None = None,
+    workers: int | None = None,
+    chunker: Chunker | None = None,
+    embedder: EmbeddingClient | None = None,
+    path: str | None = None,
+    lease: Lease | None = None,
+) -> int:
+    """
+    Stream `material` through extract -> chunk -> embed -> bulk index and
+    mark it READY. Without an `embedder` chunks are indexed text-only.
+    `path` is a local copy of the file, for materials kept in object storage.
+
+    With the job queue's `lease`, the lease is renewed before every batch
+    and READY is only written while it is still ours; otherwise LeaseLost
+    is raised.
+
+    Returns the number of chunks indexed.
+    """
+    batch_size = batch_size or settings.INGESTION_BATCH_SIZE
+    chunker = chunker or get_chunker()
+    stats = ExtractionStats()
+
+    pages = iter_pdf_pages(path or material.path, workers=workers, stats=stats)
+    chunks = chunker.chunk(pages)
+
+    # One event loop for the whole material, so async clients can keep
+    # their connections alive between batches.
+    with asyncio.Runner() as runner:
+
+        def embed(texts: List[str]) -> List[List[float]]:
+            vectors = runner.run(embedder.embed(texts))
+            # keep newly cached vectors even if a later batch fails
+            db.commit()
+            return vectors
+
+        try:
+            result = vector_store.index_chunks(
+                _chunk_docs(
+                    material.id,
+                    chunks,
+                    batch_size,
+                    embed if embedder else None,
+                    on_batch=lease.renew if lease else None,
+                )
+            )
+        finally:
+            runner.run(close_http_client())
+    indexed = result.indexed
+
+    print(
+        f"Extracted {stats.pages} pages in {stats.elapsed:.2f}s "
+        f"({stats.pages_per_sec:.1f} pages/sec, {stats.workers} workers), "
+        f"indexed {indexed} chunks in {result.requests} bulk requests"
+    )
+    if result.errors:
+        first = result.errors[0]
+        raise RuntimeError(
+            f"{len(result.errors)} chunks of material {material.id} failed to index "
+            f"(first: {first.chunk_id} status={first.status} error={first.error})"
+        )
+    # a previous ingestion of this material may have produced more chunks
+    vector_store.delete_stale_chunks(material.id, keep=indexed)
+
+    ready = update(LearningMaterial).where(LearningMaterial.id == material.id)
+    if lease is not None:
+        ready = ready.where(
+            LearningMaterial.status == PROCESSING,
+            LearningMaterial.available_at == lease.lease_until,
+        )
+    if not db.execute(ready.values(status=READY)).rowcount:
+        db.rollback()
+        raise LeaseLost(f"Lost the lease on material {material.id}")
+    # identical uploads made meanwhile search these same chunks
+    db.execute(
+        update(LearningMaterial)
+        .where(
+            LearningMaterial.canonical_material_id == material.id,
+            LearningMaterial.status != READY,
+        )
+        .values(status=READY)
+    )
+    db.commit()
+    # Drop cached answers and search results built from the previous chunks.
+    invalidate_material(material.id)
+    return indexed
+
+
+def reuse_canonical(db: Session, material: LearningMaterial) -> bool:
+    """
+    Handle a material whose file was already uploaded.
+
+    Returns True when there is nothing to ingest: the canonical material is
+    ready (this one is marked READY too) or still being ingested (this one
+    is marked READY with it). If the canonical material failed, this one
+    takes over as canonical for every copy and is ingested normally.
+    """
+    if material.canonical_material_id is None:
+        return False
+
+    canonical = db.get(LearningMaterial, material.canonical_material_id)
+    if canonical is not None and canonical.status == "READY":
+        material.status = "READY"
+        db.commit()
+        return True
+    if canonical is not None and canonical.status != "FAILED":
+        return True
+
+    db.execute(
+        update(LearningMaterial)
+        .where(
+            LearningMaterial.canonical_material_id == material.canonical_material_id,
+            LearningMaterial.id != material.id,
+        )
+        .values(canonical_material_id=material.id)
+    )
+    material.canonical_material_id = None
+    db.commit()
+    return False
+
+
+@lru_cache
+def get_worker_container() -> Container:
+    """The same resources the API builds at startup, once per worker process."""
+    container = build_container()
+    container.startup()
+    return container
+
+
+def process_material(material_id: int, lease: Lease | None = None) -> None:
     db: Session = SessionLocal()
     try:
         material = db.get(LearningMaterial, material_id)
@@ -39,18 +236,22 @@ def process_material(material_id: int) -> None:
             print(f"Material {material_id} not found")
             return
 
-        print(f"Processing material {material_id}: {material.path}")
-        text = extract_text_from_pdf(material.path)
-        chunks = simple_chunk(text)
-
-        # TODO: for each chunk:
-        #  - generate embedding with your chosen model
-        #  - store chunk metadata in DB (content_chunks table)
-        #  - index into OpenSearchVectorStore
+        if reuse_canonical(db, material):
+            print(
+                f"Material {material_id} reuses the chunks of material "
+                f"{material.canonical_material_id} ({material.status})"
+            )
+            return
 
-        material.status = "READY"
-        db.add(material)
-        db.commit()
+        print(f"Processing material {material_id}: {material.path}")
+        container = get_worker_container()
+        embedder = create_embedding_client(cache=DBEmbeddingCache(db))
+        # PyMuPDF needs a real file; object storage downloads it here
+        with container.storage.local_copy(material.path) as path:
+            # with a shared retrieval cache backend this invalidates every API node
+            ingest_material(
+                db, material, container.vector_store, embedder=embedder, path=path, lease=lease
+            )
         print(f"Material {material_id} marked as READY")
     finally:
         db.close()
@@ -0,0 +1,271 @@
+# app/workers/job_queue.py
+"""
+Ingestion job queue.
+
+A material is its own job: `learning_materials.status` is the queue state.
+
+    PENDING     waiting; claimable once `available_at` has passed
+    PROCESSING  claimed; `available_at` is the end of the lease
+    READY       ingested
+    FAILED      dead-lettered after JOB_MAX_ATTEMPTS attempts
+
+A worker that crashes or hangs loses its lease when `available_at` passes
+and the job is claimed again (visibility timeout). Handlers of long jobs
+renew the lease as they make progress (Lease.renew) and fence their final
+writes on it, so a job that outlived its lease is neither done twice nor
+overwritten by the worker that lost it. Failed attempts go back
+to PENDING with exponential backoff. Claims use SELECT ... FOR UPDATE SKIP
+LOCKED where the database has it, so workers never wait on each other's
+rows, and are fenced with a conditional UPDATE, so two workers can't both
+win the same job on databases without row locks (SQLite).
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable
+
+from sqlalchemy import exists, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased
+
+from app.core.config import settings
+from app.db.models.learning_material import LearningMaterial
+
+PENDING = "PENDING"
+PROCESSING = "PROCESSING"
+READY = "READY"
+FAILED = "FAILED"
+
+
+@dataclass(frozen=True)
+class Job:
+    material_id: int
+    # including this one
+    attempts: int
+    # end of the visibility timeout; also identifies this claim
+    lease_until: datetime
+
+
+class LeaseLost(Exception):
+    """The job was claimed by another worker after our lease expired."""
+
+
+class JobBroker(ABC):
+    """Where ingestion jobs are queued and claimed."""
+
+    @abstractmethod
+    def enqueue(self, material_id: int) -> None:
+        """Queue (or re-queue) a material for ingestion."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def async_enqueue(self, material_id: int) -> None:
+        """
+        enqueue() from async code, as part of the caller's transaction, so a
+        material row is never committed without its job. No commit here.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def claim(self) -> Job | None:
+        """Take the next available job for one visibility timeout, if any."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def renew(self, job: Job) -> Job:
+        """Extend the job's lease by one visibility timeout. Raises LeaseLost."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def complete(self, job: Job) -> None:
+        """Release a job whose handler returned normally."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def fail(self, job: Job, error: str) -> None:
+        """Retry the job later, or dead-letter it once out of attempts."""
+        raise NotImplementedError
+
+
+class Lease:
+    """A claimed job as its handler sees it: the current lease, and renew()."""
+
+    def __init__(self, broker: JobBroker, job: Job) -> None:
+        self.broker = broker
+        self.job = job
+
+    @property
+    def material_id(self) -> int:
+        return self.job.material_id
+
+    @property
+    def lease_until(self) -> datetime:
+        return self.job.lease_until
+
+    def renew(self) -> None:
+        self.job = self.broker.renew(self.job)
+
+
+class DBJobBroker(JobBroker):
+    """
+    JobBroker on the learning_materials table. Commits its own changes,
+    except async_enqueue(), which needs `db` to be an AsyncSession.
+    """
+
+    def __init__(
+        self,
+        db: Session | AsyncSession,
+        visibility_timeout: float | None = None,
+        max_attempts: int | None = None,
+        backoff_base: float | None = None,
+        backoff_max: float | None = None,
+        clock: Callable[[], datetime] = datetime.utcnow,
+    ) -> None:
+        self.db = db
+        self.visibility_timeout = timedelta(
+            seconds=visibility_timeout or settings.JOB_VISIBILITY_TIMEOUT_SECONDS
+        )
+        self.max_attempts = max(1, max_attempts or settings.JOB_MAX_ATTEMPTS)
+        self.backoff_base = backoff_base or settings.JOB_BACKOFF_BASE_SECONDS
+        self.backoff_max = backoff_max or settings.JOB_BACKOFF_MAX_SECONDS
+        self.clock = clock
+
+    def enqueue(self, material_id: int) -> None:
+        self.db.execute(self._enqueue_statement(material_id))
+        self.db.commit()
+
+    async def async_enqueue(self, material_id: int) -> None:
+        await self.db.execute(self._enqueue_statement(material_id))
+
+    def _enqueue_statement(self, material_id: int):
+        return (
+            update(LearningMaterial)
+            .where(LearningMaterial.id == material_id, LearningMaterial.status != PROCESSING)
+            .values(status=PENDING, attempts=0, available_at=self.clock(), last_error=None)
+        )
+
+    def claim(self) -> Job | None:
+        while True:
+            now = self.clock()
+            row = self.db.execute(
+                self._claimable(now)
+                .order_by(LearningMaterial.available_at, LearningMaterial.id)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+            ).first()
+            if row is None:
+                self.db.rollback()
+                return None
+
+            if row.status == PROCESSING and row.attempts >= self.max_attempts:
+                # the last attempt timed out (the worker died or hung)
+                self._finish(
+                    row.id, row.status, row.available_at, FAILED,
+                    last_error="visibility timeout expired",
+                )
+                continue
+
+            lease_until = now + self.visibility_timeout
+            claimed = self.db.execute(
+                update(LearningMaterial)
+                .where(
+                    LearningMaterial.id == row.id,
+                    LearningMaterial.status == row.status,
+                    LearningMaterial.attempts == row.attempts,
+                )
+                .values(status=PROCESSING, attempts=row.attempts + 1, available_at=lease_until)
+            ).rowcount
+            self.db.commit()
+            if claimed:
+                return Job(row.id, row.attempts + 1, lease_until)
+            # another worker got there first; try the next one
+
+    def renew(self, job: Job) -> Job:
+        lease_until = self.clock() + self.visibility_timeout
+        renewed = self.db.execute(
+            update(LearningMaterial)
+            .where(
+                LearningMaterial.id == job.material_id,
+                LearningMaterial.status == PROCESSING,
+                LearningMaterial.available_at == job.lease_until,
+            )
+            .values(available_at=lease_until)
+        ).rowcount
+        self.db.commit()
+        if not renewed:
+            raise LeaseLost(f"Lost the lease on material {job.material_id}")
+        return Job(job.material_id, job.attempts, lease_until)
+
+    def complete(self, job: Job) -> None:
+        # The handler marks the material READY itself. A material still in
+        # PROCESSING is a duplicate that waits for its canonical material,
+        # which flips it to READY when done.
+        self._finish(job.material_id, PROCESSING, job.lease_until, PENDING, available_at=None)
+
+    def fail(self, job: Job, error: str) -> None:
+        if job.attempts >= self.max_attempts:
+            self._finish(
+                job.material_id, PROCESSING, job.lease_until, FAILED,
+                last_error=error, available_at=None,
+            )
+            return
+        self._finish(
+            job.material_id, PROCESSING, job.lease_until, PENDING,
+            last_error=error, available_at=self.clock() + self.backoff(job.attempts),
+        )
+
+    def backoff(self, attempts: int) -> timedelta:
+        """Delay before the retry that follows attempt number `attempts`."""
+        return timedelta(seconds=min(self.backoff_max, self.backoff_base * 2 ** (attempts - 1)))
+
+    def _claimable(self, now: datetime):
+        canonical = aliased(LearningMaterial)
+        return select(
+            LearningMaterial.id,
+            LearningMaterial.status,
+            LearningMaterial.attempts,
+            LearningMaterial.available_at,
+        ).where(
+            or_(
+                (LearningMaterial.status == PENDING)
+                & (
+                    LearningMaterial.available_at.is_(None)
+                    | (LearningMaterial.available_at <= now)
+                ),
+                # lease expired
+                (LearningMaterial.status == PROCESSING) & (LearningMaterial.available_at <= now),
+            ),
+            # duplicates wait for their canonical material, unless it failed
+            # and one of them has to take over
+            or_(
+                LearningMaterial.canonical_material_id.is_(None),
+                exists().where(
+                    canonical.id == LearningMaterial.canonical_material_id,
+                    canonical.status == FAILED,
+                ),
+            ),
+        )
+
+    def _finish(
+        self,
+        material_id: int,
+        status: str,
+        lease_until: datetime,
+        new_status: str,
+        **values,
+    ) -> None:
+        # Only while we still hold the claim: after our lease expired the
+        # job may belong to another worker.
+        self.db.execute(
+            update(LearningMaterial)
+            .where(
+                LearningMaterial.id == material_id,
+                LearningMaterial.status == status,
+                LearningMaterial.available_at == lease_until,
+            )
+            .values(status=new_status, **values)
+        )
+        self.db.commit()
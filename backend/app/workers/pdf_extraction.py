@@ -0,0 +1,134 @@
+# app/workers/pdf_extraction.py
+"""
+Page-sharded PDF text extraction.
+
+A PyMuPDF document can't be shared between processes, so every pool worker
+opens the file itself and extracts one contiguous page range ("shard").
+Shards are submitted to a process pool and their pages are yielded back in
+document order, so callers can stream pages without waiting for the whole
+book.
+"""
+
+from __future__ import annotations
+
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Deque, Iterator, List, Tuple
+
+import fitz  # PyMuPDF
+
+from app.core.config import settings
+
+
+@dataclass
+class ExtractedPage:
+    number: int  # 1-based, like the page numbers students see
+    text: str
+
+
+@dataclass
+class ExtractionStats:
+    pages: int = 0
+    shards: int = 0
+    workers: int = 1
+    started_at: float = field(default_factory=time.perf_counter)
+    finished_at: float | None = None
+
+    @property
+    def elapsed(self) -> float:
+        end = self.finished_at if self.finished_at is not None else time.perf_counter()
+        return end - self.started_at
+
+    @property
+    def pages_per_sec(self) -> float:
+        elapsed = self.elapsed
+        return self.pages / elapsed if elapsed > 0 else 0.0
+
+
+def count_pages(path: str) -> int:
+    with fitz.open(path) as doc:
+        return doc.page_count
+
+
+def page_ranges(page_count: int, shard_size: int) -> List[Tuple[int, int]]:
+    """Split [0, page_count) into half-open ranges of at most shard_size pages."""
+    return [
+        (start, min(start + shard_size, page_count))
+        for start in range(0, page_count, shard_size)
+    ]
+
+
+def _extract_range(path: str, start: int, stop: int) -> List[str]:
+    # Runs inside a pool worker.
+    with fitz.open(path) as doc:
+        return [doc[i].get_text() for i in range(start, stop)]
+
+
+def _resolve_workers(workers: int | None) -> int:
+    # every runner process has its own pool: share the cores between them
+    default = (os.cpu_count() or 1) // max(1, settings.INGESTION_WORKER_CONCURRENCY)
+    workers = workers or settings.INGESTION_EXTRACT_WORKERS or default
+    return max(1, workers)
+
+
+def iter_pdf_pages(
+    path: str,
+    workers: int | None = None,
+    shard_size: int | None = None,
+    stats: ExtractionStats | None = None,
+) -> Iterator[ExtractedPage]:
+    """
+    Yield the pages of `path` in order.
+
+    With more than one worker, page ranges are fanned out to a process pool.
+    At most `2 * workers` shards are in flight at a time so a slow consumer
+    doesn't cause the whole document to pile up in memory.
+
+    Pass an ExtractionStats instance to read page counts and throughput
+    (pages/sec) once the generator is exhausted.
+    """
+    stats = stats if stats is not None else ExtractionStats()
+    shard_size = max(1, shard_size or settings.INGESTION_PAGES_PER_SHARD)
+
+    ranges = page_ranges(count_pages(path), shard_size)
+    workers = min(_resolve_workers(workers), max(1, len(ranges)))
+    stats.workers = workers
+    stats.shards = len(ranges)
+
+    if workers == 1:
+        # Not worth a process pool – extract in-process.
+        with fitz.open(path) as doc:
+            for i, page in enumerate(doc):
+                stats.pages += 1
+                yield ExtractedPage(number=i + 1, text=page.get_text())
+        stats.finished_at = time.perf_counter()
+        return
+
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        remaining = iter(ranges)
+        in_flight: Deque[Tuple[int, Future]] = deque()
+
+        def _submit_next() -> None:
+            shard = next(remaining, None)
+            if shard is not None:
+                start, stop = shard
+                in_flight.append((start, pool.submit(_extract_range, path, start, stop)))
+
+        for _ in range(workers * 2):
+            _submit_next()
+
+        while in_flight:
+            start, future = in_flight.popleft()
+            texts = future.result()
+            _submit_next()
+            for offset, text in enumerate(texts):
+                stats.pages += 1
+                yield ExtractedPage(number=start + offset + 1, text=text)
+    finally:
+        # Also reached when the consumer stops early: drop queued shards.
+        pool.shutdown(wait=True, cancel_futures=True)
+        stats.finished_at = time.perf_counter()
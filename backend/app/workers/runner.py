@@ -0,0 +1,102 @@
+# app/workers/runner.py
+"""
+Ingestion worker pool.
+
+    python -m app.workers.runner --concurrency 4
+
+Starts `concurrency` worker processes that claim jobs from the queue (see
+app/workers/job_queue.py) and ingest them. Throughput scales by running
+more processes here or more copies of this command on other hosts; they
+coordinate through the database only. SIGINT/SIGTERM stop the workers
+after their current job.
+"""
+
+import argparse
+import multiprocessing
+import signal
+import traceback
+from typing import Callable
+
+from app.core.config import settings
+from app.db.session import SessionLocal, engine
+from app.workers.ingestion_worker import process_material
+from app.workers.job_queue import DBJobBroker, JobBroker, Lease, LeaseLost
+
+# (material_id, lease): the handler renews the lease while it works
+Handler = Callable[[int, Lease], None]
+
+
+def run_one(broker: JobBroker, handler: Handler = process_material) -> bool:
+    """Claim and handle one job. Returns False when the queue is empty."""
+    job = broker.claim()
+    if job is None:
+        return False
+    lease = Lease(broker, job)
+    try:
+        handler(job.material_id, lease)
+    except LeaseLost:
+        # the job is someone else's now; leave it alone
+        print(f"Material {job.material_id}: lease expired, abandoned")
+    except Exception as exc:
+        traceback.print_exc()
+        broker.fail(lease.job, f"{type(exc).__name__}: {exc}")
+        print(f"Material {job.material_id} failed (attempt {job.attempts})")
+    else:
+        broker.complete(lease.job)
+    return True
+
+
+def run_worker(stop, poll_interval: float | None = None) -> None:
+    """Handle jobs until `stop` (a multiprocessing.Event) is set."""
+    poll_interval = poll_interval or settings.JOB_POLL_INTERVAL_SECONDS
+    # children must not share the parent's pooled connections
+    engine.dispose(close=False)
+    # the parent handles Ctrl-C and tells us through `stop`
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    while not stop.is_set():
+        db = SessionLocal()
+        try:
+            busy = run_one(DBJobBroker(db))
+        except Exception:
+            # e.g. the database is briefly unreachable; keep the worker alive
+            traceback.print_exc()
+            busy = False
+        finally:
+            db.close()
+        if not busy:
+            stop.wait(poll_interval)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the ingestion worker pool.")
+    parser.add_argument(
+        "--concurrency", type=int, default=settings.INGESTION_WORKER_CONCURRENCY
+    )
+    parser.add_argument("--poll-interval", type=float, default=None)
+    args = parser.parse_args()
+
+    # spawn, not fork: each worker starts with fresh DB and HTTP clients
+    ctx = multiprocessing.get_context("spawn")
+    stop = ctx.Event()
+    workers = [
+        # not daemonic: PDF extraction starts its own process pool
+        ctx.Process(target=run_worker, args=(stop, args.poll_interval), name=f"ingest-{i}")
+        for i in range(max(1, args.concurrency))
+    ]
+    for worker in workers:
+        worker.start()
+    print(f"Started {len(workers)} ingestion workers")
+
+    def _shutdown(signum, _frame):
+        print(f"Signal {signum}: stopping after the current jobs")
+        stop.set()
+
+    signal.signal(signal.SIGINT, _shutdown)
+    signal.signal(signal.SIGTERM, _shutdown)
+    for worker in workers:
+        worker.join()
+
+
+if __name__ == "__main__":
+    main()
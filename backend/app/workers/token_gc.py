@@ -0,0 +1,100 @@
+# app/workers/token_gc.py
+"""
+Refresh token garbage collection.
+
+    python -m app.workers.token_gc [--once]
+
+Rotation and logout only flag refresh tokens as revoked, so without this the
+table grows with every refresh. Deletes expired tokens, and tokens revoked
+more than REFRESH_TOKEN_REVOKED_RETENTION_DAYS ago, in batches of
+REFRESH_TOKEN_GC_BATCH_SIZE rows with one short transaction each, so the job
+never holds locks on more than one batch and can run next to live traffic.
+Running it on several hosts at once is safe, just wasted work.
+"""
+
+import argparse
+import signal
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta
+from typing import Callable
+
+from sqlalchemy import delete, or_, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models.refresh_token import RefreshToken
+from app.db.session import SessionLocal
+
+
+def purge_refresh_tokens(
+    db: Session,
+    batch_size: int | None = None,
+    max_batches: int | None = None,
+    revoked_retention: timedelta | None = None,
+    pause: float = 0.0,
+    clock: Callable[[], datetime] = datetime.utcnow,
+) -> int:
+    """Delete dead refresh tokens batch by batch. Returns the number deleted."""
+    batch_size = batch_size or settings.REFRESH_TOKEN_GC_BATCH_SIZE
+    if revoked_retention is None:
+        revoked_retention = timedelta(days=settings.REFRESH_TOKEN_REVOKED_RETENTION_DAYS)
+    now = clock()
+    dead = or_(
+        RefreshToken.expires_at < now,
+        RefreshToken.revoked_at < now - revoked_retention,
+    )
+
+    deleted = batches = 0
+    while max_batches is None or batches < max_batches:
+        # DELETE ... LIMIT isn't portable; a bounded id subquery is
+        batch = select(RefreshToken.id).where(dead).limit(batch_size).scalar_subquery()
+        count = db.execute(
+            delete(RefreshToken)
+            .where(RefreshToken.id.in_(batch))
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        deleted += count
+        batches += 1
+        if count < batch_size:
+            break
+        if pause:
+            time.sleep(pause)
+    return deleted
+
+
+def run(stop: threading.Event, interval: float | None = None) -> None:
+    """Purge every `interval` seconds until `stop` is set."""
+    interval = interval or settings.REFRESH_TOKEN_GC_INTERVAL_SECONDS
+    while not stop.is_set():
+        db = SessionLocal()
+        try:
+            print(f"Deleted {purge_refresh_tokens(db)} refresh tokens")
+        except Exception:
+            traceback.print_exc()
+        finally:
+            db.close()
+        stop.wait(interval)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Delete expired and revoked refresh tokens.")
+    parser.add_argument("--once", action="store_true", help="run one pass and exit")
+    parser.add_argument("--interval", type=float, default=None)
+    args = parser.parse_args()
+
+    if args.once:
+        with SessionLocal() as db:
+            print(f"Deleted {purge_refresh_tokens(db)} refresh tokens")
+        return
+
+    stop = threading.Event()
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    run(stop, args.interval)
+
+
+if __name__ == "__main__":
+    main()
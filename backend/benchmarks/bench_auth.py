@@ -0,0 +1,133 @@
+"""
+Per-request authentication overhead.
+
+    python -m benchmarks.bench_auth [--requests 2000] [--concurrency 16]
+    python -m benchmarks.bench_auth --database-url postgresql+asyncpg://...
+
+Drives a probe route that only resolves the current user, in-process:
+
+    db      user row loaded on every request (principal cache off)
+    cached  principal cache in front of the lookup
+    claims  AUTH_TRUST_TOKEN_CLAIMS: signed claims, no lookup at all
+
+"queries" counts SQL statements sent while the load ran. Against a real
+database every one of them is a network round trip, so the gap is larger
+than with the default SQLite file.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+import httpx
+from fastapi import Depends
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.auth import PrincipalCache
+from app.core.config import settings
+from app.core.container import build_container
+from app.core.deps import get_current_user, get_token_principal
+from app.db import models
+from app.db.base import Base
+from app.db.session import get_async_db
+from app.main import create_app
+from app.services_impl.auth_service_impl import AuthServiceImpl
+
+
+async def _seed(sessionmaker) -> int:
+    async with sessionmaker() as db:
+        user = models.User(email="bench@example.com", hashed_password="x")
+        db.add(user)
+        await db.commit()
+        return user.id
+
+
+async def _load(app, token: str, n: int, concurrency: int):
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    headers = {"Authorization": f"Bearer {token}"}
+    async with httpx.AsyncClient(transport=transport, base_url="http://api") as api:
+
+        async def one():
+            async with semaphore:
+                start = time.perf_counter()
+                (await api.get("/probe", headers=headers)).raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(n)))
+        elapsed = time.perf_counter() - start
+    return latencies, elapsed
+
+
+def _report(name, latencies, elapsed, queries):
+    latencies = sorted(latencies)
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+    print(
+        f"{name:<8} p50={p50:7.3f}ms  p99={p99:7.3f}ms  "
+        f"{len(latencies) / elapsed:8.0f} req/s  queries={queries}"
+    )
+
+
+async def run(database_url: str, n: int, concurrency: int) -> None:
+    engine = create_async_engine(database_url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+    user_id = await _seed(sessionmaker)
+    token = AuthServiceImpl(db=None)._create_access_token(user_id)
+
+    queries = []
+    event.listen(engine.sync_engine, "before_cursor_execute", lambda *args: queries.append(1))
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    async def _get_async_db():
+        async with sessionmaker() as session:
+            yield session
+
+    for mode in ("db", "cached", "claims"):
+        settings.AUTH_TRUST_TOKEN_CLAIMS = mode == "claims"
+        app = create_app()
+        app.dependency_overrides[get_async_db] = _get_async_db
+        app.state.container = build_container()
+        app.state.container.principal_cache = (
+            None if mode == "db" else PrincipalCache(ttl_seconds=60)
+        )
+        dependency = get_token_principal if mode == "claims" else get_current_user
+
+        @app.get("/probe")
+        async def probe(user=Depends(dependency)):
+            return {"id": user.id}
+
+        queries.clear()
+        try:
+            latencies, elapsed = await _load(app, token, n, concurrency)
+        finally:
+            app.state.container.close()
+        _report(mode, latencies, elapsed, len(queries))
+
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.database_url or f"sqlite+aiosqlite:///{os.path.join(tmp, 'bench.db')}"
+        asyncio.run(run(url, args.requests, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
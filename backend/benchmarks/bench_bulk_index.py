@@ -0,0 +1,90 @@
+"""
+Compare per-chunk indexing with the _bulk path.
+
+    python -m benchmarks.bench_bulk_index            # simulated cluster
+    python -m benchmarks.bench_bulk_index --live     # OPENSEARCH_HOST from settings
+
+The simulated client charges a fixed round-trip latency per HTTP call plus
+a small per-document cost, which is what dominates against a real cluster.
+"""
+
+import argparse
+import time
+import uuid
+
+from app.adapters.vectorstore.opensearch_client import get_opensearch_client
+from app.adapters.vectorstore.opensearch_vectorstore import OpenSearchVectorStore
+
+
+class SimulatedOpenSearch:
+    class _Indices:
+        def exists(self, index):
+            return True
+
+    def __init__(self, rtt: float, per_doc: float) -> None:
+        self.indices = self._Indices()
+        self.rtt = rtt
+        self.per_doc = per_doc
+
+    def index(self, index, id, body):
+        time.sleep(self.rtt + self.per_doc)
+
+    def bulk(self, body):
+        n = body.count("\n") // 2
+        time.sleep(self.rtt + self.per_doc * n)
+        return {"errors": False, "items": [{"index": {"status": 201}}] * n}
+
+
+def _docs(material_id: int, n: int, dim: int):
+    for i in range(n):
+        yield {
+            "material_id": material_id,
+            "topic_id": None,
+            "chunk_id": f"bench-{material_id}-{i}",
+            "content": "lorem ipsum dolor sit amet " * 40,
+            "embedding": [0.01] * dim if dim else None,
+            "page": i // 4,
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--live", action="store_true")
+    parser.add_argument("--rtt-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    if args.live:
+        client = get_opensearch_client()
+        index = f"bench-{uuid.uuid4().hex[:8]}"
+        dim = 1536
+    else:
+        client = SimulatedOpenSearch(rtt=args.rtt_ms / 1000, per_doc=0.00002)
+        index = "bench"
+        dim = 0
+    store = OpenSearchVectorStore(client=client, index_name=index)
+    store.ensure_index()
+
+    try:
+        start = time.perf_counter()
+        for doc in _docs(1, args.docs, dim):
+            store.index_chunk(**doc)
+        single = time.perf_counter() - start
+        print(f"index_chunk  : {args.docs / single:>9.0f} docs/sec ({args.docs} requests)")
+
+        for in_flight in (1, 2, 4):
+            start = time.perf_counter()
+            result = store.index_chunks(_docs(2, args.docs, dim), max_in_flight=in_flight)
+            bulk = time.perf_counter() - start
+            print(
+                f"index_chunks : {args.docs / bulk:>9.0f} docs/sec "
+                f"({result.requests} requests, in_flight={in_flight}, "
+                f"{single / bulk:.1f}x)"
+            )
+    finally:
+        if args.live:
+            client.indices.delete(index=index)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Compare simple_chunk against the pluggable chunkers.
+
+    python -m benchmarks.bench_chunking [path/to/book.pdf]
+
+Without a PDF a synthetic textbook is generated. "Quality" is measured as
+the share of chunks that start and end on a sentence boundary and that
+don't cut a word in half.
+"""
+
+import random
+import sys
+import time
+
+from app.workers.chunking import FixedSizeChunker, StructuredChunker, count_tokens
+from app.workers.ingestion_worker import simple_chunk
+from app.workers.pdf_extraction import ExtractedPage, iter_pdf_pages
+
+WORDS = (
+    "vector matrix basis linear span eigenvalue transform kernel rank "
+    "dimension subspace orthogonal projection determinant inverse scalar"
+).split()
+
+
+def synthetic_pages(n_pages: int = 400, seed: int = 7) -> list[ExtractedPage]:
+    rnd = random.Random(seed)
+    pages = []
+    for number in range(1, n_pages + 1):
+        lines = []
+        if number % 10 == 1:
+            lines.append(f"{number // 10 + 1}.1 Section on {rnd.choice(WORDS)}s")
+        for _ in range(rnd.randint(3, 6)):
+            sentences = []
+            for _ in range(rnd.randint(2, 6)):
+                words = [rnd.choice(WORDS) for _ in range(rnd.randint(6, 22))]
+                sentences.append(" ".join(words).capitalize() + ".")
+            lines.append(" ".join(sentences))
+            lines.append("")
+        pages.append(ExtractedPage(number=number, text="\n".join(lines)))
+    return pages
+
+
+def _quality(chunks: list[str]) -> dict:
+    clean_end = sum(1 for c in chunks if c.rstrip().endswith((".", "!", "?")))
+    clean_start = sum(1 for c in chunks if c.lstrip()[:1].isupper() or c.lstrip()[:1].isdigit())
+    mid_word = sum(
+        1 for a, b in zip(chunks, chunks[1:]) if a[-1:].isalnum() and b[:1].isalnum()
+    )
+    n = max(1, len(chunks))
+    return {
+        "chunks": len(chunks),
+        "avg_tokens": sum(count_tokens(c) for c in chunks) / n,
+        "clean_end_%": 100 * clean_end / n,
+        "clean_start_%": 100 * clean_start / n,
+        "mid_word_splits": mid_word,
+    }
+
+
+def _run(name: str, fn, repeat: int = 3) -> None:
+    best = float("inf")
+    chunks: list[str] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        chunks = fn()
+        best = min(best, time.perf_counter() - start)
+    q = _quality(chunks)
+    print(
+        f"{name:<22} chunks={q['chunks']:>6}  avg_tokens={q['avg_tokens']:>7.1f}  "
+        f"clean_start={q['clean_start_%']:>5.1f}%  clean_end={q['clean_end_%']:>5.1f}%  "
+        f"mid_word={q['mid_word_splits']:>5}  time={best * 1000:>8.1f}ms"
+    )
+
+
+def main() -> None:
+    if len(sys.argv) > 1:
+        pages = list(iter_pdf_pages(sys.argv[1]))
+    else:
+        pages = synthetic_pages()
+    text = "\n".join(p.text for p in pages)
+    print(f"{len(pages)} pages, {len(text) / 1e6:.2f} MB of text\n")
+
+    _run("simple_chunk(1500)", lambda: simple_chunk(text, max_chars=1500))
+    _run("FixedSizeChunker(1500)", lambda: [c.text for c in FixedSizeChunker(1500).chunk(pages)])
+    _run(
+        "StructuredChunker(300)",
+        lambda: [c.text for c in StructuredChunker(300, 40).chunk(pages)],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Per-request dependency overhead: rebuilt per request vs. the app container.
+
+    python -m benchmarks.bench_deps [--requests 2000] [--concurrency 16] [--rtt-ms 1]
+
+Drives a probe route that depends on the vector store and the LLM client,
+in-process. "per-request" is the previous wiring: a new OpenSearch client
+(and connection pool), an `indices.exists` round trip and a new LLM client
+on every request. The round trip is simulated with --rtt-ms so no cluster
+is needed; client construction is real.
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+
+import httpx
+from fastapi import Depends
+
+from app.adapters.vectorstore.opensearch_client import get_opensearch_client
+from app.adapters.vectorstore.opensearch_vectorstore import OpenSearchVectorStore
+from app.core.config import settings
+from app.core.container import build_container, create_llm_client
+from app.core.deps import get_llm_client, get_vector_store
+from app.main import create_app
+
+
+def _per_request_vector_store(rtt: float):
+    def factory() -> OpenSearchVectorStore:
+        client = get_opensearch_client()
+        # stand-in for the HEAD /<index> request
+        client.indices.exists = lambda index: time.sleep(rtt) or True
+        store = OpenSearchVectorStore(client=client, index_name=settings.OPENSEARCH_INDEX)
+        store.ensure_index()
+        return store
+
+    return factory
+
+
+async def _load(app, n: int, concurrency: int):
+    @app.get("/probe")
+    async def probe(store=Depends(get_vector_store), llm=Depends(get_llm_client)):
+        return {}
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://api") as api:
+
+        async def one():
+            async with semaphore:
+                start = time.perf_counter()
+                (await api.get("/probe")).raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(n)))
+        elapsed = time.perf_counter() - start
+    return latencies, elapsed
+
+
+def _report(name, latencies, elapsed):
+    latencies = sorted(latencies)
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+    print(
+        f"{name:<12} p50={p50:7.3f}ms  p99={p99:7.3f}ms  "
+        f"{len(latencies) / elapsed:8.0f} req/s"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rtt-ms", type=float, default=1.0)
+    args = parser.parse_args()
+
+    before = create_app()
+    before.dependency_overrides[get_vector_store] = _per_request_vector_store(args.rtt_ms / 1000)
+    before.dependency_overrides[get_llm_client] = create_llm_client
+    _report("per-request", *asyncio.run(_load(before, args.requests, args.concurrency)))
+
+    after = create_app()
+    # what the lifespan handler does at startup
+    after.state.container = build_container()
+    try:
+        _report("container", *asyncio.run(_load(after, args.requests, args.concurrency)))
+    finally:
+        after.state.container.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Load test /api/v1/learning/ask with and without the pooled Ollama client.
+
+    python -m benchmarks.bench_llm_pool [--requests 400] [--concurrency 16]
+
+Starts a fake Ollama server on localhost (fixed 5ms "generation" time) and
+drives the real FastAPI app in-process. Auth, retrieval and embeddings are
+stubbed, the database is an empty in-memory SQLite and the answer cache is
+off, so every request reaches the LLM and only its HTTP path differs
+between runs.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import socket
+import statistics
+import threading
+import time
+
+import httpx
+import uvicorn
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.adapters.embeddings.hashing_provider import HashingEmbeddingClient
+from app.adapters.http.client_pool import close_http_client
+from app.adapters.llm.ollama_provider import OllamaClient
+from app.core.deps import (
+    get_answer_cache,
+    get_token_principal,
+    get_embedding_client,
+    get_llm_client,
+    get_vector_store,
+)
+from app.db.base import Base
+from app.db.session import get_async_sessionmaker
+from app.main import create_app
+
+
+async def _fake_chat(request):
+    await asyncio.sleep(0.005)
+    content = json.dumps({"answer": "ok", "followups": []})
+    return JSONResponse({"message": {"content": content}})
+
+
+class _Store:
+    def search(self, **kwargs):
+        return [{"chunk_id": "c1", "content": "context", "page": 1}]
+
+
+class _User:
+    id = 1
+
+
+class PerCallOllamaClient(OllamaClient):
+    """The pre-pool behaviour: a fresh AsyncClient (and TCP handshake) per call."""
+
+    async def _post_chat(self, prompt: str) -> str:
+        async with httpx.AsyncClient() as client:
+            self._http_client = client
+            try:
+                return await super()._post_chat(prompt)
+            finally:
+                self._http_client = None
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def _load(llm_factory, base_url, n, concurrency):
+    # the RAG service only looks up the material's canonical copy
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+
+    app = create_app()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    app.dependency_overrides[get_token_principal] = lambda: _User()
+    app.dependency_overrides[get_vector_store] = lambda: _Store()
+    app.dependency_overrides[get_embedding_client] = lambda: HashingEmbeddingClient(16)
+    app.dependency_overrides[get_llm_client] = lambda: llm_factory(base_url, "fake")
+    app.dependency_overrides[get_async_sessionmaker] = lambda: sessionmaker
+    app.dependency_overrides[get_answer_cache] = lambda: None
+
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://api") as api:
+
+        async def one(i):
+            async with semaphore:
+                start = time.perf_counter()
+                resp = await api.post(
+                    "/api/v1/learning/ask",
+                    json={"material_id": 1, "question": f"why {i}?"},
+                )
+                resp.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(one(i) for i in range(n)))
+    await close_http_client()
+    await engine.dispose()
+    return latencies
+
+
+def _report(name, latencies):
+    latencies = sorted(latencies)
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+    print(f"{name:<10} p50={p50:7.2f}ms  p99={p99:7.2f}ms")
+    return p50, p99
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    port = _free_port()
+    server = uvicorn.Server(
+        uvicorn.Config(
+            Starlette(routes=[Route("/api/chat", _fake_chat, methods=["POST"])]),
+            port=port,
+            log_level="warning",
+        )
+    )
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        per_call = asyncio.run(_load(PerCallOllamaClient, base_url, args.requests, args.concurrency))
+        pooled = asyncio.run(_load(OllamaClient, base_url, args.requests, args.concurrency))
+        b50, b99 = _report("per-call", per_call)
+        p50, p99 = _report("pooled", pooled)
+        print(f"p50 -{100 * (1 - p50 / b50):.0f}%  p99 -{100 * (1 - p99 / b99):.0f}%")
+    finally:
+        server.should_exit = True
+        thread.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Compare per-node prerequisite inserts with the batched path.
+
+    python -m benchmarks.bench_prereq_persist                     # in-memory SQLite
+    python -m benchmarks.bench_prereq_persist --database-url postgresql+asyncpg://...
+
+"statements" counts DBAPI execute/executemany calls. With some drivers an
+executemany UPDATE is a single call but still one network round trip per
+row, so compare wall time there too.
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from typing import List
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.adapters.wiki.wikipedia_client import WikipediaClient
+from app.db import models
+from app.db.base import Base
+from app.services.prereq_service import PrerequisiteSuggestion
+from app.services_impl.session_service_impl import SessionServiceImpl
+
+
+def random_tree(n: int, seed: int = 3) -> List[PrerequisiteSuggestion]:
+    rnd = random.Random(seed)
+    names = [f"Concept {i}" for i in range(n)]
+    nodes = [
+        PrerequisiteSuggestion(
+            name=name,
+            description=f"About {name}",
+            parent=names[rnd.randrange(i)] if i else None,
+        )
+        for i, name in enumerate(names)
+    ]
+    rnd.shuffle(nodes)  # LLMs don't list parents first
+    return nodes
+
+
+async def persist_one_by_one(db: AsyncSession, session_id: int, suggestions) -> None:
+    # The previous implementation: one INSERT per node, then the parent links.
+    stored = {}
+    for suggestion in suggestions:
+        node = models.PrerequisiteNode(
+            session_id=session_id,
+            name=suggestion.name,
+            description=suggestion.description,
+        )
+        db.add(node)
+        await db.flush()
+        stored[suggestion.name.lower()] = node
+    for suggestion in suggestions:
+        if suggestion.parent:
+            child = stored.get(suggestion.name.lower())
+            parent = stored.get(suggestion.parent.lower())
+            if child and parent:
+                child.parent_id = parent.id
+                db.add(child)
+    await db.flush()
+
+
+async def persist_batched(db: AsyncSession, session_id: int, suggestions) -> None:
+    service = SessionServiceImpl(db, prereq_service=None, wiki_client=WikipediaClient(offline=True))
+    await service._persist_prerequisites(session_id, suggestions)
+
+
+async def run(database_url: str, sizes) -> None:
+    # one connection, so an in-memory SQLite database survives between sessions
+    options = {"poolclass": StaticPool} if database_url.startswith("sqlite") else {}
+    engine = create_async_engine(database_url, **options)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    statements = 0
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _count(*_):
+        nonlocal statements
+        statements += 1
+
+    print(f"{engine.dialect.name}:")
+    for size in sizes:
+        tree = random_tree(size)
+        for name, persist in (("one-by-one", persist_one_by_one), ("batched", persist_batched)):
+            async with AsyncSession(engine) as db:
+                user = models.User(email=f"bench-{time.time_ns()}@example.com", hashed_password="x")
+                db.add(user)
+                await db.flush()
+                session = models.LearningSession(user_id=user.id, title="bench")
+                db.add(session)
+                await db.flush()
+
+                statements = 0
+                start = time.perf_counter()
+                await persist(db, session.id, tree)
+                elapsed = time.perf_counter() - start
+                # never keep benchmark rows, on any database
+                await db.rollback()
+            print(
+                f"  {size:>4} nodes  {name:<10}: {statements:>4} statements  "
+                f"{elapsed * 1000:>8.1f} ms"
+            )
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--database-url", default="sqlite+aiosqlite://")
+    parser.add_argument("--sizes", default="6,50,500")
+    args = parser.parse_args()
+    asyncio.run(run(args.database_url, [int(s) for s in args.sizes.split(",")]))
+
+
+if __name__ == "__main__":
+    main()
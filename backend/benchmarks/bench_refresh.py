@@ -0,0 +1,124 @@
+"""
+Refresh-token rotation throughput.
+
+    python -m benchmarks.bench_refresh [--refreshes 2000] [--threads 8]
+    python -m benchmarks.bench_refresh --database-url postgresql://...
+
+Each thread plays one client, refreshing its own token chain back to back
+on its own session, like the sync /auth/refresh route in the threadpool.
+"two-commit" is the previous rotation: load the row, commit the new token,
+decode it again for its jti, then commit the revocation. "single" is
+AuthServiceImpl.refresh_tokens.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.db import models
+from app.db.base import Base
+from app.db.session import engine_options
+from app.services_impl.auth_service_impl import AuthServiceImpl
+
+
+class TwoCommitAuthService(AuthServiceImpl):
+    def refresh_tokens(self, refresh_token):
+        payload = self._decode_refresh_token(refresh_token)
+        user_id = int(payload["sub"])
+        rt = self.db.query(models.RefreshToken).filter_by(jti=payload["jti"]).first()
+        if not rt or rt.revoked or rt.expires_at < datetime.utcnow():
+            raise ValueError("Invalid refresh token")
+        rt.revoked = True
+        new_refresh_token, _ = self._issue_refresh_token(user_id, parent_jti=rt.jti)
+        self.db.commit()
+        rt.replaced_by_jti = self._decode_refresh_token(new_refresh_token)["jti"]
+        self.db.add(rt)
+        self.db.commit()
+        return {
+            "access_token": self._create_access_token(user_id),
+            "refresh_token": new_refresh_token,
+            "token_type": "bearer",
+        }
+
+
+def _run(service_cls, Session, user_ids, refreshes, counters):
+    per_client = refreshes // len(user_ids)
+
+    def client(user_id):
+        db = Session()
+        try:
+            service = service_cls(db=db)
+            token = service.create_tokens(user_id)["refresh_token"]
+            for _ in range(per_client):
+                token = service.refresh_tokens(token)["refresh_token"]
+        finally:
+            db.close()
+
+    for key in counters:
+        counters[key] = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(user_ids)) as pool:
+        list(pool.map(client, user_ids))
+    elapsed = time.perf_counter() - start
+    total = per_client * len(user_ids)
+    return total / elapsed, counters["statements"] / total, counters["commits"] / total
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--refreshes", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.database_url or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        engine = create_engine(url, **engine_options(url))
+        if url.startswith("sqlite"):
+            event.listen(
+                engine,
+                "connect",
+                lambda conn, _: conn.execute("PRAGMA busy_timeout=30000"),
+            )
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine, autoflush=False)
+
+        with Session() as db:
+            users = [
+                models.User(email=f"client{i}@example.com", hashed_password="x")
+                for i in range(args.threads)
+            ]
+            db.add_all(users)
+            db.commit()
+            user_ids = [user.id for user in users]
+
+        counters = {"statements": 0, "commits": 0}
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def _statement(*_args):
+            counters["statements"] += 1
+
+        @event.listens_for(engine, "commit")
+        def _commit(*_args):
+            counters["commits"] += 1
+
+        for name, service_cls in (("two-commit", TwoCommitAuthService), ("single", AuthServiceImpl)):
+            rate, statements, commits = _run(
+                service_cls, Session, user_ids, args.refreshes, counters
+            )
+            print(
+                f"{name:<11} {rate:8.0f} refreshes/s  "
+                f"{statements:4.1f} statements/refresh  {commits:4.1f} commits/refresh"
+            )
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Refresh token GC and family revocation on a large table.
+
+    python -m benchmarks.bench_token_gc [--rows 200000] [--chain 20]
+    python -m benchmarks.bench_token_gc --database-url postgresql://...
+
+Seeds `rows` refresh tokens in rotation chains of `chain` tokens, a third of
+them dead (expired or long revoked), then times one jti lookup, revoking
+one family and a full GC pass. "no-index" drops the indexes on parent_jti,
+expires_at and revoked_at first, to show what they buy.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.orm import sessionmaker
+
+from app.db import models
+from app.db.base import Base
+from app.db.models.refresh_token import RefreshToken
+from app.services_impl.auth_service_impl import AuthServiceImpl
+from app.workers.token_gc import purge_refresh_tokens
+
+_INDEXES = (
+    "ix_refresh_tokens_parent_jti",
+    "ix_refresh_tokens_expires_at",
+    "ix_refresh_tokens_revoked_at",
+)
+
+
+def _seed(engine, rows: int, chain: int) -> None:
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(models.User), [{"email": "gc@example.com", "hashed_password": "x"}])
+        batch = []
+        for i in range(rows):
+            position = i % chain
+            dead = (i // chain) % 3 == 0
+            last = position == chain - 1
+            batch.append(
+                {
+                    "user_id": 1,
+                    "jti": f"{i:032x}",
+                    "parent_jti": f"{i - 1:032x}" if position else None,
+                    "replaced_by_jti": None if last else f"{i + 1:032x}",
+                    "created_at": now - timedelta(days=40 if dead else 1),
+                    "expires_at": now - timedelta(days=10) if dead else now + timedelta(days=29),
+                    "revoked": not last,
+                    "revoked_at": None if last else now - timedelta(days=39 if dead else 1),
+                }
+            )
+            if len(batch) == 10000:
+                conn.execute(insert(RefreshToken), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(RefreshToken), batch)
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def run(url: str, rows: int, chain: int, with_indexes: bool) -> None:
+    engine = create_engine(url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    if not with_indexes:
+        with engine.begin() as conn:
+            for name in _INDEXES:
+                conn.execute(text(f"DROP INDEX {name}"))
+    _seed(engine, rows, chain)
+    Session = sessionmaker(bind=engine)
+
+    with Session() as db:
+        probe = f"{rows // 2:032x}"
+        _, lookup_ms = _timed(lambda: db.query(RefreshToken).filter_by(jti=probe).one())
+        # a live family, from the middle of its chain
+        middle = (rows // chain - 1) * chain + chain // 2
+        revoked, family_ms = _timed(
+            lambda: AuthServiceImpl(db=db).revoke_token_family(f"{middle:032x}")
+        )
+        deleted, gc_ms = _timed(lambda: purge_refresh_tokens(db, batch_size=5000))
+
+    name = "indexed" if with_indexes else "no-index"
+    print(
+        f"{name:<9} lookup={lookup_ms:7.2f}ms  family={family_ms:8.2f}ms ({revoked} revoked)  "
+        f"gc={gc_ms:8.1f}ms ({deleted} deleted)"
+    )
+    engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--chain", type=int, default=20)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.database_url or f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        for with_indexes in (False, True):
+            run(url, args.rows, args.chain, with_indexes)
+
+
+if __name__ == "__main__":
+    main()
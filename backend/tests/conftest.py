@@ -1,16 +1,20 @@
 # tests/conftest.py
+import os
 import tempfile
-from typing import Generator
+from contextlib import contextmanager
+from typing import AsyncIterator, Callable, ContextManager, Generator, List
 
 import pytest
+import pytest_asyncio
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool
 
 from app.main import create_app
 from app.db.base import Base
-from app.db.session import get_db
+from app.db.session import get_async_db, get_async_sessionmaker, get_db
 from app.core.deps import (
     get_prereq_service,
     get_wikipedia_client,
@@ -18,19 +22,61 @@ from app.core.deps import (
 from app.services.prereq_service import PrerequisiteSuggestion, PrereqService
 
 
-TEST_DATABASE_URL = "sqlite://"
+def _sqlite_pragmas(dbapi_conn, _record) -> None:
+    # WAL: readers don't block the writer, so the sync and async sessions
+    # of one test can share the file
+    cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.close()
 
 
 @pytest.fixture(scope="session")
-def engine():
+def database_path() -> Generator[str, None, None]:
+    # A file, not ":memory:": the sync engine (auth, workers) and the async
+    # engine (session and materials services) must see the same database.
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield os.path.join(tmpdir, "test.db")
+
+
+@pytest.fixture(scope="session")
+def engine(database_path):
     engine = create_engine(
-        TEST_DATABASE_URL,
+        f"sqlite:///{database_path}",
         future=True,
         connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
     )
+    event.listen(engine, "connect", _sqlite_pragmas)
     Base.metadata.create_all(bind=engine)
-    return engine
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def async_engine(engine, database_path):
+    # NullPool: every test runs on its own event loop, and an aiosqlite
+    # connection can't move between loops
+    async_engine = create_async_engine(
+        f"sqlite+aiosqlite:///{database_path}",
+        poolclass=NullPool,
+    )
+    event.listen(async_engine.sync_engine, "connect", _sqlite_pragmas)
+    return async_engine
+
+
+@pytest.fixture(scope="session")
+def AsyncSessionTest(async_engine) -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+@pytest_asyncio.fixture()
+async def async_db(AsyncSessionTest, db) -> AsyncIterator[AsyncSession]:
+    """
+    Per-test AsyncSession on the same database as `db`, which also wipes
+    the tables afterwards. Commit setup rows made through `db` first.
+    """
+    async with AsyncSessionTest() as session:
+        yield session
 
 
 @pytest.fixture(scope="session")
@@ -63,7 +109,7 @@ def db(SessionTest) -> Generator[Session, None, None]:
 
 
 @pytest.fixture()
-def client(db: Session) -> Generator[TestClient, None, None]:
+def client(db: Session, AsyncSessionTest) -> Generator[TestClient, None, None]:
     """
     FastAPI TestClient wired to the in-memory SQLite test DB.
     """
@@ -75,7 +121,13 @@ def client(db: Session) -> Generator[TestClient, None, None]:
         finally:
             pass
 
+    async def _override_get_async_db():
+        async with AsyncSessionTest() as session:
+            yield session
+
     app.dependency_overrides[get_db] = _override_get_db
+    app.dependency_overrides[get_async_db] = _override_get_async_db
+    app.dependency_overrides[get_async_sessionmaker] = lambda: AsyncSessionTest
 
     class _StubPrereqService(PrereqService):
         async def generate_prerequisite_tree(self, *args, **kwargs):
@@ -93,8 +145,11 @@ def client(db: Session) -> Generator[TestClient, None, None]:
             ]
 
     class _StubWikiClient:
-        def fetch_summary(self, topic: str):
-            return f"Summary for {topic}", f"https://example.com/{topic.replace(' ', '_')}"
+        async def fetch_summaries(self, topics):
+            return {
+                topic: (f"Summary for {topic}", f"https://example.com/{topic.replace(' ', '_')}")
+                for topic in topics
+            }
 
     app.dependency_overrides[get_prereq_service] = lambda: _StubPrereqService()
     app.dependency_overrides[get_wikipedia_client] = lambda: _StubWikiClient()
@@ -103,6 +158,45 @@ def client(db: Session) -> Generator[TestClient, None, None]:
         yield c
 
 
+class QueryCounter:
+    def __init__(self) -> None:
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+@pytest.fixture()
+def query_budget(engine, async_engine) -> Callable[[int], ContextManager[QueryCounter]]:
+    """
+    `with query_budget(3): ...` fails the test if the block runs more than
+    3 SQL statements, listing them, so N+1 regressions show up in CI.
+    """
+
+    @contextmanager
+    def _budget(max_queries: int):
+        counter = QueryCounter()
+
+        def _record(conn, cursor, statement, *args):
+            counter.statements.append(statement)
+
+        engines = [engine, async_engine.sync_engine]
+        for e in engines:
+            event.listen(e, "before_cursor_execute", _record)
+        try:
+            yield counter
+        finally:
+            for e in engines:
+                event.remove(e, "before_cursor_execute", _record)
+        assert counter.count <= max_queries, (
+            f"{counter.count} queries, budget {max_queries}:\n"
+            + "\n".join(counter.statements)
+        )
+
+    return _budget
+
+
 @pytest.fixture()
 def temp_dir() -> Generator[str, None, None]:
     with tempfile.TemporaryDirectory() as tmpdir:
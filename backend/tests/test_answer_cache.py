@@ -0,0 +1,76 @@
+import pytest
+
+from app.adapters.embeddings.hashing_provider import HashingEmbeddingClient
+from app.core.cache import InMemoryCacheBackend
+from app.services_impl.answer_cache import AnswerCache, normalize_question
+
+ANSWER = {"answer": "A", "sources": [], "followups": []}
+
+
+def test_normalize_question():
+    assert normalize_question("  What IS a Vector?? ") == "what is a vector"
+
+
+def test_exact_hit_is_scoped_by_material_and_topic():
+    cache = AnswerCache()
+    cache.set(1, None, "What is a vector?", ANSWER)
+
+    assert cache.get(1, None, "what is a vector") == ANSWER
+    assert cache.get(2, None, "What is a vector?") is None
+    assert cache.get(1, 7, "What is a vector?") is None
+    assert cache.stats()["exact_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_semantic_hit_above_threshold_only():
+    embedder = HashingEmbeddingClient(dimension=256)
+    cache = AnswerCache(similarity_threshold=0.8)
+
+    q1 = "what is the determinant of a matrix"
+    cache.set(1, None, q1, ANSWER, await embedder.embed_query(q1))
+
+    similar = "what is the determinant of the matrix"
+    assert cache.get(1, None, similar, await embedder.embed_query(similar)) == ANSWER
+
+    other = "explain photosynthesis in plants"
+    assert cache.get(1, None, other, await embedder.embed_query(other)) is None
+    stats = cache.stats()
+    assert stats["semantic_hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_invalidate_material_hides_old_answers():
+    cache = AnswerCache()
+    cache.set(1, None, "q", ANSWER, [1.0, 0.0])
+    cache.set(2, None, "q", ANSWER)
+
+    cache.invalidate_material(1)
+
+    assert cache.get(1, None, "q", [1.0, 0.0]) is None
+    assert cache.get(2, None, "q") == ANSWER
+
+
+def test_invalidation_through_another_instance_on_a_shared_backend():
+    shared = InMemoryCacheBackend()
+    api = AnswerCache(generations=shared)
+    worker = AnswerCache(generations=shared)
+    api.set(1, None, "q", ANSWER, [1.0, 0.0])
+
+    # e.g. the ingestion runner re-indexed material 1
+    worker.invalidate_material(1)
+
+    assert api.get(1, None, "q", [1.0, 0.0]) is None
+    api.set(1, None, "q", ANSWER, [1.0, 0.0])
+    assert api.get(1, None, "q") == ANSWER
+
+
+def test_answer_read_before_an_invalidation_is_stored_under_the_old_generation():
+    cache = AnswerCache()
+    scope = cache.scope(1, None)
+    assert cache.get(1, None, "q", scope=scope) is None
+
+    # re-indexed while the answer was being generated
+    cache.invalidate_material(1)
+    cache.set(1, None, "q", ANSWER, scope=scope)
+
+    assert cache.get(1, None, "q") is None
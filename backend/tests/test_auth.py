@@ -0,0 +1,110 @@
+import time
+
+from jose import jwt
+
+from app.core.auth import PrincipalCache, claims_are_trusted, decode_access_token
+from app.core.config import settings
+from app.core.deps import get_rag_service
+from app.db.models.refresh_token import RefreshToken
+from app.db.models.user import User
+from app.services.rag_service import RAGService
+
+
+class _EchoRAGService(RAGService):
+    async def answer_question(self, user_id, **kwargs):
+        return {"answer": str(user_id), "sources": [], "followups": []}
+
+    async def stream_answer(self, **kwargs):
+        yield {"event": "done", "data": {"answer": ""}}
+
+
+def _signup(client, email="principal@example.com"):
+    resp = client.post("/api/v1/auth/signup", json={"email": email, "password": "pwd123"})
+    assert resp.status_code == 200
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+
+def _token(user_id, issued_at, token_type="access"):
+    claims = {"sub": str(user_id), "type": token_type, "iat": int(issued_at)}
+    return jwt.encode(claims, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+
+
+def test_cached_principal_skips_the_user_lookup(client, query_budget):
+    headers = _signup(client)
+    assert client.get("/api/v1/learning/sessions", headers=headers).status_code == 200
+
+    with query_budget(1) as counter:
+        assert client.get("/api/v1/learning/sessions", headers=headers).status_code == 200
+    assert not any("FROM users" in statement for statement in counter.statements)
+
+
+def test_updating_or_deleting_a_user_drops_its_cached_principal(client, db):
+    headers = _signup(client)
+    client.get("/api/v1/learning/sessions", headers=headers)
+    cache = client.app.state.container.principal_cache
+    user = db.query(User).one()
+    assert cache.get(user.id).email == "principal@example.com"
+
+    user.email = "renamed@example.com"
+    db.commit()
+    assert cache.get(user.id) is None
+
+    client.get("/api/v1/learning/sessions", headers=headers)
+    assert cache.get(user.id).email == "renamed@example.com"
+
+    db.query(RefreshToken).filter(RefreshToken.user_id == user.id).delete()
+    db.delete(user)
+    db.commit()
+    assert cache.get(user.id) is None
+    assert client.get("/api/v1/learning/sessions", headers=headers).status_code == 401
+
+
+def test_trusted_claims_stand_in_for_the_user_only_while_fresh(monkeypatch):
+    monkeypatch.setattr(settings, "AUTH_TRUST_TOKEN_CLAIMS", True)
+    monkeypatch.setattr(settings, "AUTH_TRUSTED_CLAIMS_MAX_AGE_SECONDS", 300)
+    now = time.time()
+
+    claims = decode_access_token(_token(7, now - 10))
+    assert claims["sub"] == 7
+    assert claims_are_trusted(claims, now=now)
+    assert not claims_are_trusted(decode_access_token(_token(7, now - 301)), now=now)
+
+    monkeypatch.setattr(settings, "AUTH_TRUST_TOKEN_CLAIMS", False)
+    assert not claims_are_trusted(claims, now=now)
+
+
+def test_ask_trusts_fresh_claims_and_looks_up_old_tokens(client, monkeypatch, query_budget):
+    monkeypatch.setattr(settings, "AUTH_TRUST_TOKEN_CLAIMS", True)
+    client.app.dependency_overrides[get_rag_service] = lambda: _EchoRAGService()
+    client.app.state.container.principal_cache = None
+    payload = {"material_id": 1, "question": "why?"}
+
+    # a user that doesn't exist: only a lookup can tell
+    with query_budget(0):
+        fresh = client.post(
+            "/api/v1/learning/ask",
+            json=payload,
+            headers={"Authorization": f"Bearer {_token(12345, time.time())}"},
+        )
+    assert fresh.json()["answer"] == "12345"
+
+    stale = _token(12345, time.time() - settings.AUTH_TRUSTED_CLAIMS_MAX_AGE_SECONDS - 1)
+    resp = client.post(
+        "/api/v1/learning/ask", json=payload, headers={"Authorization": f"Bearer {stale}"}
+    )
+    assert resp.status_code == 401
+
+
+def test_invalid_tokens_are_rejected(client):
+    _signup(client)
+    for token in ("garbage", _token(1, time.time(), token_type="refresh")):
+        resp = client.get(
+            "/api/v1/learning/sessions", headers={"Authorization": f"Bearer {token}"}
+        )
+        assert resp.status_code == 401
+
+
+def test_principal_cache_reports_stats():
+    cache = PrincipalCache(max_entries=2, ttl_seconds=60)
+    assert cache.get(1) is None
+    assert "hit_rate" in cache.stats()
@@ -1,3 +1,6 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
 from jose import jwt
 import pytest
 
@@ -61,6 +64,7 @@ def test_refresh_tokens_rotates_refresh_token(auth_service, db):
     rt = db.query(RefreshToken).filter_by(jti=old_jti).first()
     assert rt is not None
     assert rt.revoked is True
+    assert rt.revoked_at is not None
     assert rt.replaced_by_jti is not None
 
 
@@ -77,6 +81,93 @@ def test_refresh_tokens_with_revoked_token_fails(auth_service, db):
     assert "revoked" in str(exc.value).lower()
 
 
+def test_refresh_rotates_in_one_transaction(auth_service, db, query_budget):
+    user = auth_service.create_user("erin@example.com", "secret123")
+    refresh = auth_service.create_tokens(user_id=user.id)["refresh_token"]
+
+    # conditional UPDATE of the old row + INSERT of the new one
+    with query_budget(2):
+        new_refresh = auth_service.refresh_tokens(refresh)["refresh_token"]
+
+    new_jti = jwt.decode(
+        new_refresh,
+        settings.REFRESH_TOKEN_SECRET_KEY,
+        algorithms=[settings.JWT_ALGORITHM],
+    )["jti"]
+    new_rt = db.query(RefreshToken).filter_by(jti=new_jti).one()
+    old_rt = db.query(RefreshToken).filter_by(jti=new_rt.parent_jti).one()
+    assert old_rt.replaced_by_jti == new_jti
+    assert new_rt.revoked is False
+
+
+def test_concurrent_refreshes_of_one_token_rotate_once(auth_service, SessionTest):
+    user = auth_service.create_user("frank@example.com", "secret123")
+    refresh = auth_service.create_tokens(user_id=user.id)["refresh_token"]
+
+    def _refresh(_):
+        session = SessionTest()
+        try:
+            return AuthServiceImpl(db=session).refresh_tokens(refresh)
+        except ValueError as exc:
+            return exc
+        finally:
+            session.close()
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(_refresh, range(4)))
+
+    assert sum(isinstance(r, dict) for r in results) == 1
+    assert all("revoked" in str(r) for r in results if not isinstance(r, dict))
+    assert auth_service.db.query(RefreshToken).count() == 2
+
+
+def test_refresh_tokens_with_expired_token_fails(auth_service, db):
+    user = auth_service.create_user("gina@example.com", "secret123")
+    refresh = auth_service.create_tokens(user_id=user.id)["refresh_token"]
+    db.query(RefreshToken).update({"expires_at": datetime.utcnow() - timedelta(seconds=1)})
+    db.commit()
+
+    with pytest.raises(ValueError, match="expired"):
+        auth_service.refresh_tokens(refresh)
+
+
 def test_revoke_refresh_token_on_invalid_token_is_noop(auth_service, db):
     # Should not raise
     auth_service.revoke_refresh_token("this-is-not-a-valid-jwt")
+
+
+def _jti(token):
+    return jwt.decode(
+        token,
+        settings.REFRESH_TOKEN_SECRET_KEY,
+        algorithms=[settings.JWT_ALGORITHM],
+    )["jti"]
+
+
+def test_logout_revokes_the_whole_token_family(auth_service, db):
+    user = auth_service.create_user("hank@example.com", "secret123")
+    first = auth_service.create_tokens(user_id=user.id)["refresh_token"]
+    second = auth_service.refresh_tokens(first)["refresh_token"]
+    third = auth_service.refresh_tokens(second)["refresh_token"]
+    other_login = auth_service.create_tokens(user_id=user.id)["refresh_token"]
+
+    # logging out with a middle token still reaches the live one
+    assert auth_service.revoke_token_family(_jti(second)) == 1
+    assert db.query(RefreshToken).filter_by(jti=_jti(third)).one().revoked is True
+    assert db.query(RefreshToken).filter_by(jti=_jti(other_login)).one().revoked is False
+
+    auth_service.revoke_refresh_token(other_login)
+    assert db.query(RefreshToken).filter_by(revoked=False).count() == 0
+    assert db.query(RefreshToken).filter(RefreshToken.revoked_at.is_(None)).count() == 0
+
+
+def test_reusing_a_rotated_token_can_revoke_its_family(auth_service, db, monkeypatch):
+    monkeypatch.setattr(settings, "REFRESH_TOKEN_REUSE_REVOKES_FAMILY", True)
+    user = auth_service.create_user("ivy@example.com", "secret123")
+    stolen = auth_service.create_tokens(user_id=user.id)["refresh_token"]
+    current = auth_service.refresh_tokens(stolen)["refresh_token"]
+
+    with pytest.raises(ValueError, match="revoked"):
+        auth_service.refresh_tokens(stolen)
+    with pytest.raises(ValueError, match="revoked"):
+        auth_service.refresh_tokens(current)
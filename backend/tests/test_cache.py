@@ -0,0 +1,91 @@
+from app.core.cache import (
+    InMemoryCacheBackend,
+    RedisCacheBackend,
+    TTLCache,
+    invalidate_material,
+    on_material_invalidated,
+)
+from app.adapters.vectorstore.retrieval_cache import RetrievalCache
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+        self.expiry = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value.encode("utf-8")
+        self.expiry[key] = ex
+
+    def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, 0)) + 1).encode("utf-8")
+        return int(self.data[key])
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_cache_expires_entries_and_counts_hits():
+    clock = FakeClock()
+    cache = TTLCache(max_entries=10, ttl_seconds=5, clock=clock)
+
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    clock.now = 6
+    assert cache.get("a") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.evictions == 1
+
+
+def test_material_invalidation_notifies_listeners():
+    seen = []
+    on_material_invalidated(seen.append)
+
+    invalidate_material(42)
+
+    assert seen == [42]
+
+
+def test_in_memory_backend_counters_survive_value_eviction():
+    backend = InMemoryCacheBackend(max_entries=1)
+    backend.incr("gen")
+    backend.set("a", 1)
+    backend.set("b", 2)
+
+    assert backend.get("a") is None
+    assert backend.get("gen") == 1
+
+
+def test_shared_backend_propagates_invalidation_between_nodes():
+    redis = FakeRedis()
+    api_node = RetrievalCache(RedisCacheBackend(redis), ttl_seconds=60)
+    worker = RetrievalCache(RedisCacheBackend(redis), ttl_seconds=60)
+
+    key = api_node.key("q", 7, None, 5, "bm25")
+    api_node.set(key, [{"chunk_id": "c1"}])
+    assert api_node.get(api_node.key("q", 7, None, 5, "bm25")) == [{"chunk_id": "c1"}]
+    assert redis.expiry["ola:" + key] == 60
+
+    worker.invalidate_material(7)
+
+    assert api_node.get(api_node.key("q", 7, None, 5, "bm25")) is None
@@ -0,0 +1,101 @@
+import pytest
+
+from app.workers.chunking import (
+    FixedSizeChunker,
+    StructuredChunker,
+    count_tokens,
+    get_chunker,
+)
+from app.workers.ingestion_worker import simple_chunk
+from app.workers.pdf_extraction import ExtractedPage
+
+
+def test_fixed_size_chunker_matches_simple_chunk_and_tracks_pages():
+    pages = [
+        ExtractedPage(number=1, text="abcdefg"),
+        ExtractedPage(number=2, text="hij"),
+        ExtractedPage(number=3, text="klmnopqrstu"),
+    ]
+    chunks = list(FixedSizeChunker(max_chars=5).chunk(iter(pages)))
+
+    joined = "\n".join(p.text for p in pages)
+    assert [c.text for c in chunks] == simple_chunk(joined, max_chars=5)
+    assert [c.page for c in chunks] == [1, 1, 2, 3, 3]
+
+
+def test_structured_chunker_respects_budget_and_sentence_boundaries():
+    sentence = "The gradient points in the direction of steepest ascent."
+    page_text = "\n".join([sentence] * 20)
+    chunker = StructuredChunker(max_tokens=40, overlap_tokens=0)
+
+    chunks = list(chunker.chunk([ExtractedPage(number=4, text=page_text)]))
+
+    assert len(chunks) > 1
+    for c in chunks:
+        assert c.token_count <= 40
+        assert c.text.endswith(".")
+        assert c.page == 4
+
+
+def test_structured_chunker_overlap_repeats_trailing_sentence():
+    text = " ".join(f"Sentence number {i} is here." for i in range(10))
+    chunker = StructuredChunker(max_tokens=20, overlap_tokens=7)
+
+    chunks = list(chunker.chunk([ExtractedPage(number=1, text=text)]))
+
+    assert len(chunks) > 1
+    for prev, nxt in zip(chunks, chunks[1:]):
+        last_sentence = prev.text.rsplit(". ", 1)[-1]
+        assert nxt.text.startswith(last_sentence.rstrip("."))
+
+
+def test_structured_chunker_starts_new_chunk_at_heading_and_keeps_pages():
+    pages = [
+        ExtractedPage(number=1, text="1 Introduction\nVectors have a magnitude and a direction."),
+        ExtractedPage(number=2, text="2 Matrices\nA matrix is a grid of num-\nbers."),
+    ]
+    chunks = list(StructuredChunker(max_tokens=200, overlap_tokens=10).chunk(pages))
+
+    assert len(chunks) == 2
+    assert chunks[0].text.startswith("1 Introduction")
+    assert chunks[1].text.startswith("2 Matrices")
+    assert "numbers." in chunks[1].text
+    assert [c.page for c in chunks] == [1, 2]
+
+
+def test_structured_chunker_keeps_wrapped_lines_that_look_like_headings_in_the_sentence():
+    pages = [
+        ExtractedPage(
+            number=1,
+            text=(
+                "1 Results\n"
+                "After six weeks the results showed that\n"
+                "3 of the samples had degraded. The rest were\n"
+                "UNCHANGED\n"
+                "and stayed usable."
+            ),
+        ),
+        # a page that starts in the middle of the previous page's sentence
+        ExtractedPage(number=2, text="12 of them\nwere\nretested."),
+    ]
+    chunks = list(StructuredChunker(max_tokens=200, overlap_tokens=0).chunk(pages))
+
+    assert len(chunks) == 1
+    assert chunks[0].text.startswith("1 Results\nAfter six weeks")
+    assert "showed that 3 of the samples" in chunks[0].text
+    assert "were UNCHANGED and stayed" in chunks[0].text
+    assert "\n\n\n" not in chunks[0].text
+    assert "usable. 12 of them were retested." in chunks[0].text.replace("\n\n", " ")
+
+
+def test_structured_chunker_splits_run_on_text_on_word_boundaries():
+    text = " ".join(["word"] * 95)
+    chunks = list(StructuredChunker(max_tokens=30, overlap_tokens=0).chunk([ExtractedPage(1, text)]))
+
+    assert [count_tokens(c.text) for c in chunks] == [30, 30, 30, 5]
+
+
+def test_get_chunker_rejects_unknown_name():
+    assert isinstance(get_chunker("fixed"), FixedSizeChunker)
+    with pytest.raises(ValueError):
+        get_chunker("nope")
@@ -0,0 +1,87 @@
+import pytest
+from fastapi import Depends
+from fastapi.testclient import TestClient
+
+from app.core import cache as cache_module
+from app.core.cache import InMemoryCacheBackend
+from app.core.config import settings
+from app.core.container import (
+    Container,
+    build_container,
+    create_answer_cache,
+    create_retrieval_cache,
+)
+from app.core.deps import get_container, get_llm_client, get_vector_store
+from app.main import create_app
+
+
+def test_resources_are_built_once_at_startup(monkeypatch):
+    built = []
+    started = []
+
+    def _build():
+        container = build_container()
+        built.append(container)
+        return container
+
+    monkeypatch.setattr("app.main.build_container", _build)
+    monkeypatch.setattr(Container, "startup", lambda self: started.append(self))
+
+    app = create_app()
+    seen = []
+
+    @app.get("/probe")
+    def probe(store=Depends(get_vector_store), llm=Depends(get_llm_client)):
+        seen.append((store, llm))
+        return {}
+
+    with TestClient(app) as client:
+        client.get("/probe")
+        client.get("/probe")
+
+    assert len(built) == 1 and started == built
+    assert seen[0][0] is seen[1][0] is built[0].vector_store
+    assert seen[0][1] is seen[1][1]
+
+
+def test_closing_the_container_unregisters_its_cache_listeners():
+    before = list(cache_module._material_listeners)
+    container = build_container()
+    assert len(cache_module._material_listeners) > len(before)
+
+    container.close()
+
+    assert cache_module._material_listeners == before
+
+
+def test_container_is_built_lazily_without_lifespan():
+    app = create_app()
+
+    @app.get("/probe")
+    def probe(container=Depends(get_container)):
+        return {"id": id(container)}
+
+    client = TestClient(app)  # not entered: no lifespan events
+    first = client.get("/probe").json()
+    assert client.get("/probe").json() == first
+    app.state.container.close()
+
+
+def test_material_invalidation_forgets_cached_aliases():
+    container = build_container()
+    container.material_aliases.set(2, 1)
+
+    cache_module.invalidate_material(3)
+
+    assert container.material_aliases.get(2) is None
+    container.close()
+
+
+@pytest.mark.parametrize("create_cache", [create_answer_cache, create_retrieval_cache])
+def test_result_caches_are_off_without_a_shared_backend(monkeypatch, create_cache):
+    monkeypatch.setattr(settings, "CACHE_ALLOW_PROCESS_LOCAL", False)
+    assert create_cache() is None
+    assert create_cache(InMemoryCacheBackend()) is not None
+
+    monkeypatch.setattr(settings, "CACHE_ALLOW_PROCESS_LOCAL", True)
+    assert create_cache() is not None
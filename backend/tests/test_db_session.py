@@ -0,0 +1,27 @@
+from app.core.config import settings
+from app.db.session import async_database_url, engine_options
+
+
+def test_async_url_swaps_in_the_async_driver(monkeypatch):
+    monkeypatch.setattr(settings, "ASYNC_DATABASE_URL", "")
+    monkeypatch.setattr(settings, "DATABASE_URL", "postgresql+psycopg2://u:p@db:5432/ola")
+    assert async_database_url() == "postgresql+asyncpg://u:p@db:5432/ola"
+
+    monkeypatch.setattr(settings, "DATABASE_URL", "sqlite:///./ola.db")
+    assert async_database_url() == "sqlite+aiosqlite:///./ola.db"
+
+    monkeypatch.setattr(settings, "ASYNC_DATABASE_URL", "postgresql+asyncpg://other/ola")
+    assert async_database_url() == "postgresql+asyncpg://other/ola"
+
+
+def test_pool_settings_apply_to_server_databases_only(monkeypatch):
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 7)
+    monkeypatch.setattr(settings, "DB_POOL_PRE_PING", False)
+
+    options = engine_options("postgresql+asyncpg://u:p@db/ola")
+    assert options["pool_size"] == 7
+    assert options["pool_pre_ping"] is False
+    assert options["max_overflow"] == settings.DB_MAX_OVERFLOW
+    assert options["pool_recycle"] == settings.DB_POOL_RECYCLE
+
+    assert engine_options("sqlite+aiosqlite:///./ola.db") == {}
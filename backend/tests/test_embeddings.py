@@ -0,0 +1,95 @@
+import asyncio
+import math
+
+import pytest
+
+from app.adapters.embeddings.base import EmbeddingClient
+from app.adapters.embeddings.cache import (
+    CachedEmbeddingClient,
+    DBEmbeddingCache,
+    InMemoryEmbeddingCache,
+)
+from app.adapters.embeddings.hashing_provider import HashingEmbeddingClient
+
+
+class SlowCountingClient(EmbeddingClient):
+    def __init__(self, batch_size, max_concurrency):
+        self.model = "slow"
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.active = 0
+        self.peak = 0
+        self.batches = []
+
+    async def embed_batch(self, texts):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        self.batches.append(list(texts))
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        return [[float(len(t))] for t in texts]
+
+
+@pytest.mark.asyncio
+async def test_embed_batches_with_bounded_concurrency_and_keeps_order():
+    client = SlowCountingClient(batch_size=2, max_concurrency=2)
+    texts = ["a" * i for i in range(1, 8)]
+
+    vectors = await client.embed(texts)
+
+    assert vectors == [[float(i)] for i in range(1, 8)]
+    assert len(client.batches) == 4
+    assert client.peak == 2
+
+
+@pytest.mark.asyncio
+async def test_hashing_client_is_deterministic_and_normalised():
+    client = HashingEmbeddingClient(dimension=64)
+
+    a1, a2, b = await client.embed(["linear algebra", "linear algebra", "photosynthesis"])
+
+    assert a1 == a2
+    assert len(a1) == 64
+    assert math.isclose(sum(v * v for v in a1), 1.0)
+    assert a1 != b
+
+
+@pytest.mark.asyncio
+async def test_cached_client_only_embeds_unseen_texts():
+    inner = HashingEmbeddingClient(dimension=16)
+    client = CachedEmbeddingClient(inner, InMemoryEmbeddingCache())
+
+    first = await client.embed(["x", "y", "x"])
+    assert inner.calls == 1
+    assert client.misses == 2
+
+    second = await client.embed(["y", "x"])
+    assert inner.calls == 1
+    assert second == [first[1], first[0]]
+    assert client.hits == 3
+
+
+@pytest.mark.asyncio
+async def test_db_cache_survives_new_client(db):
+    texts = ["chunk one", "chunk two"]
+    inner = HashingEmbeddingClient(dimension=8)
+    await CachedEmbeddingClient(inner, DBEmbeddingCache(db)).embed(texts)
+
+    fresh_inner = HashingEmbeddingClient(dimension=8)
+    vectors = await CachedEmbeddingClient(fresh_inner, DBEmbeddingCache(db)).embed(texts)
+
+    assert fresh_inner.calls == 0
+    assert vectors == await inner.embed(texts)
+
+
+def test_db_cache_put_ignores_existing_rows_and_leaves_commit_to_caller(db):
+    cache = DBEmbeddingCache(db)
+    cache.put_many("m", {"h1": [1.0]})
+    db.commit()
+
+    # a concurrent worker stored h1 first: keep its vector, no IntegrityError
+    cache.put_many("m", {"h1": [2.0], "h2": [3.0]})
+    assert cache.get_many("m", ["h1", "h2"]) == {"h1": [1.0], "h2": [3.0]}
+
+    db.rollback()
+    assert cache.get_many("m", ["h1", "h2"]) == {"h1": [1.0]}
@@ -0,0 +1,55 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.adapters.llm import gemini_provider
+from app.adapters.llm.gemini_provider import GeminiClient
+
+
+class FakeAsyncModels:
+    def __init__(self, text):
+        self.text = text
+        self.active = 0
+        self.peak = 0
+
+    async def generate_content(self, model, contents):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        return SimpleNamespace(text=self.text)
+
+
+def _client(text):
+    client = GeminiClient.__new__(GeminiClient)
+    client.model = "gemini-test"
+    client.client = SimpleNamespace(aio=SimpleNamespace(models=FakeAsyncModels(text)))
+    return client
+
+
+@pytest.mark.asyncio
+async def test_gemini_chat_does_not_block_event_loop(monkeypatch):
+    monkeypatch.setattr(gemini_provider.settings, "GEMINI_MAX_CONCURRENCY", 2)
+    client = _client("hello")
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        for _ in range(5):
+            await asyncio.sleep(0.002)
+            ticks += 1
+
+    results = await asyncio.gather(*(client.chat("hi") for _ in range(4)), ticker())
+
+    assert results[:4] == ["hello"] * 4
+    assert ticks == 5
+    assert client.client.aio.models.peak == 2
+
+
+@pytest.mark.asyncio
+async def test_gemini_chat_with_followups_parses_json():
+    client = _client(json.dumps({"answer": "A", "followups": ["B?"]}))
+
+    assert await client.chat_with_followups("q") == ("A", ["B?"])
@@ -1,4 +1,23 @@
+import pytest
+
+from app.core.config import settings
+
+
+@pytest.fixture
+def process_local_caches(monkeypatch):
+    # before `client` builds the container
+    monkeypatch.setattr(settings, "CACHE_ALLOW_PROCESS_LOCAL", True)
+
+
 def test_health_ping(client):
     resp = client.get("/api/v1/health/ping")
     assert resp.status_code == 200
     assert resp.json() == {"status": "ok"}
+
+
+def test_health_metrics_exposes_cache_stats(process_local_caches, client):
+    resp = client.get("/api/v1/health/metrics")
+    assert resp.status_code == 200
+    assert "hit_rate" in resp.json()["answer_cache"]
+    assert "hit_rate" in resp.json()["retrieval_cache"]
+    assert "hit_rate" in resp.json()["principal_cache"]
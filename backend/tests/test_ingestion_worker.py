@@ -1,4 +1,22 @@
-from app.workers.ingestion_worker import simple_chunk
+import os
+from datetime import datetime, timedelta
+
+import fitz
+import pytest
+
+from app.adapters.embeddings.cache import CachedEmbeddingClient, DBEmbeddingCache
+from app.adapters.embeddings.hashing_provider import HashingEmbeddingClient
+from app.adapters.vectorstore.opensearch_vectorstore import BulkIndexResult
+from app.db.models.learning_material import LearningMaterial
+from app.db.models.user import User
+from app.workers.ingestion_worker import (
+    batched,
+    ingest_material,
+    reuse_canonical,
+    simple_chunk,
+)
+from app.workers.chunking import FixedSizeChunker
+from app.workers.job_queue import DBJobBroker, Lease, LeaseLost
 
 
 def test_simple_chunk_splits_text():
@@ -7,3 +25,174 @@ def test_simple_chunk_splits_text():
 
     # Expect: ["abcd", "efgh", "ij"]
     assert chunks == ["abcd", "efgh", "ij"]
+
+
+def test_batched():
+    assert list(batched(range(5), 2)) == [[0, 1], [2, 3], [4]]
+
+
+class RecordingVectorStore:
+    def __init__(self):
+        self.indexed = []
+        self.kept = []
+
+    def index_chunks(self, chunks):
+        self.indexed.extend(chunks)
+        return BulkIndexResult(indexed=len(self.indexed), requests=1)
+
+    def delete_stale_chunks(self, material_id, keep):
+        self.kept.append((material_id, keep))
+        return 0
+
+
+def test_ingest_material_streams_chunks_into_vector_store(db, temp_dir):
+    path = os.path.join(temp_dir, "notes.pdf")
+    doc = fitz.open()
+    for i in range(3):
+        doc.new_page().insert_text((72, 72), f"Chapter {i + 1} " + "x" * 40)
+    doc.save(path)
+    doc.close()
+
+    user = User(email="ingest@example.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    material = LearningMaterial(owner_id=user.id, filename="notes.pdf", path=path)
+    db.add(material)
+    db.commit()
+
+    store = RecordingVectorStore()
+    count = ingest_material(
+        db, material, store, batch_size=2, workers=1, chunker=FixedSizeChunker(20)
+    )
+
+    assert count == len(store.indexed) > 0
+    assert store.indexed[0]["chunk_id"] == f"{material.id}-0"
+    assert [doc["seq"] for doc in store.indexed] == list(range(count))
+    # chunks beyond `count` from an earlier, longer ingestion are dropped
+    assert store.kept == [(material.id, count)]
+    assert store.indexed[0]["page"] == 1
+    assert material.status == "READY"
+
+
+def test_reingesting_unchanged_material_makes_no_embedding_calls(db, temp_dir):
+    path = os.path.join(temp_dir, "book.pdf")
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), "Eigenvalues describe scaling.")
+    doc.save(path)
+    doc.close()
+
+    user = User(email="reingest@example.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    material = LearningMaterial(owner_id=user.id, filename="book.pdf", path=path)
+    db.add(material)
+    db.commit()
+
+    inner = HashingEmbeddingClient(dimension=8)
+    embedder = CachedEmbeddingClient(inner, DBEmbeddingCache(db))
+
+    store = RecordingVectorStore()
+    ingest_material(db, material, store, workers=1, embedder=embedder)
+    assert inner.calls == 1
+    assert len(store.indexed[0]["embedding"]) == 8
+
+    ingest_material(db, material, RecordingVectorStore(), workers=1, embedder=embedder)
+    assert inner.calls == 1
+
+
+def test_duplicate_material_waits_for_and_reuses_the_canonical_one(db, temp_dir):
+    path = os.path.join(temp_dir, "book.pdf")
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), "Shared course book")
+    doc.save(path)
+    doc.close()
+
+    user = User(email="dedup@example.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    canonical = LearningMaterial(owner_id=user.id, filename="a.pdf", path=path)
+    db.add(canonical)
+    db.flush()
+    duplicate = LearningMaterial(
+        owner_id=user.id,
+        filename="b.pdf",
+        path=path,
+        canonical_material_id=canonical.id,
+    )
+    db.add(duplicate)
+    db.commit()
+
+    # canonical still pending: nothing to do for the duplicate
+    assert reuse_canonical(db, duplicate) is True
+    assert duplicate.status == "PENDING"
+
+    store = RecordingVectorStore()
+    ingest_material(db, canonical, store, workers=1, chunker=FixedSizeChunker(50))
+    db.refresh(duplicate)
+
+    assert duplicate.status == "READY"
+    assert {doc["material_id"] for doc in store.indexed} == {canonical.id}
+
+
+def test_duplicate_of_a_failed_material_takes_over_as_canonical(db):
+    user = User(email="failed@example.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    failed = LearningMaterial(owner_id=user.id, filename="a.pdf", path="/x", status="FAILED")
+    db.add(failed)
+    db.flush()
+    first, second = (
+        LearningMaterial(
+            owner_id=user.id, filename=name, path="/x", canonical_material_id=failed.id
+        )
+        for name in ("b.pdf", "c.pdf")
+    )
+    db.add_all([first, second])
+    db.commit()
+
+    assert reuse_canonical(db, first) is False
+    db.refresh(second)
+
+    assert first.canonical_material_id is None
+    assert second.canonical_material_id == first.id
+
+
+def test_ingest_stops_and_leaves_status_alone_once_the_lease_is_lost(db, temp_dir):
+    path = os.path.join(temp_dir, "long.pdf")
+    doc = fitz.open()
+    for i in range(4):
+        doc.new_page().insert_text((72, 72), f"Part {i + 1} " + "x" * 40)
+    doc.save(path)
+    doc.close()
+
+    user = User(email="lease@example.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    material = LearningMaterial(owner_id=user.id, filename="long.pdf", path=path)
+    db.add(material)
+    db.commit()
+
+    now = [datetime(2024, 1, 1)]
+    broker = DBJobBroker(db, visibility_timeout=60, clock=lambda: now[0])
+    lease = Lease(broker, broker.claim())
+
+    class SlowVectorStore(RecordingVectorStore):
+        def index_chunks(self, chunks):
+            for chunk in chunks:
+                self.indexed.append(chunk)
+                if len(self.indexed) == 1:
+                    # this batch outlives the lease; another runner claims the job
+                    now[0] += timedelta(seconds=61)
+                    assert broker.claim().attempts == 2
+            return BulkIndexResult(indexed=len(self.indexed), requests=1)
+
+    store = SlowVectorStore()
+    with pytest.raises(LeaseLost):
+        ingest_material(
+            db, material, store, batch_size=1, workers=1,
+            chunker=FixedSizeChunker(50), lease=lease,
+        )
+
+    assert len(store.indexed) == 1
+    db.refresh(material)
+    assert material.status == "PROCESSING" and material.attempts == 2
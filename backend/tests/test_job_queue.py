@@ -0,0 +1,151 @@
+from datetime import datetime, timedelta
+
+from app.db.models.learning_material import LearningMaterial
+from app.db.models.user import User
+import pytest
+
+from app.workers.job_queue import DBJobBroker, Lease, LeaseLost
+from app.workers.runner import run_one
+
+
+class Clock:
+    def __init__(self):
+        self.now = datetime(2024, 1, 1, 12, 0, 0)
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += timedelta(seconds=seconds)
+
+
+def _broker(db, clock, **kwargs):
+    options = dict(visibility_timeout=60, max_attempts=3, backoff_base=10, backoff_max=15)
+    options.update(kwargs)
+    return DBJobBroker(db, clock=clock, **options)
+
+
+def _material(db, **kwargs):
+    user = db.query(User).first()
+    if user is None:
+        user = User(email="queue@example.com", hashed_password="x")
+        db.add(user)
+        db.flush()
+    material = LearningMaterial(owner_id=user.id, filename="a.pdf", path="/x", **kwargs)
+    db.add(material)
+    db.commit()
+    return material
+
+
+def test_claimed_job_is_invisible_until_its_lease_expires(db):
+    clock = Clock()
+    broker = _broker(db, clock)
+    material = _material(db)
+
+    job = broker.claim()
+    assert job.material_id == material.id and job.attempts == 1
+    assert broker.claim() is None
+
+    clock.advance(61)
+    again = broker.claim()
+    assert again.material_id == material.id and again.attempts == 2
+
+    # the first worker lost its lease and can't touch the job anymore
+    broker.fail(job, "late")
+    db.refresh(material)
+    assert material.status == "PROCESSING" and material.last_error is None
+
+
+def test_failures_back_off_then_dead_letter(db):
+    clock = Clock()
+    broker = _broker(db, clock)
+    material = _material(db)
+
+    for attempt, delay in ((1, 10), (2, 15)):
+        job = broker.claim()
+        assert job.attempts == attempt
+        broker.fail(job, "boom")
+        db.refresh(material)
+        assert material.status == "PENDING"
+        assert material.available_at == clock.now + timedelta(seconds=delay)
+        assert broker.claim() is None
+        clock.advance(delay)
+
+    broker.fail(broker.claim(), "boom")
+    db.refresh(material)
+    assert material.status == "FAILED"
+    assert material.last_error == "boom"
+    assert broker.claim() is None
+
+    # re-queueing by hand starts over
+    broker.enqueue(material.id)
+    assert broker.claim().attempts == 1
+
+
+def test_renewed_lease_keeps_a_long_job_and_a_lost_one_cannot_be_renewed(db):
+    clock = Clock()
+    broker = _broker(db, clock)
+    _material(db)
+
+    lease = Lease(broker, broker.claim())
+    for _ in range(3):
+        clock.advance(50)
+        lease.renew()
+        assert broker.claim() is None
+
+    clock.advance(61)
+    assert broker.claim() is not None
+    with pytest.raises(LeaseLost):
+        lease.renew()
+
+
+def test_timed_out_last_attempt_is_dead_lettered(db):
+    clock = Clock()
+    broker = _broker(db, clock, max_attempts=1)
+    material = _material(db)
+
+    assert broker.claim() is not None
+    clock.advance(61)
+
+    assert broker.claim() is None
+    db.refresh(material)
+    assert material.status == "FAILED"
+    assert material.last_error == "visibility timeout expired"
+
+
+def test_duplicates_wait_for_their_canonical_material(db):
+    clock = Clock()
+    broker = _broker(db, clock, max_attempts=1)
+    canonical = _material(db)
+    duplicate = _material(db, canonical_material_id=canonical.id)
+
+    job = broker.claim()
+    assert job.material_id == canonical.id
+    assert broker.claim() is None
+
+    # canonical failed for good: the duplicate has to take over
+    broker.fail(job, "broken pdf")
+    assert broker.claim().material_id == duplicate.id
+
+
+def test_run_one_completes_or_fails_the_job(db):
+    clock = Clock()
+    broker = _broker(db, clock)
+    ok, bad = _material(db), _material(db)
+
+    def handler(material_id, lease):
+        if material_id == bad.id:
+            raise RuntimeError("cannot parse")
+        material = db.get(LearningMaterial, material_id)
+        material.status = "READY"
+        db.commit()
+
+    assert run_one(broker, handler) is True
+    assert run_one(broker, handler) is True
+    assert run_one(broker, handler) is False
+
+    db.refresh(ok)
+    db.refresh(bad)
+    assert ok.status == "READY"
+    assert bad.status == "PENDING"
+    assert bad.last_error == "RuntimeError: cannot parse"
@@ -0,0 +1,41 @@
+from app.core.deps import get_rag_service
+from app.services.rag_service import RAGService
+
+
+class _StubRAGService(RAGService):
+    async def answer_question(self, **kwargs):
+        return {"answer": "A", "sources": [], "followups": []}
+
+    async def stream_answer(self, **kwargs):
+        yield {"event": "token", "data": {"text": "Hel"}}
+        yield {"event": "token", "data": {"text": "lo"}}
+        yield {"event": "sources", "data": {"sources": [{"chunk_id": "c1", "page": 1}]}}
+        yield {"event": "done", "data": {"answer": "Hello"}}
+
+
+def _signup_and_get_token(client):
+    resp = client.post(
+        "/api/v1/auth/signup",
+        json={"email": "asker@example.com", "password": "pwd123"},
+    )
+    assert resp.status_code == 200
+    return resp.json()["access_token"]
+
+
+def test_ask_stream_emits_server_sent_events(client):
+    client.app.dependency_overrides[get_rag_service] = lambda: _StubRAGService()
+    token = _signup_and_get_token(client)
+
+    with client.stream(
+        "POST",
+        "/api/v1/learning/ask/stream",
+        headers={"Authorization": f"Bearer {token}"},
+        json={"material_id": 1, "question": "Hi?"},
+    ) as resp:
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/event-stream")
+        body = "".join(resp.iter_text())
+
+    events = [block.split("\n")[0] for block in body.strip().split("\n\n")]
+    assert events == ["event: token", "event: token", "event: sources", "event: done"]
+    assert 'data: {"text": "Hel"}' in body
@@ -55,3 +55,57 @@ def test_create_and_fetch_learning_session(client):
     )
     assert resp_detail.status_code == 200
     assert resp_detail.json()["id"] == session_id
+
+
+def test_session_routes_stay_within_query_budget(client, query_budget):
+    token = _signup_and_get_token(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    materials = [_upload_material(client, token, f"m{i}.pdf") for i in range(3)]
+    session_ids = []
+    for i in range(4):
+        resp = client.post(
+            "/api/v1/learning/sessions",
+            headers=headers,
+            json={"title": f"Plan {i}", "material_ids": materials},
+        )
+        assert resp.status_code == 201, resp.text
+        session_ids.append(resp.json()["id"])
+
+    # current user + one aggregate query, however many sessions there are
+    with query_budget(2):
+        resp_list = client.get("/api/v1/learning/sessions", headers=headers)
+    assert resp_list.status_code == 200
+    assert [s["material_count"] for s in resp_list.json()] == [3, 3, 3, 3]
+
+    # current user + session + links with materials + prerequisite nodes
+    with query_budget(4):
+        resp_detail = client.get(
+            f"/api/v1/learning/sessions/{session_ids[0]}", headers=headers
+        )
+    assert len(resp_detail.json()["materials"]) == 3
+    assert len(resp_detail.json()["prerequisites"]) == 2
+
+
+def test_list_learning_sessions_pages_through_next_cursor_header(client):
+    token = _signup_and_get_token(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    material = _upload_material(client, token, "m.pdf")
+    for i in range(3):
+        client.post(
+            "/api/v1/learning/sessions",
+            headers=headers,
+            json={"title": f"Plan {i}", "material_ids": [material]},
+        )
+
+    first = client.get("/api/v1/learning/sessions?limit=2", headers=headers)
+    cursor = first.headers["X-Next-Cursor"]
+    second = client.get(
+        f"/api/v1/learning/sessions?limit=2&cursor={cursor}", headers=headers
+    )
+
+    titles = [s["title"] for s in first.json() + second.json()]
+    assert titles == ["Plan 2", "Plan 1", "Plan 0"]
+    assert "X-Next-Cursor" not in second.headers
+
+    bad = client.get("/api/v1/learning/sessions?cursor=garbage", headers=headers)
+    assert bad.status_code == 400
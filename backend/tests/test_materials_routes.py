@@ -1,3 +1,7 @@
+from app.adapters.storage.object_storage import LocalFileStorage
+from app.core.deps import get_storage_backend
+
+
 def _signup_and_get_token(client):
     resp = client.post(
         "/api/v1/auth/signup",
@@ -35,3 +39,44 @@ def test_upload_and_list_materials(client):
     items = resp_list.json()
     assert len(items) == 1
     assert items[0]["id"] == material_id
+
+
+def test_list_materials_pages_and_stays_within_query_budget(client, query_budget):
+    token = _signup_and_get_token(client)
+    headers = {"Authorization": f"Bearer {token}"}
+    for i in range(3):
+        client.post(
+            "/api/v1/materials/upload",
+            headers=headers,
+            files={"file": (f"doc{i}.pdf", b"dummy content", "application/pdf")},
+        )
+
+    # the principal is cached since the uploads: one projection query
+    with query_budget(1):
+        first = client.get("/api/v1/materials/?limit=2", headers=headers)
+    assert [m["filename"] for m in first.json()] == ["doc2.pdf", "doc1.pdf"]
+
+    second = client.get(
+        f"/api/v1/materials/?limit=2&cursor={first.headers['X-Next-Cursor']}",
+        headers=headers,
+    )
+    assert [m["filename"] for m in second.json()] == ["doc0.pdf"]
+    assert "X-Next-Cursor" not in second.headers
+
+    ready = client.get("/api/v1/materials/?status=READY", headers=headers)
+    assert ready.json() == []
+
+
+def test_upload_over_the_size_limit_returns_413(client, temp_dir):
+    client.app.dependency_overrides[get_storage_backend] = lambda: LocalFileStorage(
+        base_path=temp_dir, max_bytes=8
+    )
+    token = _signup_and_get_token(client)
+
+    resp = client.post(
+        "/api/v1/materials/upload",
+        headers={"Authorization": f"Bearer {token}"},
+        files={"file": ("big.pdf", b"x" * 64, "application/pdf")},
+    )
+
+    assert resp.status_code == 413
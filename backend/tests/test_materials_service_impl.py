@@ -1,4 +1,5 @@
 import io
+from datetime import datetime, timedelta
 
 import pytest
 from fastapi import UploadFile
@@ -7,6 +8,8 @@ from app.services_impl.materials_service_impl import MaterialsServiceImpl
 from app.adapters.storage.object_storage import LocalFileStorage
 from app.db.models.user import User
 from app.db.models.learning_material import LearningMaterial
+from app.db.models.stored_object import StoredObject
+from app.workers.job_queue import DBJobBroker
 
 
 class DummyVectorStore:
@@ -17,7 +20,7 @@ class DummyVectorStore:
         self.indexed.append((args, kwargs))
 
 @pytest.fixture()
-def materials_service(db, temp_dir):
+def materials_service(db, async_db, temp_dir):
     # create or reuse a test user
     user = db.query(User).filter_by(email="materials@example.com").first()
     if not user:
@@ -30,7 +33,7 @@ def materials_service(db, temp_dir):
     vector_store = DummyVectorStore()
 
     service = MaterialsServiceImpl(
-        db=db,
+        db=async_db,
         vector_store=vector_store,
         storage=storage,
     )
@@ -38,7 +41,7 @@ def materials_service(db, temp_dir):
 
 
 @pytest.mark.asyncio
-async def test_upload_material_creates_db_row(materials_service):
+async def test_upload_material_creates_db_row(materials_service, db):
     service, user = materials_service
 
     content = b"dummy pdf bytes"
@@ -51,7 +54,7 @@ async def test_upload_material_creates_db_row(materials_service):
     assert material_id is not None
 
     rows = (
-        service.db.query(LearningMaterial)
+        db.query(LearningMaterial)
         .filter_by(owner_id=user.id)
         .all()
     )
@@ -63,7 +66,21 @@ async def test_upload_material_creates_db_row(materials_service):
 
 
 @pytest.mark.asyncio
-async def test_list_materials_returns_basic_fields(materials_service):
+async def test_upload_material_enqueues_ingestion(materials_service, db):
+    service, user = materials_service
+    service.broker = DBJobBroker(service.db)
+
+    material_id = await service.upload_material(
+        user_id=user.id, file=UploadFile(filename="q.pdf", file=io.BytesIO(b"queued"))
+    )
+
+    job = DBJobBroker(db).claim()
+    assert job.material_id == material_id
+    assert db.get(LearningMaterial, material_id).status == "PROCESSING"
+
+
+@pytest.mark.asyncio
+async def test_list_materials_returns_basic_fields(materials_service, db):
     service, user = materials_service
 
     mat = LearningMaterial(
@@ -72,12 +89,91 @@ async def test_list_materials_returns_basic_fields(materials_service):
         path="/tmp/foo.pdf",
         status="READY",
     )
-    service.db.add(mat)
-    service.db.commit()
-    service.db.refresh(mat)
+    db.add(mat)
+    db.commit()
+    db.refresh(mat)
 
-    result = await service.list_materials(user_id=user.id)
+    result = (await service.list_materials(user_id=user.id)).items
     assert len(result) == 1
     assert result[0]["id"] == mat.id
     assert result[0]["filename"] == "foo.pdf"
     assert result[0]["status"] == "READY"
+
+
+@pytest.mark.asyncio
+async def test_list_materials_paginates_and_filters_by_status(materials_service, db):
+    service, user = materials_service
+    base = datetime(2024, 5, 1)
+    for i in range(5):
+        db.add(
+            LearningMaterial(
+                owner_id=user.id,
+                filename=f"f{i}.pdf",
+                path=f"/tmp/f{i}.pdf",
+                status="READY" if i % 2 == 0 else "PENDING",
+                created_at=base + timedelta(minutes=i),
+            )
+        )
+    db.commit()
+
+    first = await service.list_materials(user.id, limit=2)
+    second = await service.list_materials(user.id, limit=2, cursor=first.next_cursor)
+    third = await service.list_materials(user.id, limit=2, cursor=second.next_cursor)
+
+    names = [m["filename"] for m in first.items + second.items + third.items]
+    assert names == ["f4.pdf", "f3.pdf", "f2.pdf", "f1.pdf", "f0.pdf"]
+    assert third.next_cursor is None
+
+    ready = await service.list_materials(user.id, status="READY")
+    assert [m["filename"] for m in ready.items] == ["f4.pdf", "f2.pdf", "f0.pdf"]
+
+
+@pytest.mark.asyncio
+async def test_identical_uploads_share_storage_and_chunks(materials_service, db):
+    service, user = materials_service
+    other = User(email="classmate@example.com", hashed_password="x")
+    db.add(other)
+    db.commit()
+
+    first_id = await service.upload_material(
+        user_id=user.id, file=UploadFile(filename="book.pdf", file=io.BytesIO(b"same"))
+    )
+    second_id = await service.upload_material(
+        user_id=other.id, file=UploadFile(filename="copy.pdf", file=io.BytesIO(b"same"))
+    )
+
+    first = db.get(LearningMaterial, first_id)
+    second = db.get(LearningMaterial, second_id)
+    assert second.canonical_material_id == first.id
+    assert second.path == first.path
+    assert second.status == "PENDING"  # canonical not ingested yet
+
+    blob = db.get(StoredObject, first.content_hash)
+    assert blob.ref_count == 2
+
+    first.status = "READY"
+    db.commit()
+    third_id = await service.upload_material(
+        user_id=other.id, file=UploadFile(filename="again.pdf", file=io.BytesIO(b"same"))
+    )
+    third = db.get(LearningMaterial, third_id)
+    assert third.canonical_material_id == first.id
+    assert third.status == "READY"
+
+
+@pytest.mark.asyncio
+async def test_failed_enqueue_leaves_no_material_behind(materials_service, db):
+    service, user = materials_service
+
+    class BrokenBroker(DBJobBroker):
+        async def async_enqueue(self, material_id):
+            raise RuntimeError("queue unavailable")
+
+    service.broker = BrokenBroker(service.db)
+    with pytest.raises(RuntimeError):
+        await service.upload_material(
+            user_id=user.id, file=UploadFile(filename="x.pdf", file=io.BytesIO(b"lost"))
+        )
+    await service.db.rollback()
+
+    assert db.query(LearningMaterial).filter_by(filename="x.pdf").count() == 0
@@ -0,0 +1,59 @@
+import json
+
+import httpx
+import pytest
+
+from app.adapters.http.client_pool import close_http_client, get_http_client
+from app.adapters.llm.ollama_provider import OllamaClient
+
+
+def _transport(requests):
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(json.loads(request.content))
+        content = json.dumps({"answer": "42", "followups": ["Why?"]})
+        return httpx.Response(200, json={"message": {"content": content}})
+
+    return httpx.MockTransport(handler)
+
+
+@pytest.mark.asyncio
+async def test_ollama_client_reuses_injected_pool():
+    requests = []
+    async with httpx.AsyncClient(transport=_transport(requests)) as http:
+        client = OllamaClient("http://ollama:11434/", "llama3", http_client=http)
+
+        assert await client.chat("hi") == json.dumps({"answer": "42", "followups": ["Why?"]})
+        answer, followups = await client.chat_with_followups("hi")
+
+    assert (answer, followups) == ("42", ["Why?"])
+    assert len(requests) == 2
+    assert all(r["stream"] is False for r in requests)
+
+
+@pytest.mark.asyncio
+async def test_shared_http_client_is_reused_within_a_loop():
+    first = get_http_client()
+    assert get_http_client() is first
+    assert OllamaClient("http://x", "m").http_client is first
+
+    await close_http_client()
+    assert first.is_closed
+    assert get_http_client() is not first
+    await close_http_client()
+
+
+@pytest.mark.asyncio
+async def test_ollama_stream_chat_yields_tokens_until_done():
+    lines = [
+        {"message": {"content": "Hel"}, "done": False},
+        {"message": {"content": "lo"}, "done": False},
+        {"message": {"content": ""}, "done": True},
+    ]
+    body = "\n".join(json.dumps(line) for line in lines).encode()
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, content=body))
+
+    async with httpx.AsyncClient(transport=transport) as http:
+        client = OllamaClient("http://ollama:11434", "llama3", http_client=http)
+        tokens = [t async for t in client.stream_chat("hi")]
+
+    assert tokens == ["Hel", "lo"]
@@ -1,4 +1,14 @@
-from app.adapters.vectorstore.opensearch_vectorstore import OpenSearchVectorStore
+import json
+
+import pytest
+
+from app.core.cache import InMemoryCacheBackend
+from app.adapters.vectorstore.opensearch_vectorstore import (
+    IndexMappingMismatch,
+    OpenSearchVectorStore,
+    reciprocal_rank_fusion,
+)
+from app.adapters.vectorstore.retrieval_cache import RetrievalCache
 
 
 class FakeIndicesClient:
@@ -13,16 +23,46 @@ class FakeIndicesClient:
     def create(self, index, body):
         self.created[index] = body
 
+    def get_mapping(self, index):
+        return {index: {"mappings": self.created[index]["mappings"]}}
+
 
 class FakeOpenSearch:
     def __init__(self):
         self.indices = FakeIndicesClient()
         self.indexed_docs = {}
 
+        self.bulk_calls = 0
+        self.search_calls = 0
+        # chunk_id -> statuses to return on successive bulk attempts
+        self.bulk_failures = {}
+
     def index(self, index, id, body):
         self.indexed_docs[id] = {"index": index, "body": body}
 
+    def bulk(self, body):
+        self.bulk_calls += 1
+        lines = body.strip().split("\n")
+        items = []
+        for action_line, doc_line in zip(lines[::2], lines[1::2]):
+            action = json.loads(action_line)["index"]
+            doc_id = action["_id"]
+            failures = self.bulk_failures.get(doc_id) or []
+            status = failures.pop(0) if failures else 201
+            if status < 300:
+                self.indexed_docs[doc_id] = {
+                    "index": action["_index"],
+                    "body": json.loads(doc_line),
+                }
+                items.append({"index": {"_id": doc_id, "status": status}})
+            else:
+                items.append(
+                    {"index": {"_id": doc_id, "status": status, "error": {"type": "x"}}}
+                )
+        return {"errors": any(i["index"]["status"] >= 300 for i in items), "items": items}
+
     def search(self, index, body):
+        self.search_calls += 1
         hits = []
         for doc_id, meta in self.indexed_docs.items():
             source = meta["body"]
@@ -35,10 +75,33 @@ class FakeOpenSearch:
             )
         return {"hits": {"hits": hits}}
 
+    def delete_by_query(self, index, body, **params):
+        query = body["query"]["bool"]
+        material_id = query["filter"][0]["term"]["material_id"]
+        keep = query["should"][0]["range"]["seq"]["gte"]
+        stale = [
+            doc_id
+            for doc_id, meta in self.indexed_docs.items()
+            if meta["body"]["material_id"] == material_id
+            and meta["body"].get("seq", keep) >= keep
+        ]
+        for doc_id in stale:
+            del self.indexed_docs[doc_id]
+        return {"deleted": len(stale)}
+
+    def msearch(self, body):
+        self.msearch_bodies = body
+        bm25 = [{"_id": i, "_score": 3.0, "_source": {"chunk_id": i}} for i in ("a", "b", "c")]
+        knn = [{"_id": i, "_score": 0.9, "_source": {"chunk_id": i}} for i in ("c", "d", "a")]
+        return {"responses": [{"hits": {"hits": bm25}}, {"hits": {"hits": knn}}]}
+
 
 def test_opensearch_vectorstore_creates_index_and_searches():
     client = FakeOpenSearch()
     store = OpenSearchVectorStore(client=client, index_name="test_index")
+    # no round trip when the store is built, only at startup
+    assert client.indices.created == {}
+    store.ensure_index()
 
     assert "test_index" in client.indices.created
 
@@ -60,3 +123,170 @@ def test_opensearch_vectorstore_creates_index_and_searches():
     assert len(results) == 1
     assert results[0]["content"] == "This is about linear algebra"
     assert results[0]["chunk_id"] == "chunk1"
+
+
+def test_search_results_are_cached_until_material_is_reindexed():
+    client = FakeOpenSearch()
+    cache = RetrievalCache(InMemoryCacheBackend())
+    store = OpenSearchVectorStore(client=client, index_name="test_index", cache=cache)
+    store.index_chunk(1, None, "chunk1", "eigenvalues", None)
+
+    first = store.search("What are eigenvalues?", material_id=1, topic_id=None)
+    first[0]["content"] = "mutated by caller"
+    second = store.search("what are eigenvalues? ", material_id=1, topic_id=None)
+
+    assert client.search_calls == 1
+    assert second[0]["content"] == "eigenvalues"
+
+    # a different k is a different query
+    store.search("What are eigenvalues?", material_id=1, topic_id=None, k=3)
+    assert client.search_calls == 2
+
+    store.index_chunks(iter([{"material_id": 1, "chunk_id": "chunk2", "content": "x"}]))
+    third = store.search("What are eigenvalues?", material_id=1, topic_id=None)
+
+    assert client.search_calls == 3
+    assert len(third) == 2
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 3
+
+
+def test_empty_search_results_are_not_cached():
+    client = FakeOpenSearch()
+    cache = RetrievalCache(InMemoryCacheBackend())
+    store = OpenSearchVectorStore(client=client, index_name="test_index", cache=cache)
+
+    assert store.search("eigenvalues", material_id=1, topic_id=None) == []
+    # e.g. the first batch of a new material, indexed by the runner
+    client.indexed_docs["chunk1"] = {"index": "test_index", "body": {"content": "eigenvalues"}}
+
+    assert len(store.search("eigenvalues", material_id=1, topic_id=None)) == 1
+    assert client.search_calls == 2
+
+
+def _chunks(n):
+    for i in range(n):
+        yield {
+            "material_id": 1,
+            "chunk_id": f"c{i}",
+            "content": f"chunk {i}",
+            "embedding": None,
+            "page": i,
+        }
+
+
+def test_delete_stale_chunks_keeps_the_reindexed_prefix():
+    client = FakeOpenSearch()
+    store = OpenSearchVectorStore(client=client, index_name="test_index")
+    store.index_chunks(
+        [{"material_id": 1, "chunk_id": f"1-{i}", "seq": i, "content": "x"} for i in range(5)]
+        + [{"material_id": 2, "chunk_id": "2-7", "seq": 7, "content": "x"}]
+    )
+    # from before chunks carried their seq
+    store.index_chunk(1, None, "1-9", "x", None)
+
+    assert store.delete_stale_chunks(1, keep=3) == 3
+    assert sorted(client.indexed_docs) == ["1-0", "1-1", "1-2", "2-7"]
+    assert client.indexed_docs["1-2"]["body"]["seq"] == 2
+
+
+def test_index_chunks_batches_requests():
+    client = FakeOpenSearch()
+    store = OpenSearchVectorStore(client=client, index_name="test_index")
+
+    result = store.index_chunks(_chunks(10), batch_size=4, max_in_flight=2)
+
+    assert result.indexed == 10
+    assert result.errors == []
+    assert client.bulk_calls == 3
+    assert "embedding" not in client.indexed_docs["c0"]["body"]
+
+
+def test_index_chunks_splits_on_payload_size():
+    client = FakeOpenSearch()
+    store = OpenSearchVectorStore(client=client, index_name="test_index")
+
+    result = store.index_chunks(_chunks(6), batch_size=100, max_bytes=300, max_in_flight=1)
+
+    assert result.indexed == 6
+    assert client.bulk_calls > 1
+
+
+def test_index_chunks_retries_only_failed_items_and_reports_errors():
+    client = FakeOpenSearch()
+    client.bulk_failures = {"c1": [429], "c2": [400]}
+    store = OpenSearchVectorStore(client=client, index_name="test_index")
+
+    result = store.index_chunks(_chunks(4), batch_size=10, max_in_flight=1, max_retries=2)
+
+    assert result.indexed == 3
+    assert result.retried == 1
+    assert client.bulk_calls == 2
+    assert [(e.chunk_id, e.status) for e in result.errors] == [("c2", 400)]
+
+
+def test_index_mapping_uses_configured_hnsw_method():
+    client = FakeOpenSearch()
+    OpenSearchVectorStore(client=client, index_name="test_index").ensure_index()
+
+    embedding = client.indices.created["test_index"]["mappings"]["properties"]["embedding"]
+    assert embedding["method"]["name"] == "hnsw"
+    assert set(embedding["method"]["parameters"]) == {"m", "ef_construction"}
+
+
+def test_ensure_index_rejects_an_index_built_for_other_embeddings():
+    client = FakeOpenSearch()
+    store = OpenSearchVectorStore(client=client, index_name="test_index")
+    store.ensure_index()
+    store.ensure_index()  # same settings: nothing to do
+
+    embedding = client.indices.created["test_index"]["mappings"]["properties"]["embedding"]
+    embedding["dimension"] = 1536
+    embedding["method"]["engine"] = "nmslib"
+
+    with pytest.raises(IndexMappingMismatch) as exc:
+        store.ensure_index()
+    assert set(exc.value.diff) == {"dimension", "engine"}
+
+
+def test_hybrid_search_fuses_bm25_and_knn_in_one_msearch():
+    client = FakeOpenSearch()
+    store = OpenSearchVectorStore(client=client, index_name="test_index")
+
+    results = store.search(
+        query="q",
+        material_id=7,
+        topic_id=3,
+        k=3,
+        query_embedding=[0.1, 0.2],
+        mode="hybrid",
+    )
+
+    # a and c appear in both lists, so they outrank the single-list hits
+    assert [r["chunk_id"] for r in results][:2] == ["a", "c"]
+    assert len(results) == 3
+    knn_query = client.msearch_bodies[3]["query"]["knn"]["embedding"]
+    assert knn_query["vector"] == [0.1, 0.2]
+    assert {"term": {"topic_id": 3}} in knn_query["filter"]["bool"]["filter"]
+
+
+def test_search_bodies_never_fetch_the_embedding():
+    client = FakeOpenSearch()
+    store = OpenSearchVectorStore(client=client, index_name="test_index")
+
+    store.search(
+        query="q", material_id=7, topic_id=None, k=3, query_embedding=[0.1, 0.2], mode="hybrid"
+    )
+
+    bm25_body, knn_body = client.msearch_bodies[1], client.msearch_bodies[3]
+    for body in (bm25_body, knn_body):
+        assert "embedding" in body["_source"]["excludes"]
+
+
+def test_reciprocal_rank_fusion_prefers_consensus():
+    fused = reciprocal_rank_fusion(
+        [[{"_id": "x"}, {"_id": "y"}], [{"_id": "y"}, {"_id": "z"}]],
+        k=2,
+        rrf_k=60,
+    )
+    assert [d["_id"] for d in fused] == ["y", "x"]
@@ -0,0 +1,44 @@
+import os
+
+import fitz
+
+from app.workers.pdf_extraction import ExtractionStats, iter_pdf_pages, page_ranges
+
+
+def _make_pdf(path: str, pages: int) -> None:
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Page marker {i + 1}")
+    doc.save(path)
+    doc.close()
+
+
+def test_page_ranges_cover_document():
+    assert page_ranges(10, 4) == [(0, 4), (4, 8), (8, 10)]
+    assert page_ranges(0, 4) == []
+
+
+def test_iter_pdf_pages_parallel_preserves_order(temp_dir):
+    path = os.path.join(temp_dir, "book.pdf")
+    _make_pdf(path, 7)
+
+    stats = ExtractionStats()
+    pages = list(iter_pdf_pages(path, workers=2, shard_size=2, stats=stats))
+
+    assert [p.number for p in pages] == list(range(1, 8))
+    for p in pages:
+        assert f"Page marker {p.number}" in p.text
+    assert stats.pages == 7
+    assert stats.shards == 4
+    assert stats.workers == 2
+    assert stats.pages_per_sec > 0
+
+
+def test_iter_pdf_pages_single_worker_matches_parallel(temp_dir):
+    path = os.path.join(temp_dir, "book.pdf")
+    _make_pdf(path, 5)
+
+    serial = [p.text for p in iter_pdf_pages(path, workers=1)]
+    parallel = [p.text for p in iter_pdf_pages(path, workers=3, shard_size=1)]
+    assert serial == parallel
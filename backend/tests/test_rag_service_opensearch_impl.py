@@ -1,15 +1,29 @@
 import pytest
 
+from app.adapters.embeddings.hashing_provider import HashingEmbeddingClient
+from app.core.cache import TTLCache
+from app.db.models.learning_material import LearningMaterial
+from app.db.models.user import User
+from app.services_impl.answer_cache import AnswerCache
 from app.services_impl.rag_service_opensearch_impl import RAGServiceOpenSearchImpl
 
 
 class DummyLLM:
+    def __init__(self):
+        self.calls = 0
+
     async def chat_with_followups(self, prompt: str):
+        self.calls += 1
         return "This is the answer", ["Q1?", "Q2?", "Q3?"]
 
 
 class DummyVectorStore:
-    def search(self, query, material_id, topic_id, k=5):
+    def __init__(self):
+        self.query_embedding = None
+
+    def search(self, query, material_id, topic_id, k=5, query_embedding=None):
+        self.material_id = material_id
+        self.query_embedding = query_embedding
         return [
             {
                 "chunk_id": "c1",
@@ -25,12 +39,12 @@ class DummyVectorStore:
 
 
 @pytest.mark.asyncio
-async def test_rag_service_returns_answer_sources_followups(db):
+async def test_rag_service_returns_answer_sources_followups(db, AsyncSessionTest):
     llm = DummyLLM()
     vector_store = DummyVectorStore()
 
     service = RAGServiceOpenSearchImpl(
-        db=db,
+        sessionmaker=AsyncSessionTest,
         vector_store=vector_store,
         llm=llm,
     )
@@ -46,3 +60,156 @@ async def test_rag_service_returns_answer_sources_followups(db):
     assert len(result["sources"]) == 2
     assert result["sources"][0]["chunk_id"] == "c1"
     assert len(result["followups"]) == 3
+
+
+@pytest.mark.asyncio
+async def test_rag_service_embeds_question_for_hybrid_search(db, AsyncSessionTest):
+    vector_store = DummyVectorStore()
+    service = RAGServiceOpenSearchImpl(
+        sessionmaker=AsyncSessionTest,
+        vector_store=vector_store,
+        llm=DummyLLM(),
+        embedder=HashingEmbeddingClient(dimension=16),
+    )
+
+    await service.answer_question(
+        user_id=1,
+        material_id=1,
+        topic_id=None,
+        question="What is X?",
+    )
+
+    assert len(vector_store.query_embedding) == 16
+
+
+class StreamingLLM:
+    async def stream_chat(self, prompt: str):
+        for token in ["Vectors ", "have ", "direction."]:
+            yield token
+
+    async def chat(self, prompt: str):
+        return 'Sure: ["What is a basis?", "What is span?"]'
+
+
+@pytest.mark.asyncio
+async def test_rag_service_streams_tokens_then_trailing_events(db, AsyncSessionTest):
+    service = RAGServiceOpenSearchImpl(
+        sessionmaker=AsyncSessionTest,
+        vector_store=DummyVectorStore(),
+        llm=StreamingLLM(),
+    )
+
+    events = [
+        e
+        async for e in service.stream_answer(
+            user_id=1,
+            material_id=1,
+            topic_id=None,
+            question="What is a vector?",
+        )
+    ]
+
+    names = [e["event"] for e in events]
+    assert names == ["token", "token", "token", "sources", "followups", "done"]
+    assert events[3]["data"]["sources"][0]["chunk_id"] == "c1"
+    assert events[4]["data"]["followups"] == ["What is a basis?", "What is span?"]
+    assert events[5]["data"]["answer"] == "Vectors have direction."
+
+
+def _material(db, status="READY"):
+    user = User(email=f"rag-{status.lower()}@example.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    material = LearningMaterial(owner_id=user.id, filename="a.pdf", path="/x", status=status)
+    db.add(material)
+    db.commit()
+    return material.id
+
+
+@pytest.mark.asyncio
+async def test_rag_service_serves_repeat_questions_from_answer_cache(db, AsyncSessionTest):
+    material_id = _material(db)
+    llm = DummyLLM()
+    service = RAGServiceOpenSearchImpl(
+        sessionmaker=AsyncSessionTest,
+        vector_store=DummyVectorStore(),
+        llm=llm,
+        embedder=HashingEmbeddingClient(dimension=64),
+        answer_cache=AnswerCache(),
+    )
+
+    first = await service.answer_question(1, material_id, None, "What is X?")
+    second = await service.answer_question(1, material_id, None, "what is x")
+
+    assert second == first
+    assert llm.calls == 1
+
+
+class EmptyVectorStore(DummyVectorStore):
+    def search(self, *args, **kwargs):
+        return []
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "status, vector_store",
+    [("PROCESSING", DummyVectorStore), ("READY", EmptyVectorStore)],
+)
+async def test_rag_service_doesnt_cache_answers_without_indexed_context(
+    db, AsyncSessionTest, status, vector_store
+):
+    material_id = _material(db, status)
+    llm = DummyLLM()
+    service = RAGServiceOpenSearchImpl(
+        sessionmaker=AsyncSessionTest,
+        vector_store=vector_store(),
+        llm=llm,
+        embedder=HashingEmbeddingClient(dimension=64),
+        answer_cache=AnswerCache(),
+    )
+
+    await service.answer_question(1, material_id, None, "What is X?")
+    await service.answer_question(1, material_id, None, "What is X?")
+
+    assert llm.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_rag_service_searches_the_canonical_copy_of_a_duplicate(
+    db, AsyncSessionTest, query_budget
+):
+    user = User(email="rag-dup@example.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    canonical = LearningMaterial(owner_id=user.id, filename="a.pdf", path="/x", status="READY")
+    db.add(canonical)
+    db.flush()
+    duplicate = LearningMaterial(
+        owner_id=user.id,
+        filename="b.pdf",
+        path="/x",
+        status="READY",
+        canonical_material_id=canonical.id,
+    )
+    db.add(duplicate)
+    db.commit()
+
+    vector_store = DummyVectorStore()
+    service = RAGServiceOpenSearchImpl(
+        sessionmaker=AsyncSessionTest,
+        vector_store=vector_store,
+        llm=DummyLLM(),
+        material_aliases=TTLCache(),
+    )
+    await service.answer_question(
+        user_id=user.id, material_id=duplicate.id, topic_id=None, question="Q?"
+    )
+    assert vector_store.material_id == canonical.id
+
+    # the mapping is cached: repeat questions don't touch the DB
+    vector_store.material_id = None
+    with query_budget(0):
+        await service.answer_question(
+            user_id=user.id, material_id=duplicate.id, topic_id=None, question="Q2?"
+        )
+    assert vector_store.material_id == canonical.id
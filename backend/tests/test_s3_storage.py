@@ -0,0 +1,203 @@
+import hashlib
+import io
+import os
+import threading
+import uuid
+
+import pytest
+from fastapi import UploadFile
+
+from app.adapters.storage.object_storage import FileTooLargeError
+from app.adapters.storage.s3_storage import S3Storage
+
+
+class _ClientError(Exception):
+    def __init__(self, code: str) -> None:
+        super().__init__(code)
+        self.response = {"Error": {"Code": code}}
+
+
+class FilesystemS3Client:
+    """
+    Stand-in for a boto3 S3 client that keeps objects under a local
+    directory, with just the calls S3Storage makes.
+    """
+
+    def __init__(self, root: str) -> None:
+        self.root = root
+        self.calls = []
+        self._uploads = {}
+        self._lock = threading.Lock()
+
+    def _path(self, bucket: str, key: str) -> str:
+        return os.path.join(self.root, bucket, *key.split("/"))
+
+    def _record(self, name: str, **kwargs) -> None:
+        with self._lock:
+            self.calls.append((name, kwargs))
+
+    def _write(self, bucket: str, key: str, data: bytes) -> None:
+        path = self._path(bucket, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+
+    def head_object(self, Bucket, Key):
+        self._record("head_object", Key=Key)
+        path = self._path(Bucket, Key)
+        if not os.path.exists(path):
+            raise _ClientError("404")
+        return {"ContentLength": os.path.getsize(path)}
+
+    def put_object(self, Bucket, Key, Body):
+        self._record("put_object", Key=Key)
+        self._write(Bucket, Key, Body.read())
+
+    def create_multipart_upload(self, Bucket, Key):
+        self._record("create_multipart_upload", Key=Key)
+        upload_id = uuid.uuid4().hex
+        self._uploads[upload_id] = {}
+        return {"UploadId": upload_id}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        self._record("upload_part", Key=Key, PartNumber=PartNumber)
+        self._uploads[UploadId][PartNumber] = Body
+        return {"ETag": hashlib.md5(Body).hexdigest()}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        self._record("complete_multipart_upload", Key=Key)
+        parts = self._uploads.pop(UploadId)
+        numbers = [p["PartNumber"] for p in MultipartUpload["Parts"]]
+        assert numbers == sorted(parts)
+        self._write(Bucket, Key, b"".join(parts[n] for n in numbers))
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self._record("abort_multipart_upload", Key=Key)
+        self._uploads.pop(UploadId, None)
+
+    def get_object(self, Bucket, Key, Range=None):
+        self._record("get_object", Key=Key, Range=Range)
+        path = self._path(Bucket, Key)
+        if not os.path.exists(path):
+            raise _ClientError("NoSuchKey")
+        with open(path, "rb") as f:
+            data = f.read()
+        if Range:
+            start, end = (int(n) for n in Range.removeprefix("bytes=").split("-"))
+            data = data[start:end + 1]
+        return {"Body": io.BytesIO(data)}
+
+
+@pytest.fixture
+def s3(temp_dir):
+    client = FilesystemS3Client(os.path.join(temp_dir, "server"))
+    spool = os.path.join(temp_dir, "spool")
+    os.makedirs(spool)
+    storage = S3Storage(
+        client,
+        bucket="bucket",
+        prefix="materials/",
+        part_size=10,
+        max_concurrency=3,
+        chunk_size=4,
+        spool_dir=spool,
+    )
+    return client, storage
+
+
+def _calls(client, name):
+    return [kwargs for call, kwargs in client.calls if call == name]
+
+
+@pytest.mark.asyncio
+async def test_small_file_is_uploaded_in_one_request(s3):
+    client, storage = s3
+    content = b"tiny"
+
+    stored = await storage.store(UploadFile(filename="a.PDF", file=io.BytesIO(content)))
+
+    sha = hashlib.sha256(content).hexdigest()
+    assert stored.path == f"s3://bucket/materials/{sha[:2]}/{sha}.pdf"
+    assert stored.created and stored.size == 4
+    assert len(_calls(client, "put_object")) == 1
+    assert not _calls(client, "create_multipart_upload")
+    # the spooled temp file is gone
+    assert os.listdir(storage.spool_dir) == []
+
+
+@pytest.mark.asyncio
+async def test_large_file_is_uploaded_in_parallel_parts(s3):
+    client, storage = s3
+    content = bytes(range(256)) * 2  # 512 bytes -> 52 parts of <= 10
+
+    stored = await storage.store(UploadFile(filename="big.pdf", file=io.BytesIO(content)))
+
+    parts = _calls(client, "upload_part")
+    assert sorted(p["PartNumber"] for p in parts) == list(range(1, 53))
+    assert len(_calls(client, "complete_multipart_upload")) == 1
+    with storage.local_copy(stored.path) as path:
+        with open(path, "rb") as f:
+            assert f.read() == content
+
+
+@pytest.mark.asyncio
+async def test_failed_part_aborts_the_multipart_upload(s3):
+    client, storage = s3
+
+    def _fail(**kwargs):
+        raise _ClientError("InternalError")
+
+    client.upload_part = _fail
+
+    with pytest.raises(_ClientError):
+        await storage.store(UploadFile(filename="big.pdf", file=io.BytesIO(b"x" * 25)))
+
+    assert len(_calls(client, "abort_multipart_upload")) == 1
+    assert os.listdir(storage.spool_dir) == []
+
+
+@pytest.mark.asyncio
+async def test_identical_content_is_uploaded_once(s3):
+    client, storage = s3
+    content = b"same bytes, twice" * 3
+
+    first = await storage.store(UploadFile(filename="a.pdf", file=io.BytesIO(content)))
+    second = await storage.store(UploadFile(filename="b.pdf", file=io.BytesIO(content)))
+
+    assert first.path == second.path
+    assert first.created and not second.created
+    assert len(_calls(client, "complete_multipart_upload")) == 1
+
+
+@pytest.mark.asyncio
+async def test_upload_limit_applies_before_anything_is_sent(s3):
+    client, storage = s3
+    storage.max_bytes = 8
+
+    with pytest.raises(FileTooLargeError):
+        await storage.store(UploadFile(filename="a.pdf", file=io.BytesIO(b"x" * 9)))
+
+    assert client.calls == []
+
+
+@pytest.mark.asyncio
+async def test_local_copy_uses_ranged_reads_and_cleans_up(s3):
+    client, storage = s3
+    content = b"0123456789abcdefghijklmnopqrstuvwxyz"
+    stored = await storage.store(UploadFile(filename="a.pdf", file=io.BytesIO(content)))
+
+    with storage.local_copy(stored.path) as path:
+        assert path.endswith(".pdf")
+        with open(path, "rb") as f:
+            assert f.read() == content
+
+    assert not os.path.exists(path)
+    ranges = sorted(c["Range"] for c in _calls(client, "get_object"))
+    assert ranges == ["bytes=0-9", "bytes=10-19", "bytes=20-29", "bytes=30-35"]
+
+
+def test_local_copy_passes_local_paths_through(s3):
+    _, storage = s3
+
+    with storage.local_copy("/data/materials/ab/abc.pdf") as path:
+        assert path == "/data/materials/ab/abc.pdf"
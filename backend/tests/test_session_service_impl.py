@@ -1,7 +1,11 @@
+from datetime import datetime, timedelta
+
 import pytest
+from sqlalchemy import event
 
 from app.services_impl.session_service_impl import SessionServiceImpl
 from app.services.prereq_service import PrerequisiteSuggestion, PrereqService
+from app.adapters.wiki.summary_cache import FOUND, WikiSummary
 from app.adapters.wiki.wikipedia_client import WikipediaClient
 from app.db import models
 
@@ -23,15 +27,12 @@ class FakePrereqService(PrereqService):
 
 
 class FakeWiki(WikipediaClient):
-    def __init__(self) -> None:
-        pass
-
-    def fetch_summary(self, topic: str):  # type: ignore[override]
-        return f"Summary for {topic}", f"https://example.com/{topic}"
+    async def fetch_remote(self, topic: str):  # type: ignore[override]
+        return WikiSummary(FOUND, f"Summary for {topic}", f"https://example.com/{topic}")
 
 
 @pytest.mark.asyncio
-async def test_session_service_creates_session_with_multiple_materials(db):
+async def test_session_service_creates_session_with_multiple_materials(db, async_db):
     user = models.user.User(email="user@example.com", hashed_password="pwd")
     material1 = models.learning_material.LearningMaterial(
         owner_id=1,
@@ -52,7 +53,7 @@ async def test_session_service_creates_session_with_multiple_materials(db):
     db.add_all([material1, material2])
     db.commit()
 
-    service = SessionServiceImpl(db, FakePrereqService(), FakeWiki())
+    service = SessionServiceImpl(async_db, FakePrereqService(), FakeWiki())
     session = await service.create_session(
         user_id=user.id,
         title="Study Plan",
@@ -66,7 +67,7 @@ async def test_session_service_creates_session_with_multiple_materials(db):
 
 
 @pytest.mark.asyncio
-async def test_session_service_list_and_get(db):
+async def test_session_service_list_and_get(db, async_db):
     user = models.user.User(email="another@example.com", hashed_password="pwd")
     material = models.learning_material.LearningMaterial(
         owner_id=1,
@@ -80,7 +81,7 @@ async def test_session_service_list_and_get(db):
     db.add(material)
     db.commit()
 
-    service = SessionServiceImpl(db, FakePrereqService(), FakeWiki())
+    service = SessionServiceImpl(async_db, FakePrereqService(), FakeWiki())
     created = await service.create_session(
         user_id=user.id,
         title="Quick Plan",
@@ -88,21 +89,24 @@ async def test_session_service_list_and_get(db):
         material_ids=[material.id],
     )
 
-    sessions = await service.list_sessions(user.id)
-    assert len(sessions) == 1
-    assert sessions[0]["id"] == created["id"]
+    page = await service.list_sessions(user.id)
+    assert len(page.items) == 1
+    assert page.items[0]["id"] == created["id"]
+    assert page.items[0]["material_count"] == 1
+    assert page.items[0]["prerequisite_count"] == 2
+    assert page.next_cursor is None
 
     detail = await service.get_session(user.id, created["id"])
     assert detail["id"] == created["id"]
 
 
 @pytest.mark.asyncio
-async def test_session_service_validates_material_ownership(db):
+async def test_session_service_validates_material_ownership(db, async_db):
     user = models.user.User(email="wrong@example.com", hashed_password="pwd")
     db.add(user)
     db.flush()
 
-    service = SessionServiceImpl(db, FakePrereqService(), FakeWiki())
+    service = SessionServiceImpl(async_db, FakePrereqService(), FakeWiki())
     with pytest.raises(ValueError):
         await service.create_session(
             user_id=user.id,
@@ -110,3 +114,103 @@ async def test_session_service_validates_material_ownership(db):
             objective=None,
             material_ids=[999],
         )
+
+
+
+class TreePrereqService(PrereqService):
+    def __init__(self, suggestions):
+        self.suggestions = suggestions
+
+    async def generate_prerequisite_tree(self, *args, **kwargs):
+        return self.suggestions
+
+
+@pytest.mark.asyncio
+async def test_session_service_persists_tree_in_two_statements(db, async_db):
+    user = models.user.User(email="tree@example.com", hashed_password="pwd")
+    db.add(user)
+    db.flush()
+    material = models.learning_material.LearningMaterial(
+        owner_id=user.id, filename="t.pdf", path="/tmp/t.pdf", status="READY"
+    )
+    db.add(material)
+    db.commit()
+
+    suggestions = [
+        # children listed before their parents
+        PrerequisiteSuggestion(name="Eigenvectors", description=None, parent="Matrices"),
+        PrerequisiteSuggestion(name="Matrices", description=None, parent="Vectors"),
+        PrerequisiteSuggestion(name="Vectors", description=None, parent=None),
+        PrerequisiteSuggestion(name="vectors", description="dup", parent=None),
+        # a cycle with a subtree hanging off it
+        PrerequisiteSuggestion(name="A", description=None, parent="B"),
+        PrerequisiteSuggestion(name="B", description=None, parent="A"),
+        PrerequisiteSuggestion(name="C", description=None, parent="A"),
+    ]
+
+    statements = []
+
+    def _count(conn, cursor, statement, *args):
+        if "prerequisite_nodes" in statement and not statement.startswith("SELECT"):
+            statements.append(statement.split()[0])
+
+    engine = async_db.get_bind()
+    event.listen(engine, "before_cursor_execute", _count)
+    try:
+        service = SessionServiceImpl(async_db, TreePrereqService(suggestions), FakeWiki())
+        session = await service.create_session(
+            user_id=user.id, title="Tree", objective=None, material_ids=[material.id]
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", _count)
+
+    assert statements == ["INSERT", "UPDATE"]
+
+    nodes = {n["name"]: n for n in session["prerequisites"]}
+    assert len(nodes) == 6
+    assert nodes["Vectors"]["parent_id"] is None
+    assert nodes["Matrices"]["parent_id"] == nodes["Vectors"]["id"]
+    assert nodes["Eigenvectors"]["parent_id"] == nodes["Matrices"]["id"]
+    # parents get lower ids than their children
+    assert nodes["Vectors"]["id"] < nodes["Matrices"]["id"] < nodes["Eigenvectors"]["id"]
+    # exactly one link of the cycle was cut; C keeps its parent
+    assert [nodes["A"]["parent_id"], nodes["B"]["parent_id"]].count(None) == 1
+    assert nodes["C"]["parent_id"] == nodes["A"]["id"]
+
+    stored = db.query(models.prerequisite_node.PrerequisiteNode).all()
+    assert {n.id: n.parent_id for n in stored} == {
+        n["id"]: n["parent_id"] for n in session["prerequisites"]
+    }
+
+
+@pytest.mark.asyncio
+async def test_session_service_paginates_with_a_keyset_cursor(db, async_db):
+    user = models.user.User(email="pager@example.com", hashed_password="pwd")
+    db.add(user)
+    db.flush()
+    created_at = datetime(2024, 1, 1)
+    # two sessions share a timestamp: the id breaks the tie
+    for i, offset in enumerate([0, 1, 1, 2, 3]):
+        db.add(
+            models.learning_session.LearningSession(
+                user_id=user.id,
+                title=f"S{i}",
+                created_at=created_at + timedelta(minutes=offset),
+            )
+        )
+    db.commit()
+
+    service = SessionServiceImpl(async_db, FakePrereqService(), FakeWiki())
+    titles = []
+    cursor = None
+    while True:
+        page = await service.list_sessions(user.id, limit=2, cursor=cursor)
+        titles.extend(item["title"] for item in page.items)
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+
+    assert titles == ["S4", "S3", "S2", "S1", "S0"]
+
+    with pytest.raises(ValueError):
+        await service.list_sessions(user.id, cursor="not-a-cursor")
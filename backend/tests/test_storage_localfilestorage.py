@@ -1,10 +1,11 @@
+import hashlib
 import io
 import os
 
 import pytest
 from fastapi import UploadFile
 
-from app.adapters.storage.object_storage import LocalFileStorage
+from app.adapters.storage.object_storage import FileTooLargeError, LocalFileStorage
 
 
 @pytest.mark.asyncio
@@ -19,3 +20,47 @@ async def test_local_file_storage_saves_file(temp_dir):
     assert os.path.exists(path)
     with open(path, "rb") as f:
         assert f.read() == content
+
+
+@pytest.mark.asyncio
+async def test_local_file_storage_streams_in_chunks_and_hashes(temp_dir):
+    storage = LocalFileStorage(base_path=temp_dir, chunk_size=4)
+    content = b"0123456789" * 5
+    upload_file = UploadFile(filename="book.pdf", file=io.BytesIO(content))
+
+    stored = await storage.store(upload_file)
+
+    assert stored.size == len(content)
+    assert stored.sha256 == hashlib.sha256(content).hexdigest()
+    assert stored.path == os.path.join(temp_dir, stored.sha256[:2], f"{stored.sha256}.pdf")
+    # only the shard directory, no temp file left behind
+    assert os.listdir(temp_dir) == [stored.sha256[:2]]
+
+
+@pytest.mark.asyncio
+async def test_local_file_storage_keeps_one_copy_of_identical_content(temp_dir):
+    storage = LocalFileStorage(base_path=temp_dir)
+
+    first = await storage.store(UploadFile(filename="a.pdf", file=io.BytesIO(b"same")))
+    second = await storage.store(UploadFile(filename="b.PDF", file=io.BytesIO(b"same")))
+
+    assert first.created and not second.created
+    assert first.path == second.path
+    assert os.listdir(os.path.dirname(first.path)) == [os.path.basename(first.path)]
+
+
+@pytest.mark.asyncio
+async def test_local_file_storage_rejects_oversized_uploads(temp_dir):
+    storage = LocalFileStorage(base_path=temp_dir, max_bytes=10, chunk_size=4)
+
+    # size unknown up front: stopped while streaming
+    with pytest.raises(FileTooLargeError):
+        await storage.store(UploadFile(filename="big.pdf", file=io.BytesIO(b"x" * 11)))
+    # declared size: rejected before reading
+    declared = UploadFile(filename="big.pdf", file=io.BytesIO(b"x" * 11), size=11)
+    with pytest.raises(FileTooLargeError):
+        await storage.store(declared)
+    assert declared.file.tell() == 0
+
+    # no partial or temp files left behind
+    assert os.listdir(temp_dir) == []
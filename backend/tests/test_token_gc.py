@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+
+from app.db.models.refresh_token import RefreshToken
+from app.db.models.user import User
+from app.workers.token_gc import purge_refresh_tokens
+
+NOW = datetime(2024, 6, 1, 12, 0, 0)
+
+
+def _tokens(db, *rows):
+    user = User(email="gc@example.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    for i, (created_days_ago, expires_in_days, revoked_days_ago) in enumerate(rows):
+        db.add(
+            RefreshToken(
+                user_id=user.id,
+                jti=f"jti-{i}",
+                created_at=NOW - timedelta(days=created_days_ago),
+                expires_at=NOW + timedelta(days=expires_in_days),
+                revoked=revoked_days_ago is not None,
+                revoked_at=(
+                    None if revoked_days_ago is None else NOW - timedelta(days=revoked_days_ago)
+                ),
+            )
+        )
+    db.commit()
+
+
+def _jtis(db):
+    return sorted(jti for (jti,) in db.query(RefreshToken.jti))
+
+
+def test_purge_deletes_expired_and_old_revoked_tokens(db):
+    _tokens(
+        db,
+        (1, 29, None),  # live
+        (31, -1, None),  # expired
+        (2, 28, 2),  # revoked, still retained
+        (10, 20, 10),  # revoked past retention
+        (10, 20, 2),  # old, but only just revoked: still retained
+    )
+
+    deleted = purge_refresh_tokens(
+        db, revoked_retention=timedelta(days=7), clock=lambda: NOW
+    )
+
+    assert deleted == 2
+    assert _jtis(db) == ["jti-0", "jti-2", "jti-4"]
+
+
+def test_purge_works_in_bounded_batches(db):
+    _tokens(db, *[(31, -1, None)] * 5, (1, 29, None))
+
+    assert purge_refresh_tokens(db, batch_size=2, max_batches=2, clock=lambda: NOW) == 4
+    assert len(_jtis(db)) == 2
+
+    assert purge_refresh_tokens(db, batch_size=2, clock=lambda: NOW) == 1
+    assert _jtis(db) == ["jti-5"]
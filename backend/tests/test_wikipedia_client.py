@@ -0,0 +1,172 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from sqlalchemy import select
+
+from app.adapters.wiki import summary_cache
+from app.adapters.wiki.summary_cache import (
+    MISSING,
+    DBSummaryCache,
+    WikipediaMirror,
+    WikiSummary,
+    normalize_title,
+)
+from app.adapters.wiki.wikipedia_client import WikipediaClient
+from app.db import models
+
+
+def _wiki_handler(calls):
+    async def handler(request: httpx.Request) -> httpx.Response:
+        title = request.url.path.rsplit("/", 1)[-1]
+        calls.append(title)
+        if title == "Missing":
+            return httpx.Response(404)
+        if title == "Broken":
+            return httpx.Response(503)
+        return httpx.Response(
+            200,
+            json={
+                "extract": f"About {title}",
+                "content_urls": {"desktop": {"page": f"https://wiki/{title}"}},
+            },
+        )
+
+    return handler
+
+
+@pytest.mark.asyncio
+async def test_wikipedia_client_fetches_summaries_concurrently_with_a_cap():
+    active = 0
+    peak = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.05)
+        active -= 1
+        title = request.url.path.rsplit("/", 1)[-1]
+        if title == "Missing":
+            return httpx.Response(404)
+        return httpx.Response(
+            200,
+            json={
+                "extract": f"About {title}",
+                "content_urls": {"desktop": {"page": f"https://wiki/{title}"}},
+            },
+        )
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http:
+        wiki = WikipediaClient(http_client=http, max_concurrency=3)
+        topics = [f"T{i}" for i in range(6)] + ["Missing", "T0"]
+
+        started = asyncio.get_running_loop().time()
+        summaries = await wiki.fetch_summaries(topics)
+        elapsed = asyncio.get_running_loop().time() - started
+
+    assert peak == 3
+    assert elapsed < 7 * 0.05  # 7 unique lookups, run 3 at a time
+    assert summaries["T1"] == ("About T1", "https://wiki/T1")
+    assert summaries["Missing"] == (None, None)
+    assert len(summaries) == 7
+
+
+@pytest.mark.asyncio
+async def test_wikipedia_client_caches_hits_and_misses_in_the_db(db, async_db):
+    calls = []
+    transport = httpx.MockTransport(_wiki_handler(calls))
+    async with httpx.AsyncClient(transport=transport) as http:
+        wiki = WikipediaClient(http_client=http, cache=DBSummaryCache(async_db), offline=False)
+        first = await wiki.fetch_summaries(["Linear_Algebra", "Missing", "Broken"])
+        await async_db.commit()
+        second = await wiki.fetch_summaries(["linear algebra", "Missing", "Broken"])
+
+    assert first["Linear_Algebra"] == ("About Linear_Algebra", "https://wiki/Linear_Algebra")
+    assert second["linear algebra"] == first["Linear_Algebra"]
+    assert first["Missing"] == second["Missing"] == (None, None)
+    # every outcome is cached, including the 404 and the 503
+    assert calls == ["Linear_Algebra", "Missing", "Broken"]
+
+    rows = {r.title_key: r for r in db.query(models.WikipediaSummaryEntry).all()}
+    assert rows["missing"].status == "missing"
+    assert rows["broken"].status == "error"
+    # failures are retried much sooner than misses
+    assert rows["broken"].expires_at < rows["missing"].expires_at
+
+
+@pytest.mark.asyncio
+async def test_wikipedia_client_refetches_expired_entries(async_db):
+    calls = []
+    transport = httpx.MockTransport(_wiki_handler(calls))
+    async with httpx.AsyncClient(transport=transport) as http:
+        wiki = WikipediaClient(http_client=http, cache=DBSummaryCache(async_db), offline=False)
+        await wiki.fetch_summaries(["Calculus"])
+        row = (await async_db.scalars(select(models.WikipediaSummaryEntry))).one()
+        row.expires_at = datetime.utcnow() - timedelta(seconds=1)
+        await async_db.flush()
+
+        await wiki.fetch_summaries(["Calculus"])
+
+    assert calls == ["Calculus", "Calculus"]
+    assert len((await async_db.scalars(select(models.WikipediaSummaryEntry))).all()) == 1
+
+
+@pytest.mark.asyncio
+async def test_wikipedia_client_offline_mode_uses_the_mirror_only(temp_dir):
+    dump = f"{temp_dir}/summaries.jsonl"
+    with open(dump, "w", encoding="utf-8") as fh:
+        fh.write(json.dumps({"title": "Calculus", "extract": "Limits.", "url": "u1"}) + "\n")
+        fh.write(
+            json.dumps(
+                {
+                    "title": "Linear algebra",
+                    "extract": "Vectors.",
+                    "content_urls": {"desktop": {"page": "u2"}},
+                }
+            )
+            + "\n"
+        )
+    calls = []
+    transport = httpx.MockTransport(_wiki_handler(calls))
+    async with httpx.AsyncClient(transport=transport) as http:
+        wiki = WikipediaClient(
+            http_client=http,
+            mirror=WikipediaMirror.load(dump),
+            offline=True,
+        )
+        summaries = await wiki.fetch_summaries(["calculus", "Linear_Algebra", "Topology"])
+
+    assert summaries == {
+        "calculus": ("Limits.", "u1"),
+        "Linear_Algebra": ("Vectors.", "u2"),
+        "Topology": (None, None),
+    }
+    assert calls == []
+
+
+def test_normalize_title_folds_case_and_underscores():
+    assert normalize_title("  Linear_Algebra ") == normalize_title("linear algebra")
+
+
+@pytest.mark.asyncio
+async def test_db_summary_cache_writes_sorted_and_fits_long_names(async_db, monkeypatch):
+    written = []
+    upsert = summary_cache.async_upsert
+
+    async def _recording_upsert(db, model, rows, **kwargs):
+        written.extend(row["title_key"] for row in rows)
+        await upsert(db, model, rows, **kwargs)
+
+    monkeypatch.setattr(summary_cache, "async_upsert", _recording_upsert)
+    cache = DBSummaryCache(async_db)
+    long_key = "a very long generated concept name " * 20
+    entries = {key: WikiSummary(MISSING) for key in ("zeta", long_key, "alpha")}
+
+    await cache.put_many("en", entries)
+
+    assert written == sorted(written)
+    assert max(len(key) for key in written) <= 255
+    assert set(await cache.get_many("en", entries)) == set(entries)
@@ -4,7 +4,7 @@ import { FormEvent, useCallback, useEffect, useMemo, useState } from "react";
 import Link from "next/link";
 import { useRouter } from "next/navigation";
 
-import { apiGet, apiPost, logout } from "@/lib/apiClient";
+import { apiGet, apiGetAll, apiPost, logout } from "@/lib/apiClient";
 
 interface Material {
   id: number;
@@ -113,12 +113,12 @@ export default function LearningPage() {
   );
 
   const refreshMaterials = useCallback(async () => {
-    const data = await apiGet("/api/v1/materials/");
+    const data = await apiGetAll<Material>("/api/v1/materials/");
     setMaterials(data);
   }, []);
 
   const refreshSessions = useCallback(async () => {
-    const data = await apiGet("/api/v1/learning/sessions");
+    const data = await apiGetAll<SessionSummary>("/api/v1/learning/sessions");
     setSessions(data);
   }, []);
 
@@ -21,7 +21,7 @@ export function getAuthHeaders() {
   };
 }
 
-export async function apiGet(path: string, init?: RequestInit) {
+async function getResponse(path: string, init?: RequestInit) {
   const res = await fetch(`${API_BASE}${path}`, {
     ...init,
     headers: {
@@ -33,7 +33,27 @@ export async function apiGet(path: string, init?: RequestInit) {
     const text = await res.text();
     throw new Error(`${res.status}: ${text || res.statusText}`);
   }
-  return res.json();
+  return res;
+}
+
+export async function apiGet(path: string, init?: RequestInit) {
+  return (await getResponse(path, init)).json();
+}
+
+// List endpoints return one page at a time; follow X-Next-Cursor to the end.
+export async function apiGetAll<T>(path: string, init?: RequestInit): Promise<T[]> {
+  const items: T[] = [];
+  let cursor: string | null = null;
+  do {
+    const separator = path.includes("?") ? "&" : "?";
+    const pagePath: string = cursor
+      ? `${path}${separator}cursor=${encodeURIComponent(cursor)}`
+      : path;
+    const res = await getResponse(pagePath, init);
+    items.push(...((await res.json()) as T[]));
+    cursor = res.headers.get("X-Next-Cursor");
+  } while (cursor);
+  return items;
 }
 
 export async function apiPost(path: string, body: unknown, init?: RequestInit) {